@@ -0,0 +1,279 @@
+#!/usr/bin/env python
+"""Startup and import-time benchmarks for each check_versions.py mode.
+
+Runs every CLI mode against a synthetic database in fresh interpreters and
+writes a JSON report: cold wall time (empty bytecode cache), warm wall time
+(min/median over repeated runs), and a `-X importtime` breakdown including
+which checker modules the mode loaded. Pass an earlier report with
+--compare to print per-mode deltas.
+
+    python benchmarks/startup.py
+    python benchmarks/startup.py --runs 10 --output report.json --compare old.json
+
+Nothing here talks to the network or touches data/ and logs/: the database,
+log file and bytecode cache all live in a temporary directory.
+"""
+
+import argparse
+import json
+import os
+import platform
+import re
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+
+REPO = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(REPO))
+
+from src import db  # noqa: E402
+
+# mode name -> check_versions.py arguments
+CLI_MODES = {
+    "summary": ["--summary"],
+    "list": ["--list"],
+    "updates": ["--updates"],
+    "history": ["--history"],
+    "plan": ["--plan"],
+}
+
+# Representative rows: (name, check_current, check_latest, github, status)
+SYNTHETIC_APPS = [
+    ("homeassistant", "api", "github_release", "home-assistant/core", "Up to Date"),
+    ("ble-proxy", "api", "github_release", "esphome/esphome", "Update Available"),
+    ("zigbee2mqtt", "mqtt", "github_release", "Koenkk/zigbee2mqtt", "Up to Date"),
+    ("telegraf", "kubectl", "docker_hub", "", "Up to Date"),
+    ("calico", "kubectl", "github_release", "projectcalico/calico", "Update Available"),
+    ("grafana", "kubectl", "github_release", "grafana/grafana", "Up to Date"),
+    ("proxmox", "api", "proxmox", "", "Up to Date"),
+    ("rpi", "ssh", "ssh_apt", "", "Update Available"),
+    ("traefik", "api", "helm_search", "traefik", "Up to Date"),
+    ("uptime-kuma", "api", "github_release", "louislam/uptime-kuma", "Unknown"),
+]
+
+# Emitted by `-X importtime`: "import time: <self us> | <cumulative us> | <indented name>"
+IMPORTTIME_LINE = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \| (\s*)(\S+)")
+
+
+def build_synthetic_db(path, rows, transactions):
+    conn = db.get_connection(path)
+    db.init_db(conn)
+    apps = []
+    for i in range(rows):
+        name, check_current, check_latest, github, status = SYNTHETIC_APPS[i % len(SYNTHETIC_APPS)]
+        instance = f"bench{i // len(SYNTHETIC_APPS)}"
+        apps.append((name, instance, check_current, check_latest, github, status))
+    conn.executemany(
+        "INSERT INTO applications (name, instance, enabled, check_current, check_latest, github, status, "
+        "current_version, latest_version, last_checked) "
+        "VALUES (?, ?, 1, ?, ?, ?, ?, '1.0.0', '1.1.0', '2026-01-01 00:00:00')",
+        apps,
+    )
+    conn.executemany(
+        "INSERT INTO transactions (application_id, name, instance, upgrade_method, from_version, to_version, "
+        "timestamp, detail) VALUES (?, ?, ?, 'awx', '1.0.0', '1.1.0', ?, '')",
+        [
+            (i % rows + 1, apps[i % rows][0], apps[i % rows][1], f"2026-01-01 00:{i // 60 % 60:02d}:{i % 60:02d}")
+            for i in range(transactions)
+        ],
+    )
+    conn.commit()
+    conn.close()
+
+
+def bench_env(workdir):
+    """Environment for the child interpreters: synthetic DB, throwaway log and
+    bytecode cache, and placeholders for config.py's required settings."""
+    env = dict(os.environ)
+    env["DATABASE_PATH"] = str(workdir / "bench.db")
+    env["LOG_PATH"] = str(workdir / "bench.log")
+    env["PYTHONPYCACHEPREFIX"] = str(workdir / "pycache")
+    config_source = (REPO / "config.py").read_text()
+    for key in re.findall(r"get_required_env\('(\w+)'", config_source):
+        env.setdefault(key, "benchmark")
+    return env
+
+
+def _run(cmd, env, extra_fds=()):
+    start = time.perf_counter()
+    result = subprocess.run(
+        cmd, cwd=REPO, env=env, capture_output=True, text=True, timeout=120, pass_fds=extra_fds,
+    )
+    return time.perf_counter() - start, result
+
+
+def _failure(result):
+    return {"error": f"exit {result.returncode}", "stderr": result.stderr.strip().splitlines()[-5:]}
+
+
+def parse_importtime(stderr, top=15):
+    """Top-level imports by cumulative time, plus the checker modules loaded."""
+    modules = []
+    for match in IMPORTTIME_LINE.finditer(stderr):
+        self_us, cumulative_us, indent, name = match.groups()
+        modules.append((name, int(self_us), int(cumulative_us), len(indent)))
+    top_level = [m for m in modules if m[3] <= 1]
+    top_level.sort(key=lambda m: m[2], reverse=True)
+    return {
+        "total_ms": round(sum(m[2] for m in modules if m[3] <= 1) / 1000, 2),
+        "module_count": len(modules),
+        "top": [
+            {"module": name, "cumulative_ms": round(cum / 1000, 2), "self_ms": round(own / 1000, 2)}
+            for name, own, cum, _ in top_level[:top]
+        ],
+        "checker_modules": sorted(m[0] for m in modules if m[0].startswith("src.checkers.")),
+    }
+
+
+def measure(cmd, env, runs, extra_fds=()):
+    """Cold run (fresh bytecode cache), then `runs` warm runs, then one
+    `-X importtime` run."""
+    shutil.rmtree(env["PYTHONPYCACHEPREFIX"], ignore_errors=True)
+    cold, result = _run(cmd, env, extra_fds)
+    if result.returncode != 0:
+        return _failure(result)
+    warm = []
+    for _ in range(runs):
+        elapsed, result = _run(cmd, env, extra_fds)
+        if result.returncode != 0:
+            return _failure(result)
+        warm.append(elapsed)
+    _, result = _run([cmd[0], "-X", "importtime", *cmd[1:]], env, extra_fds)
+    return {
+        "cold_s": round(cold, 4),
+        "warm_s": {
+            "min": round(min(warm), 4),
+            "median": round(statistics.median(warm), 4),
+            "runs": len(warm),
+        },
+        "imports": parse_importtime(result.stderr),
+    }
+
+
+TUI_DRIVER = """
+import asyncio, sys
+sys.argv = ["check_versions.py", "--tui"]
+from src.log_utils import open_log_file
+from version_manager import VersionManager
+from src.tui.app import VersionCheckerApp
+
+async def main():
+    app = VersionCheckerApp(VersionManager(), open_log_file())
+    async with app.run_test() as pilot:
+        await pilot.pause()
+
+asyncio.run(main())
+"""
+
+
+def bench_tui(env, runs):
+    """Time until the TUI has mounted and painted its first screen (headless)."""
+    try:
+        import textual  # noqa: F401
+    except ImportError:
+        return {"skipped": "textual not installed"}
+    return measure([sys.executable, "-c", TUI_DRIVER], env, runs)
+
+
+def bench_completion(env, runs):
+    """`check_versions.py --app <TAB>`: argcomplete calls _app_completer,
+    which reads names straight from SQLite before any heavy import."""
+    try:
+        import argcomplete  # noqa: F401
+    except ImportError:
+        return {"skipped": "argcomplete not installed"}
+    comp_line = "check_versions.py --app "
+    env = dict(
+        env, _ARGCOMPLETE="1", _ARGCOMPLETE_IFS="\n", COMP_LINE=comp_line, COMP_POINT=str(len(comp_line)),
+    )
+    # argcomplete writes completions to fd 8 and exits.
+    read_fd, write_fd = os.pipe()
+    os.dup2(write_fd, 8)
+    try:
+        return measure([sys.executable, "check_versions.py"], env, runs, extra_fds=(8,))
+    finally:
+        os.close(8)
+        os.close(write_fd)
+        os.close(read_fd)
+
+
+def compare(report, baseline):
+    print(f"\nCompared with {baseline['timestamp']}:")
+    for mode, result in report["modes"].items():
+        before = baseline.get("modes", {}).get(mode, {})
+        if "warm_s" not in result or "warm_s" not in before:
+            continue
+        now, then = result["warm_s"]["median"], before["warm_s"]["median"]
+        added = sorted(set(result["imports"]["checker_modules"]) - set(before["imports"]["checker_modules"]))
+        line = f"  {mode:<10} {then * 1000:8.1f}ms -> {now * 1000:8.1f}ms ({(now - then) * 1000:+.1f}ms)"
+        if added:
+            line += f"  new checker imports: {', '.join(added)}"
+        print(line)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5, help="Warm runs per mode (default: 5)")
+    parser.add_argument("--rows", type=int, default=120, help="Applications in the synthetic DB (default: 120)")
+    parser.add_argument("--transactions", type=int, default=5000, help="Transactions in the synthetic DB (default: 5000)")
+    parser.add_argument(
+        "--output",
+        type=Path,
+        default=None,
+        help="Report path (default: benchmarks/results/startup-<timestamp>.json)",
+    )
+    parser.add_argument("--compare", type=Path, default=None, help="Earlier report to diff against")
+    args = parser.parse_args()
+
+    workdir = Path(tempfile.mkdtemp(prefix="vc-bench-"))
+    try:
+        build_synthetic_db(workdir / "bench.db", args.rows, args.transactions)
+        env = bench_env(workdir)
+
+        modes = {}
+        for mode, cli_args in CLI_MODES.items():
+            print(f"Benchmarking --{mode}...")
+            modes[mode] = measure([sys.executable, "check_versions.py", *cli_args], env, args.runs)
+        print("Benchmarking --tui...")
+        modes["tui"] = bench_tui(env, args.runs)
+        print("Benchmarking --app completion...")
+        modes["complete_app"] = bench_completion(env, args.runs)
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    report = {
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "rows": args.rows,
+        "transactions": args.transactions,
+        "modes": modes,
+    }
+
+    output = args.output or REPO / "benchmarks" / "results" / f"startup-{datetime.now():%Y%m%d-%H%M%S}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(report, indent=2) + "\n")
+
+    print()
+    for mode, result in modes.items():
+        if "warm_s" in result:
+            print(
+                f"  {mode:<13} cold {result['cold_s'] * 1000:8.1f}ms  warm {result['warm_s']['median'] * 1000:8.1f}ms  "
+                f"imports {result['imports']['total_ms']:8.1f}ms  checker modules {len(result['imports']['checker_modules'])}"
+            )
+        else:
+            print(f"  {mode:<13} {result.get('skipped') or result.get('error')}")
+    print(f"\nReport written to {output}")
+
+    if args.compare:
+        compare(report, json.loads(args.compare.read_text()))
+
+
+if __name__ == "__main__":
+    main()
@@ -6,10 +6,11 @@ import os
 import sys
 from pathlib import Path
 
-# Suppress urllib3 OpenSSL warning before importing anything that uses requests
-import urllib3
+# Suppress urllib3's OpenSSL warning before anything imports requests — via a
+# warnings filter, so commands that never touch the network don't import it.
+import warnings
 
-urllib3.disable_warnings(urllib3.exceptions.NotOpenSSLWarning)
+warnings.filterwarnings("ignore", message="urllib3 v2 only supports OpenSSL")
 
 
 def _db_path() -> Path:
@@ -64,6 +65,36 @@ def main():
         action="store_true",
         help="With --check-all, show full per-application detail instead of one summary line each",
     )
+    parser.add_argument(
+        "--apt-prefetch",
+        action="store_true",
+        help=(
+            "With --check-all, start apt list refreshes on every ssh_apt host in parallel "
+            "up front and check those hosts last"
+        ),
+    )
+    parser.add_argument(
+        "--mdns",
+        action="store_true",
+        default=None,
+        help=(
+            "With --check-all, read ESPHome versions from mDNS advertisements first "
+            "(default: ESPHOME_MDNS from config)"
+        ),
+    )
+    parser.add_argument(
+        "--skip-fresh",
+        action="store_true",
+        help="With --check-all or --plan, skip applications checked within their checker's freshness window",
+    )
+    parser.add_argument(
+        "--plan",
+        action="store_true",
+        help=(
+            "Print the --check-all execution plan (order, batches, per-host limits, "
+            "estimated wall time) without running any checks"
+        ),
+    )
     parser.add_argument("--summary", action="store_true", help="Show summary and exit")
     parser.add_argument(
         "--list", action="store_true", help="List all applications and exit"
@@ -73,14 +104,47 @@ def main():
         action="store_true",
         help="List only applications with updates available and exit",
     )
+    parser.add_argument(
+        "--behind",
+        nargs="?",
+        const="patch",
+        default=None,
+        choices=["major", "minor", "patch"],
+        help=(
+            "List applications at least one major/minor/patch release behind latest, "
+            "most behind first, and exit (default: patch)"
+        ),
+    )
     parser.add_argument(
         "--history",
         action="store_true",
         help=(
             "Show upgrade history from the transactions table and exit "
-            "(most recent 40; use --app/--instance to filter)"
+            "(most recent 40; use --app/--instance to filter, --limit/--before to page)"
         ),
     )
+    parser.add_argument(
+        "--limit",
+        type=int,
+        default=40,
+        help="With --history, transactions per page (default: 40; 0 shows all)",
+    )
+    parser.add_argument(
+        "--before",
+        type=int,
+        default=None,
+        metavar="ID",
+        help="With --history, show the page of transactions older than transaction ID",
+    )
+    parser.add_argument(
+        "--check-stats",
+        type=int,
+        nargs="?",
+        const=7,
+        default=None,
+        metavar="DAYS",
+        help="Show per-application check timings and failures from the check log and exit (default: last 7 days)",
+    )
     app_arg = parser.add_argument("--app", type=str, help="Check specific application by name")
     parser.add_argument(
         "--upgrade",
@@ -135,9 +199,17 @@ def main():
 
     from version_manager import VersionManager
 
-    vm = VersionManager(args.db)
+    # The listing commands query SQLite directly rather than loading rows.
+    read_only = (
+        not (args.tui or args.plan or args.check_all)
+        and (
+            args.summary or args.list or args.updates or args.behind or args.history
+            or args.check_stats is not None
+        )
+    )
+    vm = VersionManager(args.db, load=not read_only)
 
-    if not vm.notes:
+    if not (vm.count_applications() if read_only else vm.records):
         print("Failed to load application data. Check the database path and permissions.")
         sys.exit(1)
 
@@ -145,16 +217,25 @@ def main():
         from src.tui.app import run_tui
 
         run_tui(vm, log_file)
+    elif args.plan:
+        vm.show_plan(max_workers=args.workers, apt_prefetch=args.apt_prefetch, skip_fresh=args.skip_fresh)
     elif args.check_all:
-        vm.check_all_applications(max_workers=args.workers, verbose=args.verbose)
+        vm.check_all_applications(
+            max_workers=args.workers, verbose=args.verbose, apt_prefetch=args.apt_prefetch, mdns=args.mdns,
+            skip_fresh=args.skip_fresh,
+        )
     elif args.summary:
         vm.show_summary()
     elif args.list:
         vm.show_applications()
     elif args.updates:
         vm.show_updates()
+    elif args.behind:
+        vm.show_behind(args.behind)
+    elif args.check_stats is not None:
+        vm.show_check_stats(args.check_stats)
     elif args.history:
-        vm.show_history(name=args.app or "", instance=args.instance)
+        vm.show_history(name=args.app or "", instance=args.instance, limit=args.limit, before=args.before)
     elif args.app:
         if args.upgrade:
             label = f"'{args.app}'" + (f" (instance: {args.instance})" if args.instance else "")
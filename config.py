@@ -1,3 +1,4 @@
+import json
 import os
 import sys
 from pathlib import Path
@@ -32,6 +33,16 @@ HA_TOKENS = {
     "mudderpi": get_required_env('HA_TOKEN_MUDDERPI', 'Home Assistant mudderpi API token'),
 }
 
+# Home Assistant update entities as a version source - OPTIONAL. JSON object
+# mapping "name" or "name:instance" to "ha_instance:update.entity_id" ({instance}
+# in the entity id is replaced by the row's instance); mapped rows read both
+# versions from one cached /api/states call per HA instance
+try:
+    HA_UPDATE_ENTITIES = json.loads(get_optional_env('HA_UPDATE_ENTITIES', '{}', 'JSON mapping of applications to Home Assistant update entities'))
+except json.JSONDecodeError as e:
+    print(f"WARNING: Ignoring invalid HA_UPDATE_ENTITIES: {e}")
+    HA_UPDATE_ENTITIES = {}
+
 # OPNsense API credentials - REQUIRED
 OPNSENSE_API_KEY = get_required_env('OPNSENSE_API_KEY', 'OPNsense API key')
 OPNSENSE_API_SECRET = get_required_env('OPNSENSE_API_SECRET', 'OPNsense API secret')
@@ -48,6 +59,27 @@ PROXMOX_API_TOKEN = get_required_env('PROXMOX_API_TOKEN', 'Proxmox API token (fo
 PROXMOX_APT_VERSIONS_URL = get_optional_env('PROXMOX_APT_VERSIONS_URL', 'https://pve11.goepp.net:8006', 'Base URL of the Proxmox node used for apt version checks')
 PROXMOX_APT_VERSIONS_NODE = get_optional_env('PROXMOX_APT_VERSIONS_NODE', 'pve11', 'Node name of the Proxmox node used for apt version checks')
 
+# Proxmox node whose API is used to read every cluster node's PVE and Ceph versions in one sweep
+PROXMOX_CLUSTER_URL = get_optional_env('PROXMOX_CLUSTER_URL', PROXMOX_APT_VERSIONS_URL, 'Base URL of the Proxmox node used for cluster-wide version collection')
+
+# apt freshness for ssh_apt hosts: skip `apt-get update` when /var/lib/apt/lists
+# changed within this many minutes (0 = always update)
+APT_LISTS_MAX_AGE_MINUTES = int(get_optional_env('APT_LISTS_MAX_AGE_MINUTES', '360', 'Skip apt-get update when package lists are newer than this many minutes'))
+
+# Check run log retention: per-check rows are kept this many days, then
+# folded into daily per-application rollups kept for CHECK_ROLLUP_RETENTION_DAYS.
+CHECK_LOG_RETENTION_DAYS = int(get_optional_env('CHECK_LOG_RETENTION_DAYS', '30', 'Days to keep per-check timing rows before rolling them up'))
+CHECK_ROLLUP_RETENTION_DAYS = int(get_optional_env('CHECK_ROLLUP_RETENTION_DAYS', '365', 'Days to keep daily check rollups'))
+
+# Upgrade runs: independent upgrades (separate AWX jobs) run concurrently, up
+# to this many at once (1 = one after another)
+UPGRADE_WORKERS = int(get_optional_env('UPGRADE_WORKERS', '4', 'Maximum concurrent upgrades in an upgrade run'))
+
+# ESPHome mDNS discovery - OPTIONAL: read device versions from _esphomelib._tcp
+# TXT records during check-all (kept running for the life of the TUI), falling
+# back to the native API for devices that aren't advertising
+ESPHOME_MDNS = get_optional_env('ESPHOME_MDNS', 'false', 'Enable passive mDNS discovery of ESPHome versions').lower() in ('1', 'true', 'yes')
+
 # Tailscale API credentials - REQUIRED for Tailscale checking
 TAILSCALE_ACCESS_TOKEN = get_optional_env('TAILSCALE_ACCESS_TOKEN', None, 'Tailscale API access token for device management')
 TAILSCALE_TAILNET = get_optional_env('TAILSCALE_TAILNET', None, 'Tailscale tailnet name (e.g., example.com)')
@@ -0,0 +1,111 @@
+class AppIndex:
+    """Lookup indexes over VersionManager's loaded rows, by row position.
+
+    Keyed by lower-cased (name, instance), lower-cased name, status and
+    enabled flag, so lookups and the filtered views (updates, enabled,
+    per-name instances) don't scan and lowercase every row per call.
+
+    An index is never modified once built: `updated` returns a new index
+    for changed rows, sharing every key set the change doesn't touch, so
+    readers holding an older snapshot (see src/app_snapshot.py) keep a
+    consistent view. Positions come back in row order.
+    """
+
+    def __init__(self, rows=()):
+        """Index `rows`, an iterable of (name, instance, status, enabled)."""
+        self._fields = {}
+        self._by_key = {}
+        self._by_name = {}
+        self._by_status = {}
+        self._enabled = set()
+        self._enabled_names = {}
+        for idx, (name, instance, status, enabled) in enumerate(rows):
+            name, instance, status = str(name or ""), str(instance or ""), status or ""
+            self._fields[idx] = (name, instance, status, enabled)
+            self._by_key.setdefault((name.lower(), instance.lower()), set()).add(idx)
+            self._by_name.setdefault(name.lower(), set()).add(idx)
+            self._by_status.setdefault(status, set()).add(idx)
+            if enabled:
+                self._enabled.add(idx)
+                if name:
+                    self._enabled_names[name] = self._enabled_names.get(name, 0) + 1
+
+    # Used on copies only (see updated): they replace the sets they change
+    # rather than mutating them, as those are shared with the original.
+    def _add(self, idx, name, instance, status, enabled):
+        name, instance, status = str(name or ""), str(instance or ""), status or ""
+        self._fields[idx] = (name, instance, status, enabled)
+        for index, key in (
+            (self._by_key, (name.lower(), instance.lower())),
+            (self._by_name, name.lower()),
+            (self._by_status, status),
+        ):
+            index[key] = index.get(key, frozenset()) | {idx}
+        if enabled:
+            self._enabled = self._enabled | {idx}
+            if name:
+                self._enabled_names[name] = self._enabled_names.get(name, 0) + 1
+
+    def _remove(self, idx):
+        name, instance, status, enabled = self._fields.pop(idx)
+        for index, key in (
+            (self._by_key, (name.lower(), instance.lower())),
+            (self._by_name, name.lower()),
+            (self._by_status, status),
+        ):
+            index[key] = index[key] - {idx}
+            if not index[key]:
+                del index[key]
+        if enabled:
+            self._enabled = self._enabled - {idx}
+            if name:
+                self._enabled_names[name] -= 1
+                if not self._enabled_names[name]:
+                    del self._enabled_names[name]
+
+    def updated(self, changes):
+        """A new index with rows re-indexed from `changes`, an iterable of
+        (idx, (name, instance, status, enabled)); self is left as it was."""
+        new = AppIndex.__new__(AppIndex)
+        new._fields = dict(self._fields)
+        new._by_key = dict(self._by_key)
+        new._by_name = dict(self._by_name)
+        new._by_status = dict(self._by_status)
+        new._enabled = self._enabled
+        new._enabled_names = dict(self._enabled_names)
+        for idx, (name, instance, status, enabled) in changes:
+            if new._fields.get(idx) == (str(name or ""), str(instance or ""), status or "", enabled):
+                continue
+            if idx in new._fields:
+                new._remove(idx)
+            new._add(idx, name, instance, status, enabled)
+        return new
+
+    def __len__(self):
+        return len(self._fields)
+
+    def find(self, name, instance):
+        """Position of the (name, instance) row, case-insensitive; None if absent."""
+        matches = self._by_key.get((name.lower(), instance.lower()))
+        return min(matches) if matches else None
+
+    def rows_by_name(self, name, instance=""):
+        """Enabled rows named `name` (optionally of one instance), case-insensitive."""
+        if instance:
+            matches = self._by_key.get((name.lower(), instance.lower()), set())
+        else:
+            matches = self._by_name.get(name.lower(), set())
+        return sorted(matches & self._enabled)
+
+    def with_status(self, status):
+        """Enabled rows whose status is `status`."""
+        return sorted(self._by_status.get(status, set()) & self._enabled)
+
+    def enabled(self):
+        return sorted(self._enabled)
+
+    def disabled(self):
+        return sorted(self._fields.keys() - self._enabled)
+
+    def enabled_names(self):
+        return sorted(self._enabled_names)
@@ -0,0 +1,102 @@
+import json
+from collections.abc import Mapping
+
+# PascalCase field name (as checkers, the CLI and the TUI see it) -> column.
+FIELD_MAP = {
+    "Name": "name",
+    "Enabled": "enabled",
+    "Context": "context",
+    "Namespace": "namespace",
+    "Instance": "instance",
+    "Type": "type",
+    "Category": "category",
+    "Version_Pin": "version_pin",
+    "Upgrade": "upgrade",
+    "Target": "target",
+    "Esphome_Key": "esphome_key",
+    "GitHub": "github",
+    "DockerHub": "dockerhub",
+    "Current_Version": "current_version",
+    "Latest_Version": "latest_version",
+    "Status": "status",
+    "Last_Checked": "last_checked",
+    "Last_Upgraded": "last_upgraded",
+    "Check_Current": "check_current",
+    "Check_Latest": "check_latest",
+    "Helm_Values_File": "helm_values_file",
+    "Extra_Manifests": "extra_manifests",
+    "Library_GitHub": "library_github",
+    "Current_Library_Version": "current_library_version",
+    "Latest_Library_Version": "latest_library_version",
+    "Notes": "notes",
+}
+COLUMNS = tuple(FIELD_MAP.values())
+
+# Columns with non-string storage representations that need conversion
+# between the DB row and the in-memory record.
+_BOOL_COLUMNS = {"enabled"}
+_JSON_COLUMNS = {"extra_manifests"}
+
+
+class AppRecord:
+    """One applications row, held as slot attributes (record.current_version).
+
+    Values are as stored, with None for NULL, except `enabled` (a bool) and
+    `extra_manifests` (a list). Records are never modified once loaded; a
+    change produces a new record (see `replace`) in a new snapshot.
+    """
+
+    __slots__ = ("id",) + COLUMNS
+
+    @classmethod
+    def from_row(cls, row):
+        record = cls()
+        record.id = row["id"]
+        for col in COLUMNS:
+            value = row[col]
+            if col in _BOOL_COLUMNS:
+                value = bool(value)
+            elif col in _JSON_COLUMNS:
+                value = json.loads(value) if value else []
+            setattr(record, col, value)
+        return record
+
+    def replace(self, changes: dict):
+        """A copy of this record with `changes` (column -> value) applied."""
+        record = AppRecord.__new__(AppRecord)
+        for slot in self.__slots__:
+            setattr(record, slot, changes.get(slot, getattr(self, slot)))
+        return record
+
+    def __repr__(self):
+        return f"<AppRecord {self.id} {self.name} ({self.instance})>"
+
+
+def value_to_db(col: str, value):
+    if col in _BOOL_COLUMNS:
+        return int(bool(value))
+    if col in _JSON_COLUMNS:
+        return json.dumps(value) if value else None
+    return value
+
+
+class RowView(Mapping):
+    """Read-only PascalCase view of an AppRecord for checkers and screens
+    that take an app_data dict: app_data["Current_Version"] reads the
+    record's attribute, with "" for NULL. Nothing is copied; records are
+    immutable, so the view shows the row as of the snapshot it came from."""
+
+    __slots__ = ("_record",)
+
+    def __init__(self, record):
+        self._record = record
+
+    def __getitem__(self, key):
+        value = getattr(self._record, FIELD_MAP[key])
+        return value if value is not None else ""
+
+    def __iter__(self):
+        return iter(FIELD_MAP)
+
+    def __len__(self):
+        return len(FIELD_MAP)
@@ -0,0 +1,20 @@
+class AppSnapshot:
+    """One version of VersionManager's loaded application table: the records
+    (a tuple of AppRecords, by row position) and their AppIndex.
+
+    Neither is modified once the snapshot is published. Writers build the
+    next snapshot from changed copies and swap it in whole (see
+    VersionManager.bulk_update), so a reader that takes `vm.snapshot` once
+    sees records and index from the same version without taking a lock,
+    even while worker threads are writing.
+    """
+
+    __slots__ = ("version", "records", "index")
+
+    def __init__(self, version, records, index):
+        self.version = version
+        self.records = records
+        self.index = index
+
+    def __repr__(self):
+        return f"<AppSnapshot v{self.version} ({len(self.records)} rows)>"
@@ -1,9 +1,54 @@
 import subprocess
 import re
 import json
+import threading
 from .utils import http_get, print_error, parse_image_version, extract_semantic_version
 
 
+# `kubectl get pods -A` snapshots of the current run, keyed by context (None
+# for the current context) — see prefetch_pods. Pod lookups in a namespace
+# read from the snapshot instead of running kubectl again.
+_pod_snapshots = {}
+_pod_snapshots_lock = threading.Lock()
+
+
+def prefetch_pods(context=None):
+    """Snapshot every pod of a cluster with one kubectl call.
+
+    The kubectl checkers' batch method: rows sharing a context resolve their
+    pod lookups from the snapshot. Failures are not reported here; those
+    rows just run their own kubectl calls.
+    """
+    cmd = ["kubectl"] + (["--context", context] if context else []) + ["get", "pods", "-A", "-o", "json"]
+    try:
+        result = subprocess.run(cmd, capture_output=True, text=True, timeout=30, check=False)
+        if result.returncode != 0:
+            return
+        items = json.loads(result.stdout).get('items', [])
+    except (subprocess.TimeoutExpired, json.JSONDecodeError):
+        return
+    with _pod_snapshots_lock:
+        _pod_snapshots[context] = items
+
+
+def clear_pod_snapshots():
+    """Forget the current run's snapshots (see check_all_applications)."""
+    with _pod_snapshots_lock:
+        _pod_snapshots.clear()
+
+
+def _snapshot_pods(context, namespace):
+    """Snapshotted pods in `namespace`, or None to ask kubectl directly
+    (no snapshot, or no namespace — kubectl's default depends on context)."""
+    if not namespace:
+        return None
+    with _pod_snapshots_lock:
+        items = _pod_snapshots.get(context)
+    if items is None:
+        return None
+    return [pod for pod in items if pod.get('metadata', {}).get('namespace') == namespace]
+
+
 class KubernetesChecker:
     def __init__(self, instance, namespace=None, context=None):
         self.instance = instance
@@ -17,15 +62,15 @@ class KubernetesChecker:
         cmd.extend(args)
         return cmd
 
-    def find_pod(self, pod_pattern, namespace=None, exact=False):
-        ns = namespace or self.namespace
+    def _get_pods(self, ns):
+        pods = _snapshot_pods(self.context, ns)
+        if pods is not None:
+            return pods
+
         cmd = self._kubectl_cmd("get", "pods", "-o", "json")
         if ns:
             cmd.extend(["-n", ns])
 
-        if exact:
-            pattern = re.compile(rf"^{re.escape(pod_pattern)}-[a-z0-9]+-[a-z0-9]+$")
-
         try:
             result = subprocess.run(cmd, capture_output=True, text=True, timeout=10, check=False)
 
@@ -33,20 +78,7 @@ class KubernetesChecker:
                 print_error(self.instance, f"kubectl get pods failed: {result.stderr}")
                 return None
 
-            pods_data = json.loads(result.stdout)
-
-            for pod in pods_data.get('items', []):
-                pod_name = pod.get('metadata', {}).get('name', '')
-                status = pod.get('status', {}).get('phase', '')
-
-                matched = pattern.match(pod_name) if exact else pod_pattern in pod_name
-
-                if matched and status == 'Running':
-                    print(f"  {self.instance}: Found pod {pod_name}")
-                    return pod_name
-
-            print_error(self.instance, f"Could not find running {pod_pattern} pod")
-            return None
+            return json.loads(result.stdout).get('items', [])
 
         except json.JSONDecodeError as e:
             print_error(self.instance, f"Failed to parse kubectl output: {e}")
@@ -55,6 +87,29 @@ class KubernetesChecker:
             print_error(self.instance, "kubectl get pods timed out")
             return None
 
+    def find_pod(self, pod_pattern, namespace=None, exact=False):
+        ns = namespace or self.namespace
+
+        if exact:
+            pattern = re.compile(rf"^{re.escape(pod_pattern)}-[a-z0-9]+-[a-z0-9]+$")
+
+        pods = self._get_pods(ns)
+        if pods is None:
+            return None
+
+        for pod in pods:
+            pod_name = pod.get('metadata', {}).get('name', '')
+            status = pod.get('status', {}).get('phase', '')
+
+            matched = pattern.match(pod_name) if exact else pod_pattern in pod_name
+
+            if matched and status == 'Running':
+                print(f"  {self.instance}: Found pod {pod_name}")
+                return pod_name
+
+        print_error(self.instance, f"Could not find running {pod_pattern} pod")
+        return None
+
     def exec_pod_command(self, pod_name, command, namespace=None, container=None):
         ns = namespace or self.namespace
         cmd = self._kubectl_cmd("exec")
@@ -89,22 +144,31 @@ class KubernetesChecker:
         # the desired image from the manifest the moment it's updated, even while
         # the old pods are still running the previous version.
         ns = namespace or self.namespace
-        cmd = self._kubectl_cmd("get", "pods", "-o",
-                                "jsonpath={.items[*].status.containerStatuses[*].image}")
-        if ns:
-            cmd.extend(["-n", ns])
+        pods = _snapshot_pods(self.context, ns)
+        if pods is not None:
+            images = " ".join(
+                status.get('image', '')
+                for pod in pods
+                for status in pod.get('status', {}).get('containerStatuses', [])
+            )
+        else:
+            cmd = self._kubectl_cmd("get", "pods", "-o",
+                                    "jsonpath={.items[*].status.containerStatuses[*].image}")
+            if ns:
+                cmd.extend(["-n", ns])
 
-        try:
-            result = subprocess.run(cmd, capture_output=True, text=True, timeout=10, check=False)
-        except subprocess.TimeoutExpired:
-            print_error(self.instance, "kubectl get pods timed out")
-            return None
+            try:
+                result = subprocess.run(cmd, capture_output=True, text=True, timeout=10, check=False)
+            except subprocess.TimeoutExpired:
+                print_error(self.instance, "kubectl get pods timed out")
+                return None
 
-        if result.returncode != 0:
-            print_error(self.instance, f"kubectl get pods failed: {result.stderr.strip()}")
-            return None
+            if result.returncode != 0:
+                print_error(self.instance, f"kubectl get pods failed: {result.stderr.strip()}")
+                return None
+            images = result.stdout
 
-        version = parse_image_version(result.stdout, image_pattern, version_pattern)
+        version = parse_image_version(images, image_pattern, version_pattern)
         if version:
             return version
 
@@ -3,6 +3,7 @@ import re
 import yaml
 import json
 from .utils import http_get
+from ..versions import newest
 
 def get_cnpg_version(instance, context=None, namespace=None):
     if instance == 'operator':
@@ -39,12 +40,7 @@ def get_cnpg_postgres_latest_version():
                         if version_match:
                             versions.append(version_match.group(1))
 
-        if versions:
-            version_tuples = [tuple(map(int, v.split('.'))) for v in versions]
-            latest_tuple = max(version_tuples)
-            return '.'.join(map(str, latest_tuple))
-
-        return None
+        return newest(versions)
 
     except Exception as e:
         print(f"  Error getting CNPG latest version: {e}")
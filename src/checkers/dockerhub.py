@@ -1,5 +1,6 @@
 from functools import lru_cache
 from .utils import http_get
+from ..versions import newest
 import re
 
 _PRERELEASE_MARKERS = ('rc', 'beta', 'alpha', 'dev', 'nightly', 'unstable', 'edge')
@@ -48,19 +49,7 @@ def _get_dockerhub_latest_version_impl(repository, version_pattern=None, exclude
                 version = match.group(1) if match.groups() else match.group(0)
                 versions.append(version)
 
-        if versions:
-            def version_key(v):
-                try:
-                    return tuple(int(part) for part in v.split('.'))
-                except (ValueError, AttributeError):
-                    # Unparseable versions sort last instead of crashing the
-                    # mixed tuple/str comparison
-                    return (-1,)
-
-            versions.sort(key=version_key, reverse=True)
-            return versions[0]
-
-        return None
+        return newest(versions)
 
     except Exception as e:
         print(f"  Error getting latest version from Docker Hub ({repository}): {e}")
@@ -114,22 +103,8 @@ def get_dockerhub_latest_beta(repository):
         if not (data and isinstance(data, dict) and 'results' in data):
             return None
 
-        pattern = re.compile(r'^(\d+\.\d+\.\d+)-beta\.(\d+)$')
-        versions = []
-
-        for tag in data['results']:
-            tag_name = tag.get('name', '')
-            match = pattern.match(tag_name)
-            if match:
-                base = tuple(int(p) for p in match.group(1).split('.'))
-                beta_num = int(match.group(2))
-                versions.append((base, beta_num, tag_name))
-
-        if versions:
-            versions.sort(reverse=True)
-            return versions[0][2]
-
-        return None
+        pattern = re.compile(r'^\d+\.\d+\.\d+-beta\.\d+$')
+        return newest(tag.get('name', '') for tag in data['results'] if pattern.match(tag.get('name', '')))
 
     except Exception as e:
         print(f"  Error getting latest beta from Docker Hub ({repository}): {e}")
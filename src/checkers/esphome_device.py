@@ -1,9 +1,12 @@
 import asyncio
 import base64
+import threading
+from concurrent.futures import Future
 from urllib.parse import urlparse
 
 import aioesphomeapi
 
+from .esphome_mdns import get_mdns_listener
 from .utils import print_error
 
 
@@ -17,42 +20,154 @@ def _is_valid_base64(s):
         return False
 
 
+# Sweep limits: how many native-API sessions are open at once, and how long
+# any one device may take to connect and answer device_info.
+SWEEP_CONCURRENCY = 16
+DEVICE_TIMEOUT = 10
+SWEEP_WAIT_SLACK = 15
+
+# Pending per-device results of the current run's sweep, keyed by
+# (hostname, encryption key) — see sweep_esphome_devices. _sweep_wait is how
+# long a row waits on its result: the sweep's own worst case plus slack for
+# the mDNS settle window.
+_sweep = {}
+_sweep_wait = DEVICE_TIMEOUT
+_sweep_lock = threading.Lock()
+
+
+def _device_key(url, encryption_key):
+    hostname = urlparse(url).hostname if url else None
+    return (hostname, (encryption_key or "").strip()) if hostname else None
+
+
+async def _read_device_info(hostname, encryption_key):
+    if encryption_key and _is_valid_base64(encryption_key):
+        api = aioesphomeapi.APIClient(hostname, 6053, password="", noise_psk=encryption_key.strip())
+    else:
+        api = aioesphomeapi.APIClient(hostname, 6053, "")
+    await api.connect(login=False)
+    try:
+        device_info = await api.device_info()
+    finally:
+        await api.disconnect()
+    return {
+        "esphome_version": getattr(device_info, "esphome_version", None) or None,
+        "library_version": getattr(device_info, "project_version", None) or None,
+    }
+
+
+async def _read_with_timeout(hostname, encryption_key, timeout):
+    try:
+        return await asyncio.wait_for(_read_device_info(hostname, encryption_key), timeout)
+    except asyncio.TimeoutError:
+        raise TimeoutError(f"no response within {timeout}s") from None
+
+
+async def _sweep_devices(futures, concurrency, timeout):
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def _one(key, future):
+        hostname, encryption_key = key
+        listener = get_mdns_listener()
+        if listener is not None:
+            # Give the device the listener's start-up window to advertise
+            # before paying for an API session.
+            await asyncio.sleep(listener.settle_remaining())
+            advertised = listener.lookup(hostname)
+            if advertised:
+                future.set_result(advertised)
+                return
+        async with semaphore:
+            try:
+                info = await _read_with_timeout(hostname, encryption_key, timeout)
+            except Exception as e:
+                future.set_exception(e)
+            else:
+                future.set_result(info)
+
+    await asyncio.gather(*(_one(key, future) for key, future in futures.items()))
+
+
+def sweep_esphome_devices(devices, concurrency=SWEEP_CONCURRENCY, timeout=DEVICE_TIMEOUT):
+    """Read device_info from many devices at once on one shared event loop.
+
+    The ESPHome checkers' batch method. `devices` is an iterable of
+    (url, encryption_key); at most `concurrency` sessions are open at once,
+    each device gets `timeout`, so the sweep takes about as long as its
+    slowest device. Results (errors included) are kept for
+    get_esphome_device_info to hand out on each row's own worker thread —
+    nothing is printed here.
+    """
+    futures = {}
+    for url, encryption_key in devices:
+        key = _device_key(url, encryption_key)
+        if key and key not in futures:
+            futures[key] = Future()
+    if not futures:
+        return
+    global _sweep_wait
+    with _sweep_lock:
+        _sweep.update(futures)
+        waves = -(-len(futures) // max(1, concurrency))
+        _sweep_wait = max(_sweep_wait, waves * timeout + SWEEP_WAIT_SLACK)
+    try:
+        asyncio.run(_sweep_devices(futures, concurrency, timeout))
+    finally:
+        # If the sweep ended early (a device task raised outside its own
+        # handling, or the loop was cancelled), fail the devices it never got
+        # to so their rows don't wait forever.
+        for future in futures.values():
+            if not future.done():
+                future.set_exception(RuntimeError("ESPHome sweep ended before this device was read"))
+
+
+def clear_esphome_sweep():
+    """Forget the current run's sweep results (see check_all_applications)."""
+    global _sweep_wait
+    with _sweep_lock:
+        _sweep.clear()
+        _sweep_wait = DEVICE_TIMEOUT
+
+
 def get_esphome_device_info(instance, url, encryption_key=None):
     """Read version info from an ESPHome device over the native API.
 
     Returns {"esphome_version": ..., "library_version": ...} (library_version
     is the device's project_version, None if the firmware doesn't set one),
-    or None on any failure.
+    or None on any failure. Uses the current run's sweep result for the
+    device when there is one, then the mDNS listener's advertised versions, and
+    otherwise connects on its own.
     """
     if not url:
         print_error(instance, "No device URL configured")
         return None
 
-    hostname = urlparse(url).hostname
-    if not hostname:
+    key = _device_key(url, encryption_key)
+    if not key:
         print_error(instance, "Could not parse hostname from URL")
         return None
 
-    async def _read():
-        if encryption_key and _is_valid_base64(encryption_key):
-            api = aioesphomeapi.APIClient(hostname, 6053, password="", noise_psk=encryption_key.strip())
-        else:
-            api = aioesphomeapi.APIClient(hostname, 6053, "")
-        await api.connect(login=False)
-        device_info = await api.device_info()
-        await api.disconnect()
-        return device_info
+    with _sweep_lock:
+        future = _sweep.get(key)
+        wait = _sweep_wait
+    listener = get_mdns_listener()
 
     try:
-        device_info = asyncio.run(_read())
+        if future is not None:
+            try:
+                info = future.result(timeout=wait)
+            except TimeoutError:
+                raise TimeoutError(f"no sweep result within {wait}s") from None
+        else:
+            info = (listener and listener.lookup(key[0])) or asyncio.run(
+                _read_with_timeout(*key, DEVICE_TIMEOUT)
+            )
     except Exception as e:
         print_error(instance, f"ESPHome API error: {e}")
         return None
 
-    esphome_version = getattr(device_info, "esphome_version", None) or None
-    library_version = getattr(device_info, "project_version", None) or None
-    if not esphome_version:
+    if not info["esphome_version"]:
         print_error(instance, "No ESPHome version found in device response")
         return None
 
-    return {"esphome_version": esphome_version, "library_version": library_version}
+    return info
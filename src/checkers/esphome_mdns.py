@@ -0,0 +1,131 @@
+import ipaddress
+import threading
+import time
+
+try:
+    from zeroconf import ServiceBrowser, ServiceStateChange, Zeroconf
+except ImportError:
+    Zeroconf = None
+
+SERVICE_TYPE = "_esphomelib._tcp.local."
+
+# How long after the listener starts a device may take to answer the
+# initial browse query before we give up on it and use the native API.
+SETTLE_SECONDS = 2.0
+
+
+def _label(hostname):
+    return hostname.split(".", 1)[0].lower() if hostname else ""
+
+
+def _txt(properties, key):
+    value = properties.get(key.encode())
+    return value.decode(errors="replace") if value else None
+
+
+class EsphomeMdnsListener:
+    """Collects ESPHome versions from `_esphomelib._tcp` TXT records.
+
+    Every ESPHome device advertises its `version` and `project_version` over
+    mDNS, so one browse picks up the whole fleet without opening a single
+    API connection. Kept running (e.g. for the life of the TUI) the snapshot
+    follows re-announcements, such as a device coming back after an OTA.
+    Works against anything that answers mDNS, real devices or not.
+    """
+
+    def __init__(self):
+        self._zeroconf = None
+        self._browser = None
+        self._started_at = None
+        self._lock = threading.Lock()
+        self._by_label = {}
+        self._by_address = {}
+
+    def start(self):
+        self._zeroconf = Zeroconf()
+        self._started_at = time.monotonic()
+        self._browser = ServiceBrowser(self._zeroconf, SERVICE_TYPE, handlers=[self._on_change])
+
+    def stop(self):
+        if self._zeroconf is not None:
+            self._zeroconf.close()
+        self._zeroconf = None
+        self._browser = None
+
+    def settle_remaining(self):
+        """Seconds left in the start-up window for devices to answer."""
+        if self._started_at is None:
+            return 0.0
+        return max(0.0, SETTLE_SECONDS - (time.monotonic() - self._started_at))
+
+    def _on_change(self, zeroconf, service_type, name, state_change):
+        device = _label(name)
+        if state_change is ServiceStateChange.Removed:
+            with self._lock:
+                entry = self._by_label.get(device)
+                if entry is not None:
+                    self._by_label = {k: v for k, v in self._by_label.items() if v is not entry}
+                    self._by_address = {k: v for k, v in self._by_address.items() if v is not entry}
+            return
+
+        info = zeroconf.get_service_info(service_type, name, timeout=3000)
+        if info is None:
+            return
+        version = _txt(info.properties, "version")
+        if not version:
+            return
+        entry = {
+            "esphome_version": version,
+            "library_version": _txt(info.properties, "project_version"),
+            "addresses": info.parsed_addresses(),
+        }
+        with self._lock:
+            self._by_label[device] = entry
+            if info.server:
+                self._by_label[_label(info.server)] = entry
+            for address in entry["addresses"]:
+                self._by_address[address] = entry
+
+    def lookup(self, hostname):
+        """{"esphome_version", "library_version"} advertised by `hostname`,
+        matched by host label (ble-proxy-kitchen.example.net ->
+        ble-proxy-kitchen) or IP address; None if it hasn't advertised."""
+        with self._lock:
+            try:
+                ipaddress.ip_address(hostname)
+                entry = self._by_address.get(hostname)
+            except ValueError:
+                entry = self._by_label.get(_label(hostname))
+        if entry is None:
+            return None
+        return {"esphome_version": entry["esphome_version"], "library_version": entry["library_version"]}
+
+
+_listener = None
+_listener_lock = threading.Lock()
+
+
+def start_mdns_listener():
+    """Start the shared listener if it isn't running; returns it, or None
+    when zeroconf isn't installed."""
+    global _listener
+    if Zeroconf is None:
+        print("  zeroconf not installed; mDNS discovery disabled")
+        return None
+    with _listener_lock:
+        if _listener is None:
+            _listener = EsphomeMdnsListener()
+            _listener.start()
+        return _listener
+
+
+def get_mdns_listener():
+    return _listener
+
+
+def stop_mdns_listener():
+    global _listener
+    with _listener_lock:
+        if _listener is not None:
+            _listener.stop()
+        _listener = None
@@ -28,4 +28,10 @@ def get_github_latest_tag(repo):
         if latest_tag.startswith("v"):
             return latest_tag[1:]
         return extract_semantic_version(latest_tag) or latest_tag
-    return None
\ No newline at end of file
+    return None
+
+
+def clear_cache():
+    """Reset the per-run release/tag caches (see check_all_applications)."""
+    get_github_latest_version.cache_clear()
+    get_github_latest_tag.cache_clear()
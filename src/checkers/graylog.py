@@ -1,5 +1,6 @@
 import config
 from .utils import http_get
+from ..versions import newest
 
 
 def get_graylog_current_version(instance, url):
@@ -82,16 +83,7 @@ def get_postgresql_latest_version_from_ghcr(repository):
                     not any(suffix in tag.lower() for suffix in ['bookworm', 'bullseye', 'alpine', 'minimal', 'standard'])):
                     version_tags.add(tag)
 
-        if version_tags:
-            def version_key(v):
-                return [int(p) for p in v.split('.') if p.isdigit()]
-
-            try:
-                return sorted(version_tags, key=version_key, reverse=True)[0]
-            except (ValueError, IndexError):
-                pass
-
-        return None
+        return newest(version_tags)
 
     except Exception as e:
         print(f"  Error getting PostgreSQL latest version from GHCR: {e}")
@@ -1,6 +1,7 @@
 import re
 import requests
 from .utils import print_error
+from ..versions import newest
 
 
 def get_opensearch_compatible_version():
@@ -16,11 +17,7 @@ def get_opensearch_compatible_version():
         # Filter to 2.x only — 3.x+ is explicitly unsupported by Graylog
         opensearch_versions = [v for v in versions if int(v.split('.')[0]) == 2]
 
-        if not opensearch_versions:
-            return None
-
-        opensearch_versions.sort(key=lambda v: [int(p) for p in v.split('.')])
-        return opensearch_versions[-1]
+        return newest(opensearch_versions)
 
     except Exception as e:
         print_error("opensearch", f"Error fetching Graylog compatibility matrix: {e}")
@@ -1,5 +1,7 @@
+import requests
 import config
 from .base import APIChecker
+from .utils import print_error, run_cached
 
 def get_home_assistant_version(instance, url):
     token = getattr(config, 'HA_TOKENS', {}).get(instance)
@@ -9,4 +11,63 @@ def get_home_assistant_version(instance, url):
     
     checker = APIChecker(instance, url)
     headers = {"Authorization": f"Bearer {token}"}
-    return checker.get_json_api_version("api/config", version_field="version", headers=headers)
\ No newline at end of file
+    return checker.get_json_api_version("api/config", version_field="version", headers=headers)
+
+
+@run_cached
+def _get_update_entities(ha_instance, url):
+    """Every `update.*` entity of one HA instance, from a single /api/states.
+
+    Returns ({entity_id: attributes}, error); cached for the run so all rows
+    mapped to this instance share the one request.
+    """
+    token = getattr(config, 'HA_TOKENS', {}).get(ha_instance)
+    if not token:
+        return None, f"No token configured for Home Assistant {ha_instance}"
+    try:
+        response = requests.get(
+            f"{url.rstrip('/')}/api/states",
+            headers={"Authorization": f"Bearer {token}"},
+            timeout=15,
+        )
+        response.raise_for_status()
+        states = response.json()
+    except Exception as e:
+        return None, f"Error reading Home Assistant {ha_instance} states: {e}"
+    return {
+        s["entity_id"]: s.get("attributes") or {}
+        for s in states
+        if s.get("entity_id", "").startswith("update.")
+    }, None
+
+
+def clear_cache():
+    """Reset the /api/states snapshots. They hold installed versions, so
+    they're dropped before every check outside a check-all too (see
+    CURRENT_CACHE_RESETS)."""
+    _get_update_entities.cache_clear()
+
+
+def get_ha_update_versions(instance, ha_instance, url, entity_id):
+    """{"current_version", "latest_version"} from an HA update entity.
+
+    None when the entity is missing or hasn't reported an installed version
+    (e.g. the device is offline), so the caller can fall back to the row's
+    own checker.
+    """
+    entities, error = _get_update_entities(ha_instance, url)
+    if error:
+        print_error(instance, error)
+        return None
+    attributes = entities.get(entity_id)
+    if attributes is None:
+        print_error(instance, f"{entity_id} not found in Home Assistant {ha_instance}")
+        return None
+    installed = attributes.get("installed_version")
+    if not installed:
+        return None
+    print(f"  {instance}: {entity_id} (Home Assistant {ha_instance})")
+    return {
+        "current_version": str(installed),
+        "latest_version": str(attributes.get("latest_version") or installed),
+    }
@@ -1,58 +1,137 @@
 #!/usr/bin/env python
 
-import subprocess
+import re
+import threading
+import config
+from .probe import start_probe, collect_probe, discard_probe
 
 _STATUS_NO_UPDATE = 'No updates'
 
 
 def is_kernel_only_update(latest_version):
-    # latest_version from get_latest_linux_kernel_version is "N packages" or
+    # latest_version from apt_status_from_probe is "N packages" or
     # "N packages + kernel". Kernel-only means zero real packages with a pending
     # kernel update — nothing for `apt upgrade` to do (the new kernel is held back).
     return (latest_version or "").strip() == "0 packages + kernel"
 
 
-def get_latest_linux_kernel_version(current_kernel, target_host):
-    # Failures return None (status becomes "Current Version"), never
-    # "No updates" — an unreachable host must not look up to date.
-    if not target_host:
-        return None
-    try:
-        return _check_apt_upgradable(target_host, current_kernel)
-    except Exception as e:
-        print(f"  Error checking apt updates: {e}")
-        return None
+# Remote probe sections for the apt check; composed into the same SSH round
+# trip as check_server_status's host facts (see probe.run_probe).
+#
+# Ubuntu delivers kernel updates as new versioned packages installed via the
+# linux-image-generic metapackage — they never appear in apt list --upgradable.
+# We detect them by comparing the metapackage's Depends to the running kernel.
+# RPi kernels upgrade in-place and DO appear in apt list --upgradable.
+APT_TIMEOUT = 60
+
+_APT_LIST = 'apt list --upgradable'
+_APT_KERNEL = (
+    'apt-cache show linux-image-generic '
+    '| grep "^Depends:" | grep -o \'linux-image-[0-9][^, ]*\' | head -1'
+)
+
+# Pending pre-phase refreshes keyed by host (see start_apt_refreshes).
+_refreshes = {}
+_refreshes_lock = threading.Lock()
+
+
+def _apt_update_snippet(max_age_minutes):
+    # apt-get update renames fresh indexes into /var/lib/apt/lists, so the
+    # directory's mtime is the last time an update actually changed anything.
+    update = 'sudo -n apt-get update -q > /dev/null 2>&1'
+    if max_age_minutes <= 0:
+        return update
+    return f'[ -n "$(find /var/lib/apt/lists -maxdepth 0 -mmin -{int(max_age_minutes)})" ] || {update}'
+
+
+def apt_probe_sections(skip_update=False):
+    """Probe sections for the apt check.
+
+    `apt-get update` runs only when the package lists are older than
+    APT_LISTS_MAX_AGE_MINUTES, and not at all when `skip_update` is set
+    (a pre-phase refresh already ran for this host).
+    """
+    listing = _APT_LIST
+    if not skip_update:
+        listing = f"{_apt_update_snippet(config.APT_LISTS_MAX_AGE_MINUTES)}; {_APT_LIST}"
+    return {"apt_upgradable": listing, "apt_kernel": _APT_KERNEL}
+
+
+def start_apt_refreshes(hosts):
+    """Pre-phase for check-all: start `apt-get update` on every host at once.
+
+    The refreshes run in the background while the rest of the run proceeds;
+    check_server_status waits for its host's refresh (wait_for_apt_refresh)
+    and then lists upgradable packages without updating again.
+    """
+    update = _apt_update_snippet(config.APT_LISTS_MAX_AGE_MINUTES)
+    with _refreshes_lock:
+        for host in hosts:
+            if host and host not in _refreshes:
+                _refreshes[host] = start_probe(host, {"apt_refresh": update})
+    print(f"Started apt list refresh on {len(hosts)} host(s)")
+
+
+def wait_for_apt_refresh(host):
+    """Block until the pre-phase refresh for `host` finishes.
+
+    Returns True if there was one (the caller can skip its own update),
+    False if the host had no pending refresh.
+    """
+    with _refreshes_lock:
+        pending = _refreshes.pop(host, None)
+    if pending is None:
+        return False
+    return collect_probe(host, pending, timeout=APT_TIMEOUT) is not None
+
+
+def clear_apt_refreshes():
+    """Kill refreshes nobody collected (e.g. their rows errored out)."""
+    with _refreshes_lock:
+        pending = list(_refreshes.values())
+        _refreshes.clear()
+    for p in pending:
+        discard_probe(p)
 
 
-def _check_apt_upgradable(target_host, current_kernel):
-    print(f"    Checking for apt updates on {target_host}...")
+def _package_lines(facts):
+    return [l for l in facts.get("apt_upgradable", "").splitlines() if l and not l.startswith('Listing')]
 
-    # Ubuntu delivers kernel updates as new versioned packages installed via the
-    # linux-image-generic metapackage — they never appear in apt list --upgradable.
-    # We detect them by comparing the metapackage's Depends to the running kernel.
-    # RPi kernels upgrade in-place and DO appear in apt list --upgradable.
-    remote_cmd = (
-        'sudo -n apt-get update -q > /dev/null 2>&1; '
-        'apt list --upgradable 2>/dev/null; '
-        'echo "===KERNEL==="; '
-        'apt-cache show linux-image-generic 2>/dev/null '
-        '| grep "^Depends:" | grep -o \'linux-image-[0-9][^, ]*\' | head -1'
-    )
 
-    cmd = [
-        'ssh', '-o', 'ConnectTimeout=10', '-o', 'StrictHostKeyChecking=no',
-        target_host, remote_cmd
-    ]
+def parse_upgradable_line(line):
+    """Split an `apt list --upgradable` line into its parts.
+
+    e.g. "curl/jammy-updates 7.81.0-1ubuntu1.16 amd64 [upgradable from: 7.81.0-1ubuntu1.15]"
+    """
+    match = re.match(r'^([^/\s]+)/\S*\s+(\S+)(?:\s+([^\s\[]+))?(?:\s+\[upgradable from: ([^\]]+)\])?', line)
+    if not match:
+        return {"package": line.strip(), "architecture": "", "version": None, "from_version": None}
+    return {
+        "package": match.group(1),
+        "architecture": match.group(3) or "",
+        "version": match.group(2),
+        "from_version": match.group(4),
+    }
+
+
+def upgradable_packages_from_probe(facts):
+    """Parsed package list from the apt sections, or None if they didn't run."""
+    if "apt_upgradable" not in facts:
+        return None
+    return [parse_upgradable_line(l) for l in _package_lines(facts)]
+
 
-    result = subprocess.run(cmd, capture_output=True, text=True, timeout=60)
+def apt_status_from_probe(facts, current_kernel):
+    """Turn the apt probe sections' output into "N packages[ + kernel]".
 
-    if result.returncode != 0:
-        print(f"    apt check on {target_host} failed: {result.stderr.strip()}")
+    Returns None if the apt sections didn't run (e.g. the probe was cut off),
+    never "No updates" — an unreachable host must not look up to date.
+    """
+    if "apt_upgradable" not in facts or "apt_kernel" not in facts:
         return None
 
-    parts = result.stdout.split('===KERNEL===\n', 1)
-    pkg_lines = [l for l in parts[0].splitlines() if l and not l.startswith('Listing')]
-    kernel_section = parts[1].strip() if len(parts) > 1 else ''
+    pkg_lines = _package_lines(facts)
+    kernel_section = facts.get("apt_kernel", "")
 
     count = len(pkg_lines)
     kernel_update = _has_kernel_update(pkg_lines, kernel_section, current_kernel)
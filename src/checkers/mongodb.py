@@ -1,4 +1,5 @@
 from .utils import http_get
+from ..versions import newest
 import re
 import config
 
@@ -29,13 +30,9 @@ def get_mongodb_latest_version():
 
         stable_series = max(series_versions.keys(), key=lambda k: len(series_versions[k]))
 
-        def version_key(v):
-            return tuple(map(int, v.split('.')))
-
         stable_versions = series_versions[stable_series]
-        stable_versions.sort(key=version_key, reverse=True)
 
         print(f"  MongoDB: Found {len(stable_versions)} releases in {stable_series} series (stable)")
-        return stable_versions[0]
+        return newest(stable_versions)
 
     return None
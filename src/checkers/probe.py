@@ -0,0 +1,97 @@
+import subprocess
+from .utils import print_error
+
+SSH_OPTIONS = [
+    "-o", "ConnectTimeout=10",
+    "-o", "BatchMode=yes",
+    "-o", "StrictHostKeyChecking=no",
+]
+
+_BEGIN = "===PROBE:{}==="
+_END = "===PROBE-END==="
+
+
+def build_probe_script(sections):
+    """Compose one remote shell script from named sections.
+
+    Each section runs in its own subshell (so a `cd` or failing command in
+    one can't affect the next) and its stdout is framed by marker lines;
+    stderr is discarded. The script always exits 0, so a non-zero exit from
+    ssh itself means the connection failed, not a section.
+    """
+    parts = []
+    for name, snippet in sections.items():
+        parts.append(f"echo '{_BEGIN.format(name)}'")
+        parts.append(f"( {snippet} ) 2>/dev/null")
+    parts.append(f"echo '{_END}'")
+    return "; ".join(parts)
+
+
+def parse_probe_output(stdout, names):
+    """Split framed probe output back into {section name: stripped text}.
+
+    Sections the script never reached are omitted rather than mapped to "",
+    so callers can tell "ran and printed nothing" from "didn't run".
+    """
+    markers = {_BEGIN.format(name): name for name in names}
+    facts = {}
+    current = None
+    lines = []
+    for line in stdout.splitlines():
+        if line in markers or line == _END:
+            if current is not None:
+                facts[current] = "\n".join(lines).strip()
+            current = markers.get(line)
+            lines = []
+        elif current is not None:
+            lines.append(line)
+    return facts
+
+
+def start_probe(host, sections):
+    """Launch a probe without waiting for it; pass the result to collect_probe.
+
+    Lets a checker overlap the SSH round trip with other work (an API call,
+    another host's probe) without a helper thread.
+    """
+    script = build_probe_script(sections)
+    cmd = ["ssh", *SSH_OPTIONS, host, script]
+    proc = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
+    return proc, tuple(sections)
+
+
+def collect_probe(instance, pending, timeout=15, partial=False):
+    """Wait for a started probe and parse its output.
+
+    Returns {section name: output} or None if the SSH connection itself
+    failed or timed out. With `partial`, a timed-out probe instead returns
+    the sections that finished before it was killed, so a slow late section
+    doesn't cost the earlier ones.
+    """
+    proc, names = pending
+    try:
+        stdout, stderr = proc.communicate(timeout=timeout)
+    except subprocess.TimeoutExpired:
+        proc.kill()
+        stdout, _ = proc.communicate()
+        print_error(instance, f"SSH probe timed out after {timeout}s")
+        return parse_probe_output(stdout or "", names) if partial else None
+
+    if proc.returncode != 0:
+        print_error(instance, f"SSH failed: {stderr.strip()}")
+        return None
+
+    return parse_probe_output(stdout, names)
+
+
+def discard_probe(pending):
+    """Kill and reap a started probe whose result is no longer wanted."""
+    proc, _ = pending
+    if proc.returncode is None:
+        proc.kill()
+        proc.communicate()
+
+
+def run_probe(instance, host, sections, timeout=15, partial=False):
+    """Run every section on `host` over a single SSH round trip."""
+    return collect_probe(instance, start_probe(host, sections), timeout=timeout, partial=partial)
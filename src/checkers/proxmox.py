@@ -3,43 +3,44 @@
 import json
 import re
 import requests
-import subprocess
 import config
+from concurrent.futures import ThreadPoolExecutor
+from .probe import start_probe, collect_probe, discard_probe
+from .utils import run_cached
 
-def get_ceph_version(instance):
+def start_ceph_probe(instance):
+    """Start the `ceph --version` probe, or None if ssh couldn't be launched."""
     try:
-        cmd = [
-            "ssh",
-            "-o", "ConnectTimeout=10",
-            "-o", "BatchMode=yes",
-            "-o", "StrictHostKeyChecking=no",
-            f"root@{instance}",
-            "ceph --version 2>/dev/null"
-        ]
-
-        result = subprocess.run(cmd, capture_output=True, text=True, timeout=15)
-
-        if result.returncode == 0:
-            output = result.stdout.strip()
-            match = re.search(r'ceph version (\d+\.\d+\.\d+)', output)
-            if match:
-                return match.group(1)
-            else:
-                parts = output.split()
-                if len(parts) >= 3 and parts[0] == 'ceph' and parts[1] == 'version':
-                    return parts[2]
-
+        return start_probe(f"root@{instance}", {"ceph": "ceph --version"})
+    except Exception as e:
+        print(f"  Could not start Ceph probe for {instance}: {e}")
         return None
 
-    except subprocess.TimeoutExpired:
-        print(f"  SSH timeout getting Ceph version for {instance}")
+
+def collect_ceph_version(instance, pending):
+    if pending is None:
         return None
-    except Exception as e:
-        print(f"  Error getting Ceph version for {instance}: {e}")
+    facts = collect_probe(instance, pending)
+    if not facts:
         return None
+    output = facts.get("ceph", "")
+    match = re.search(r'ceph version (\d+\.\d+\.\d+)', output)
+    if match:
+        return match.group(1)
+    parts = output.split()
+    if len(parts) >= 3 and parts[0] == 'ceph' and parts[1] == 'version':
+        return parts[2]
+    return None
 
 
-def get_proxmox_version(instance, url):
+def get_ceph_version(instance):
+    return collect_ceph_version(instance, start_ceph_probe(instance))
+
+
+def _get_node_version_direct(instance, url):
+    # The Ceph probe is an SSH round trip of its own; start it now so it
+    # overlaps the API call instead of following it.
+    ceph_probe = start_ceph_probe(instance)
     try:
         api_url = f"{url}/api2/json/version"
         headers = {
@@ -60,7 +61,7 @@ def get_proxmox_version(instance, url):
                     proxmox_version = version_data.get('release')
 
                 if proxmox_version:
-                    ceph_version = get_ceph_version(instance)
+                    ceph_version = collect_ceph_version(instance, ceph_probe)
 
                     if ceph_version:
                         combined_version = f"{proxmox_version} (Ceph {ceph_version})"
@@ -93,53 +94,163 @@ def get_proxmox_version(instance, url):
     except Exception as e:
         print(f"  Error checking Proxmox version for {instance}: {e}")
         return None
+    finally:
+        if ceph_probe is not None:
+            discard_probe(ceph_probe)
 
-def get_proxmox_latest_version(include_ceph=False):
-    try:
-        api_url = f"{config.PROXMOX_APT_VERSIONS_URL}/api2/json/nodes/{config.PROXMOX_APT_VERSIONS_NODE}/apt/versions"
-        headers = {
-            'Authorization': f'PVEAPIToken={config.PROXMOX_API_TOKEN}'
-        }
 
-        response = requests.get(api_url, headers=headers, timeout=10)
+def _api_get(base_url, path):
+    response = requests.get(
+        f"{base_url.rstrip('/')}/api2/json/{path}", headers=_api_headers(), timeout=10
+    )
+    response.raise_for_status()
+    return response.json().get('data')
+
+
+def _api_headers():
+    return {'Authorization': f'PVEAPIToken={config.PROXMOX_API_TOKEN}'}
 
-        if response.status_code == 200:
-            data = response.json()
-            proxmox_latest = None
-
-            for pkg in data.get('data', []):
-                if pkg.get('Package') == 'pve-manager':
-                    proxmox_latest = pkg.get('Version')
-                    break
-
-            if proxmox_latest:
-                if include_ceph:
-                    for pkg in data.get('data', []):
-                        if pkg.get('Package') == 'ceph':
-                            ceph_ver = pkg.get('Version', '')
-                            match = re.match(r'(\d+\.\d+\.\d+)', ceph_ver)
-                            if match:
-                                return f"{proxmox_latest} (Ceph {match.group(1)})"
-                            break
-
-                return proxmox_latest
-
-            print("  pve-manager package not found in APT versions response")
-            return None
 
+def _ceph_versions_by_node(metadata):
+    """{node: "x.y.z"} from /cluster/ceph/metadata.
+
+    Prefers the per-node package version under "node"; falls back to the
+    version reported by any daemon (mon/mgr/osd/mds) running on that host.
+    """
+    versions = {}
+    for node, info in ((metadata or {}).get('node') or {}).items():
+        version = (info or {}).get('version') or {}
+        parts = version.get('parts') if isinstance(version, dict) else None
+        if parts and len(parts) >= 3:
+            versions[node] = '.'.join(str(p) for p in parts[:3])
         else:
-            print(f"  Failed to get latest Proxmox version: HTTP {response.status_code}")
-            return None
+            text = version.get('str', '') if isinstance(version, dict) else str(version)
+            match = re.search(r'(\d+\.\d+\.\d+)', text)
+            if match:
+                versions[node] = match.group(1)
+
+    for daemon_type in ('mon', 'mgr', 'osd', 'mds'):
+        daemons = (metadata or {}).get(daemon_type) or {}
+        for daemon in (daemons.values() if isinstance(daemons, dict) else daemons):
+            hostname = daemon.get('hostname')
+            match = re.search(r'(\d+\.\d+\.\d+)', daemon.get('ceph_version_short') or daemon.get('version') or '')
+            if hostname and match:
+                versions.setdefault(hostname, match.group(1))
+    return versions
+
+
+@run_cached
+def _get_cluster_versions(base_url):
+    """Versions for every node of the cluster reachable through `base_url`.
+
+    One /nodes listing, one /cluster/ceph/metadata call and the per-node
+    /version calls fetched concurrently — instead of an API call plus an SSH
+    session per proxmox row. Returns ({node: {"pve": ..., "ceph": ...,
+    "ceph_error": ...}}, error); cached for the run so every row of the
+    cluster shares it.
+    """
+    try:
+        nodes = [n['node'] for n in _api_get(base_url, 'nodes') or [] if n.get('status', 'online') == 'online']
+    except Exception as e:
+        return None, f"Error listing Proxmox cluster nodes: {e}"
+
+    def _node_version(node):
+        try:
+            data = _api_get(base_url, f'nodes/{node}/version') or {}
+            return node, data.get('version') or data.get('release')
+        except Exception:
+            return node, None
+
+    with ThreadPoolExecutor(max_workers=max(1, len(nodes))) as executor:
+        ceph_future = executor.submit(_api_get, base_url, 'cluster/ceph/metadata')
+        pve_versions = dict(executor.map(_node_version, nodes))
+        try:
+            ceph_versions = _ceph_versions_by_node(ceph_future.result())
+            ceph_error = None
+        except Exception as e:
+            # No Ceph on this cluster, or the token lacks Sys.Audit on
+            # /cluster/ceph: rows fall back to the SSH probe.
+            ceph_versions = {}
+            ceph_error = f"Error reading Proxmox Ceph metadata: {e}"
+
+    return {
+        node: {"pve": pve_versions.get(node), "ceph": ceph_versions.get(node), "ceph_error": ceph_error}
+        for node in nodes
+    }, None
+
+
+def get_proxmox_version(instance, url):
+    cluster, error = _get_cluster_versions(config.PROXMOX_CLUSTER_URL)
+    cluster = cluster or {}
+    node = cluster.get(instance) or cluster.get(instance.split('.', 1)[0]) or {}
+    if not node.get("pve"):
+        # Not reachable through the cluster sweep (or the sweep failed):
+        # ask the node itself.
+        if error:
+            print(f"  {instance}: {error}")
+        return _get_node_version_direct(instance, url)
+
+    ceph_version = node["ceph"]
+    if not ceph_version:
+        # The latest side always includes Ceph, so a bare PVE version would
+        # read as an update; ask the node over SSH like the direct check does.
+        if node["ceph_error"]:
+            print(f"  {instance}: {node['ceph_error']}")
+        ceph_version = get_ceph_version(instance)
+    if ceph_version:
+        print(f"  {instance}: Proxmox {node['pve']}, Ceph {ceph_version}")
+        return f"{node['pve']} (Ceph {ceph_version})"
+    print(f"  {instance}: Proxmox {node['pve']}")
+    return node["pve"]
+
+
+@run_cached
+def _get_apt_versions():
+    """The /apt/versions package list, once per run; (packages, error)."""
+    try:
+        api_url = f"{config.PROXMOX_APT_VERSIONS_URL}/api2/json/nodes/{config.PROXMOX_APT_VERSIONS_NODE}/apt/versions"
+        response = requests.get(api_url, headers=_api_headers(), timeout=10)
+
+        if response.status_code != 200:
+            return None, f"Failed to get latest Proxmox version: HTTP {response.status_code}"
+        return response.json().get('data', []), None
 
     except requests.exceptions.ConnectTimeout:
-        print(f"  Connection timeout getting latest Proxmox version")
-        return None
+        return None, "Connection timeout getting latest Proxmox version"
     except requests.exceptions.ConnectionError:
-        print(f"  Connection error getting latest Proxmox version")
-        return None
+        return None, "Connection error getting latest Proxmox version"
     except json.JSONDecodeError:
-        print(f"  Invalid JSON response from Proxmox API")
-        return None
+        return None, "Invalid JSON response from Proxmox API"
     except Exception as e:
-        print(f"  Error getting latest Proxmox version: {e}")
+        return None, f"Error getting latest Proxmox version: {e}"
+
+
+def clear_cache():
+    """Reset the per-run apt versions lookup (see check_all_applications)."""
+    _get_apt_versions.cache_clear()
+
+
+def clear_cluster_versions():
+    """Reset the cluster sweep: current versions, so it's dropped before
+    every check outside a check-all too (see CURRENT_CACHE_RESETS)."""
+    _get_cluster_versions.cache_clear()
+
+
+def get_proxmox_latest_version(include_ceph=False):
+    packages, error = _get_apt_versions()
+    if error:
+        print(f"  {error}")
         return None
+
+    proxmox_latest = next((pkg.get('Version') for pkg in packages if pkg.get('Package') == 'pve-manager'), None)
+    if not proxmox_latest:
+        print("  pve-manager package not found in APT versions response")
+        return None
+
+    if include_ceph:
+        ceph_ver = next((pkg.get('Version', '') for pkg in packages if pkg.get('Package') == 'ceph'), None)
+        match = re.match(r'(\d+\.\d+\.\d+)', ceph_ver or '')
+        if match:
+            return f"{proxmox_latest} (Ceph {match.group(1)})"
+
+    return proxmox_latest
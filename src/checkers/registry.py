@@ -0,0 +1,118 @@
+import importlib
+import sys
+from urllib.parse import urlparse
+
+import config
+
+
+def lazy(ref):
+    """Callable stand-in for "package.module:function", imported on first call.
+
+    Registering a checker this way doesn't import its module — or the
+    aioesphomeapi/paho/websockets/requests stack behind it — until a row of
+    that type is actually checked, so read-only commands never load them.
+    """
+    module_name, _, attr = ref.partition(":")
+    target = None
+
+    def call(*args, **kwargs):
+        nonlocal target
+        if target is None:
+            target = getattr(importlib.import_module(module_name), attr)
+        return target(*args, **kwargs)
+
+    call.__qualname__ = call.__name__ = ref
+    return call
+
+
+def call_if_imported(refs):
+    """Call each "module:function" whose module is already loaded.
+
+    For run-scoped resets and cleanups: a checker module nobody imported has
+    no state to reset, and importing it just to reset it would defeat lazy().
+    """
+    for ref in refs:
+        module_name, _, attr = ref.partition(":")
+        module = sys.modules.get(module_name)
+        if module is not None:
+            getattr(module, attr)()
+
+
+def target_host(app_data):
+    """Host part of the row's Target (a URL or a bare hostname), else its instance."""
+    target = app_data.get("Target") or ""
+    return urlparse(target).hostname or target or app_data.get("Instance", "")
+
+
+def resolve_update_entity(app_name, instance):
+    """(ha_instance, entity_id) mapped to this row by HA_UPDATE_ENTITIES, or None.
+
+    A plain config lookup, kept here rather than in the home_assistant
+    checker so planning a run doesn't import requests.
+
+    "name:instance" keys take precedence over a bare "name"; `{instance}`
+    in the entity id is replaced by the row's instance.
+    """
+    mapping = getattr(config, 'HA_UPDATE_ENTITIES', {})
+    target = mapping.get(f"{app_name}:{instance}") or mapping.get(app_name)
+    if not target or ":" not in target:
+        return None
+    ha_instance, entity_id = target.split(":", 1)
+    return ha_instance, entity_id.replace("{instance}", instance)
+
+
+class Checker:
+    """Current-version checker for one application type.
+
+    Called with one row's PascalCase app_data dict, like a plain checker
+    function. A checker that can share work across rows also declares
+    `batch(rows)` and `group_key(app_data)`: check-all calls `batch` once per
+    group of rows with equal keys (same kubectl context, same broker, ...)
+    before any of those rows is checked, and each row's own `check` then
+    reads what the batch fetched instead of fetching it again.
+
+    Batch methods run outside the rows' buffered output, so they must not
+    print; if one fails, its rows simply fetch for themselves.
+
+    The remaining fields describe the check for the planner (src/planner.py):
+    `transport` (http, kubectl, ssh, mqtt, esphome, local), `resource_key`
+    (the host, context or broker it talks to), `cost` (typical seconds for
+    one row, `batch_cost` for the group's batch), `idempotent` (False if the
+    check changes state on the target, e.g. `apt-get update`) and `ttl`
+    (seconds a result stays fresh enough to skip with --skip-fresh; 0 never).
+    """
+
+    def __init__(
+        self, check, batch=None, group_key=None, transport="http", resource_key=target_host,
+        cost=1.0, batch_cost=None, idempotent=True, ttl=0,
+    ):
+        self.check = check
+        self.batch = batch
+        self.group_key = group_key or (lambda app_data: None)
+        self.transport = transport
+        self.resource_key = resource_key
+        self.cost = cost
+        self.batch_cost = cost if batch_cost is None else batch_cost
+        self.idempotent = idempotent
+        self.ttl = ttl
+
+    def __call__(self, app_data):
+        return self.check(app_data)
+
+
+def batch_groups(rows, checker_for):
+    """Group (idx, app_data) rows by batch method and group key.
+
+    `checker_for(app_data)` returns the row's Checker (or None). Returns
+    {(batch, key): [idx, ...]}; rows whose checker has no batch method are
+    left out. Different apps sharing a batch method (all the ESPHome
+    devices, all the kubectl checkers) land in the same group.
+    """
+    groups = {}
+    for idx, app_data in rows:
+        checker = checker_for(app_data)
+        batch = getattr(checker, "batch", None)
+        if batch is None:
+            continue
+        groups.setdefault((batch, checker.group_key(app_data)), []).append(idx)
+    return groups
@@ -1,55 +1,59 @@
-import subprocess
 from .utils import print_error
-from .linux_kernel import get_latest_linux_kernel_version
+from .linux_kernel import (
+    APT_TIMEOUT,
+    apt_probe_sections,
+    apt_status_from_probe,
+    upgradable_packages_from_probe,
+    wait_for_apt_refresh,
+)
+from .probe import run_probe
+
+# Host facts and the apt check travel in one SSH round trip; the apt update
+# dominates, hence the apt-sized timeout. The host facts run first, so if apt
+# stalls past the timeout the row still gets its current version and only
+# the latest (apt) side is lost.
+HOST_PROBE_SECTIONS = {
+    "hostname": "hostname",
+    "kernel": "uname -r",
+    "os": '. /etc/os-release && echo "$PRETTY_NAME"',
+}
 
 
 def check_server_status(instance, target):
     try:
-        cmd = [
-            "ssh",
-            "-o", "ConnectTimeout=10",
-            "-o", "BatchMode=yes",
-            "-o", "StrictHostKeyChecking=no",
-            instance,
-            'hostname && uname -r && . /etc/os-release && echo "$PRETTY_NAME"',
-        ]
-
-        result = subprocess.run(cmd, capture_output=True, text=True, timeout=15)
-
-        if result.returncode == 0:
-            lines = result.stdout.strip().split("\n")
-            if len(lines) >= 3:
-                hostname = lines[0].strip()
-                kernel = lines[1].strip()
-                pretty_name = lines[2].strip().strip('"')
-
-                linux_info = f"{hostname} │ {kernel} │ {pretty_name}"
-                print(f"  {instance}: {linux_info}")
-
-                latest_kernel = get_latest_linux_kernel_version(kernel, instance)
-
-                current_version = f"{pretty_name} - {kernel}"
-                latest_version = latest_kernel
-
-                return {
-                    "current_version": current_version,
-                    "latest_version": latest_version,
-                    "hostname": hostname,
-                    "kernel": kernel,
-                    "latest_kernel": latest_kernel,
-                    "os_name": pretty_name,
-                    "display_info": linux_info,
-                }
-            else:
-                print_error(instance, "Incomplete system information")
-                return None
-        else:
-            print_error(instance, f"SSH failed: {result.stderr.strip()}")
+        refreshed = wait_for_apt_refresh(instance)
+        print(f"    Checking for apt updates on {instance}...")
+        sections = {**HOST_PROBE_SECTIONS, **apt_probe_sections(skip_update=refreshed)}
+        facts = run_probe(instance, instance, sections, timeout=APT_TIMEOUT, partial=True)
+        if facts is None:
             return None
 
-    except subprocess.TimeoutExpired:
-        print_error(instance, "SSH timeout")
-        return None
+        hostname = facts.get("hostname", "")
+        kernel = facts.get("kernel", "")
+        pretty_name = facts.get("os", "").strip('"')
+        if not (hostname and kernel and pretty_name):
+            print_error(instance, "Incomplete system information")
+            return None
+
+        linux_info = f"{hostname} │ {kernel} │ {pretty_name}"
+        print(f"  {instance}: {linux_info}")
+
+        latest_kernel = apt_status_from_probe(facts, kernel)
+
+        current_version = f"{pretty_name} - {kernel}"
+        latest_version = latest_kernel
+
+        return {
+            "current_version": current_version,
+            "latest_version": latest_version,
+            "hostname": hostname,
+            "kernel": kernel,
+            "latest_kernel": latest_kernel,
+            "os_name": pretty_name,
+            "display_info": linux_info,
+            "upgradable_packages": upgradable_packages_from_probe(facts),
+        }
+
     except Exception as e:
         print_error(instance, f"SSH error: {e}")
         return None
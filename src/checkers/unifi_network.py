@@ -1,68 +1,129 @@
+import json
 import requests
-from .utils import print_error, handle_generic_error
+from .utils import print_error, handle_generic_error, run_cached
 import config
 
 
 GRAPHQL_URL = "https://community.svc.ui.com/graphql"
 GRAPHQL_HEADERS = {"Content-Type": "application/json"}
 
+# Release titles tracked on the community site; all are resolved by one
+# aliased GraphQL request per run.
+NETWORK_RELEASE_TITLE = "UniFi Network Application"
+OS_SERVER_RELEASE_TITLE = "UniFi OS Server"
+TRACKED_RELEASE_TITLES = (NETWORK_RELEASE_TITLE, OS_SERVER_RELEASE_TITLE)
 
-def _get_latest_community_version(title):
-    query = '{"query":"query { releases(limit: 20, searchTerm: \\"' + title + '\\") { items { title slug } } }"}'
+
+def _releases_query(titles):
+    # json.dumps yields a correctly escaped GraphQL string literal.
+    fields = " ".join(
+        f"r{i}: releases(limit: 20, searchTerm: {json.dumps(title)}) {{ items {{ title slug }} }}"
+        for i, title in enumerate(titles)
+    )
+    return f"query {{ {fields} }}"
+
+
+def _version_from_slug(title, items):
+    match = next((item for item in items if item["title"] == title), None)
+    if not match:
+        return None
+    slug = match["slug"]
+    prefix = title.replace(" ", "-") + "-"
+    version_hyphenated = slug[len(prefix):]
+    return version_hyphenated.replace("-", ".")
+
+
+@run_cached
+def _get_latest_community_versions():
     try:
-        response = requests.post(GRAPHQL_URL, data=query, headers=GRAPHQL_HEADERS, timeout=15)
+        response = requests.post(
+            GRAPHQL_URL, json={"query": _releases_query(TRACKED_RELEASE_TITLES)},
+            headers=GRAPHQL_HEADERS, timeout=15,
+        )
         response.raise_for_status()
-        items = response.json()["data"]["releases"]["items"]
-        match = next((item for item in items if item["title"] == title), None)
-        if not match:
-            return None
-        slug = match["slug"]
-        prefix = title.replace(" ", "-") + "-"
-        version_hyphenated = slug[len(prefix):]
-        return version_hyphenated.replace("-", ".")
+        data = response.json()["data"]
     except Exception:
-        return None
+        return {}
+    return {
+        title: _version_from_slug(title, (data.get(f"r{i}") or {}).get("items", []))
+        for i, title in enumerate(TRACKED_RELEASE_TITLES)
+    }
 
 
 def get_unifi_network_latest_version():
-    return _get_latest_community_version("UniFi Network Application")
+    return _get_latest_community_versions().get(NETWORK_RELEASE_TITLE)
 
 
 def get_unifi_os_server_latest_version():
-    return _get_latest_community_version("UniFi OS Server")
+    return _get_latest_community_versions().get(OS_SERVER_RELEASE_TITLE)
 
 
 UOS_HOST_ID = "fc90f597-c8fb-40f8-b6da-7efa1147cb70"
 
 
-def get_ui_network_version(instance, url):
-    # The uos instance tracks the UniFi OS Server firmware; every other
-    # instance tracks the Network Application version.
-    if instance == "uos":
-        return get_unifi_os_server_version(instance, url)
-    return get_unifi_network_version(instance, url)
-
-
-def get_unifi_os_server_version(instance, url):
-    if not config.UNIFI_NETWORK_API_KEY:
-        print_error(instance, "No UniFi Network API key configured")
-        return None
+@run_cached
+def _get_hosts_by_id():
+    """One download of the cloud hosts list per run, indexed by host id.
 
+    Returns (hosts_by_id, error); the error is reported by every instance
+    that asks, not just the one whose worker happened to fetch.
+    """
     headers = {
         "X-API-KEY": config.UNIFI_NETWORK_API_KEY,
         "Accept": "application/json",
     }
-
     try:
         response = requests.get("https://api.ui.com/v1/hosts", headers=headers, timeout=15)
         response.raise_for_status()
-
         api_response = response.json()
-        hosts_data = api_response['data'] if isinstance(api_response, dict) and 'data' in api_response else api_response
+    except requests.exceptions.RequestException as e:
+        return None, f"UniFi cloud API error: {str(e)}"
+    except Exception as e:
+        return None, f"Error during cloud API call: {e}"
+
+    hosts_data = api_response['data'] if isinstance(api_response, dict) and 'data' in api_response else api_response
+    return {h.get('id'): h for h in hosts_data}, None
+
+
+def clear_cache():
+    """Reset the per-run community releases lookup (see check_all_applications)."""
+    _get_latest_community_versions.cache_clear()
+
+
+def clear_hosts():
+    """Reset the hosts snapshot: current versions, so it's dropped before
+    every check outside a check-all too (see CURRENT_CACHE_RESETS)."""
+    _get_hosts_by_id.cache_clear()
+
+
+def _get_host(instance, host_id, label):
+    if not config.UNIFI_NETWORK_API_KEY:
+        print_error(instance, "No UniFi Network API key configured")
+        return None
+
+    hosts, error = _get_hosts_by_id()
+    if error:
+        print_error(instance, error)
+        return None
+
+    host = hosts.get(host_id)
+    if not host:
+        print_error(instance, f"{label} {host_id} not found in cloud API")
+    return host
 
-        host = next((h for h in hosts_data if h.get('id') == UOS_HOST_ID), None)
+
+def get_ui_network_version(instance, url):
+    # The uos instance tracks the UniFi OS Server firmware; every other
+    # instance tracks the Network Application version.
+    if instance == "uos":
+        return get_unifi_os_server_version(instance, url)
+    return get_unifi_network_version(instance, url)
+
+
+def get_unifi_os_server_version(instance, url):
+    try:
+        host = _get_host(instance, UOS_HOST_ID, "UniFi OS Server host")
         if not host:
-            print_error(instance, f"UniFi OS Server host {UOS_HOST_ID} not found in cloud API")
             return None
 
         firmware_version = (
@@ -77,33 +138,14 @@ def get_unifi_os_server_version(instance, url):
         print_error(instance, "firmwareVersion not found in reportedState.hardware")
         return None
 
-    except requests.exceptions.RequestException as e:
-        print_error(instance, f"UniFi cloud API error: {str(e)}")
-        return None
     except Exception as e:
         return handle_generic_error(instance, str(e), "cloud API call")
 
 
 def get_unifi_network_version(instance, url):
-    if not config.UNIFI_NETWORK_API_KEY:
-        print_error(instance, "No UniFi Network API key configured")
-        return None
-
-    headers = {
-        "X-API-KEY": config.UNIFI_NETWORK_API_KEY,
-        "Accept": "application/json",
-    }
-
     try:
-        response = requests.get("https://api.ui.com/v1/hosts", headers=headers, timeout=15)
-        response.raise_for_status()
-
-        api_response = response.json()
-        hosts_data = api_response['data'] if isinstance(api_response, dict) and 'data' in api_response else api_response
-
-        host = next((h for h in hosts_data if h.get('id') == UOS_HOST_ID), None)
+        host = _get_host(instance, UOS_HOST_ID, "UniFi host")
         if not host:
-            print_error(instance, f"UniFi host {UOS_HOST_ID} not found in cloud API")
             return None
 
         controllers = host.get('reportedState', {}).get('controllers', [])
@@ -119,8 +161,5 @@ def get_unifi_network_version(instance, url):
         print_error(instance, "version not found in network controller")
         return None
 
-    except requests.exceptions.RequestException as e:
-        print_error(instance, f"UniFi cloud API error: {str(e)}")
-        return None
     except Exception as e:
         return handle_generic_error(instance, str(e), "cloud API call")
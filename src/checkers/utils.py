@@ -2,6 +2,8 @@ import requests
 import re
 import json
 import subprocess
+import threading
+from functools import wraps
 
 
 def http_get(url, auth=None, headers=None, timeout=10):
@@ -13,6 +15,39 @@ def http_get(url, auth=None, headers=None, timeout=10):
         return None
 
 
+def run_cached(func):
+    """Memoize `func` per argument tuple until cache_clear(), like lru_cache,
+    but single-flight: concurrent workers asking for the same arguments wait
+    for the first call instead of each issuing their own request. Meant for
+    per-run snapshots shared by many rows (cleared at each check-all start).
+    """
+    lock = threading.Lock()
+    entries = {}
+
+    @wraps(func)
+    def wrapper(*args):
+        with lock:
+            entry = entries.get(args)
+            owner = entry is None
+            if owner:
+                entry = entries[args] = {"done": threading.Event(), "value": None}
+        if owner:
+            try:
+                entry["value"] = func(*args)
+            finally:
+                entry["done"].set()
+        else:
+            entry["done"].wait()
+        return entry["value"]
+
+    def cache_clear():
+        with lock:
+            entries.clear()
+
+    wrapper.cache_clear = cache_clear
+    return wrapper
+
+
 def print_error(instance, message):
     print(f"  {instance}: {message}")
 
@@ -1,5 +1,5 @@
 from .base import KubernetesChecker
-import subprocess
+from .probe import run_probe
 from .utils import print_error
 
 
@@ -59,60 +59,49 @@ def get_wyoming_whisper_version(instance, namespace):
     return None
 
 
+# Every known install layout is probed in one SSH round trip; sections are
+# consulted in this order and the first that yields a version wins.
+SATELLITE_PROBE_SECTIONS = {
+    "pip": "pip3 show wyoming-satellite || pip show wyoming-satellite",
+    "git": (
+        "cd /opt/wyoming-satellite && git describe --tags "
+        "|| cd ~/wyoming-satellite && git describe --tags"
+    ),
+    "venv_pip": "/opt/wyoming-satellite/venv/bin/pip show wyoming-satellite",
+    "module": (
+        '/opt/wyoming-satellite/venv/bin/python -c "import wyoming_satellite; print(wyoming_satellite.__version__)" '
+        '|| python3 -c "import wyoming_satellite; print(wyoming_satellite.__version__)"'
+    ),
+}
+
+
+def _pip_show_version(output):
+    for line in output.split('\n'):
+        if line.startswith('Version:'):
+            version = line.split(':', 1)[1].strip()
+            if version:
+                return version
+    return None
+
+
 def get_wyoming_satellite_version(instance, host):
     try:
-        result = subprocess.run([
-            'ssh', host,
-            'pip3 show wyoming-satellite 2>/dev/null | grep Version: || pip show wyoming-satellite 2>/dev/null | grep Version:'
-        ], capture_output=True, text=True, timeout=15)
-
-        if result.returncode == 0 and result.stdout.strip():
-            for line in result.stdout.strip().split('\n'):
-                if line.startswith('Version:'):
-                    version = line.split(':', 1)[1].strip()
-                    if version:
-                        return version
-
-        result = subprocess.run([
-            'ssh', host,
-            'cd /opt/wyoming-satellite 2>/dev/null && git describe --tags 2>/dev/null || cd ~/wyoming-satellite 2>/dev/null && git describe --tags 2>/dev/null || echo "No git repo"'
-        ], capture_output=True, text=True, timeout=15)
-
-        if result.returncode == 0 and result.stdout.strip() and 'No git repo' not in result.stdout:
-            version = result.stdout.strip()
-            if version.startswith('v'):
-                version = version[1:]
+        facts = run_probe(instance, host, SATELLITE_PROBE_SECTIONS)
+        if facts is None:
+            return None
+
+        version = (
+            _pip_show_version(facts.get("pip", ""))
+            or facts.get("git", "").removeprefix('v')
+            or _pip_show_version(facts.get("venv_pip", ""))
+            or facts.get("module", "")
+        )
+        if version:
             return version
 
-        result = subprocess.run([
-            'ssh', host,
-            '/opt/wyoming-satellite/venv/bin/pip show wyoming-satellite 2>/dev/null | grep Version: || echo "Not found"'
-        ], capture_output=True, text=True, timeout=15)
-
-        if result.returncode == 0 and result.stdout.strip() and 'Not found' not in result.stdout:
-            for line in result.stdout.strip().split('\n'):
-                if line.startswith('Version:'):
-                    version = line.split(':', 1)[1].strip()
-                    if version:
-                        return version
-
-        result = subprocess.run([
-            'ssh', host,
-            '/opt/wyoming-satellite/venv/bin/python -c "import wyoming_satellite; print(wyoming_satellite.__version__)" 2>/dev/null || python3 -c "import wyoming_satellite; print(wyoming_satellite.__version__)" 2>/dev/null || echo "Not found"'
-        ], capture_output=True, text=True, timeout=15)
-
-        if result.returncode == 0 and result.stdout.strip() and 'Not found' not in result.stdout:
-            return result.stdout.strip()
-
         print_error(instance, "Unable to determine Wyoming Satellite version")
         return None
 
-    except subprocess.TimeoutExpired:
-        print_error(instance, "SSH command timed out")
-        return None
-    except subprocess.SubprocessError as e:
-        print_error(instance, f"SSH command failed: {e}")
-        return None
     except Exception as e:
         print_error(instance, f"Error getting Wyoming Satellite version: {e}")
         return None
@@ -1,32 +1,125 @@
 import json
+import os
+import threading
 import time
 import paho.mqtt.client as paho
 import config
 
-def get_zigbee2mqtt_version(instance):
+# Ceiling on how long one instance waits for its retained bridge/info
+# message; in practice it arrives within milliseconds of subscribing.
+BRIDGE_INFO_TIMEOUT = 5
+
+
+class _BridgeInfoSession:
+    """One broker connection subscribed to every instance's bridge/info.
+
+    bridge/info is retained, so the broker replays each instance's latest
+    message as soon as the wildcard subscription lands; each instance's
+    check returns the moment its own message has arrived.
+    """
+
+    def __init__(self):
+        self._client = paho.Client(paho.CallbackAPIVersion.VERSION2, f"version_manager_{os.getpid()}")
+        self._client.username_pw_set(username=config.MQTT_USERNAME, password=config.MQTT_PASSWORD)
+        self._client.on_connect = self._on_connect
+        self._client.on_message = self._on_message
+        self._connected = threading.Event()
+        self._lock = threading.Lock()
+        self._results = {}
+        self._arrived = {}
+        self._nested_topics = set()
+
+    def start(self):
+        self._client.connect(config.MQTT_BROKER)
+        self._client.loop_start()
+
+    def close(self):
+        self._client.disconnect()
+        self._client.loop_stop()
+
+    def _on_connect(self, client, userdata, flags, reason_code, properties):
+        # Under the lock, so subscribe() either sees the connection or has
+        # its topics picked up here.
+        with self._lock:
+            nested = sorted(self._nested_topics)
+            self._connected.set()
+        client.subscribe([("+/bridge/info", 0)] + [(f"{t}/bridge/info", 0) for t in nested])
+
+    def subscribe(self, instances):
+        """Add subscriptions for base topics the wildcard doesn't reach."""
+        # The wildcard only spans one topic level.
+        nested = {instance for instance in instances if "/" in instance}
+        with self._lock:
+            nested -= self._nested_topics
+            self._nested_topics |= nested
+            connected = self._connected.is_set()
+        if nested and connected:
+            self._client.subscribe([(f"{t}/bridge/info", 0) for t in sorted(nested)])
+
+    def _event(self, base_topic):
+        with self._lock:
+            return self._arrived.setdefault(base_topic, threading.Event())
+
+    def _on_message(self, client, userdata, message):
+        base_topic = message.topic.removesuffix("/bridge/info")
+        # Parse errors are stored, not printed: this runs on paho's network
+        # thread, outside the checking worker's buffered output.
+        try:
+            result = (json.loads(message.payload.decode()).get("version"), None)
+        except Exception as e:
+            result = (None, f"Error parsing MQTT message - {e}")
+        with self._lock:
+            self._results[base_topic] = result
+        self._event(base_topic).set()
+
+    def wait_for_version(self, instance, timeout):
+        """(version, error) from `instance`'s bridge/info, waiting at most `timeout`."""
+        deadline = time.monotonic() + timeout
+        if not self._connected.wait(timeout):
+            return None, f"MQTT connection not established within {timeout}s"
+        self.subscribe([instance])
+        if not self._event(instance).wait(max(0.0, deadline - time.monotonic())):
+            return None, f"No bridge/info message within {timeout}s"
+        with self._lock:
+            return self._results[instance]
+
+
+_session = None
+_session_lock = threading.Lock()
+
+
+def _get_session():
+    global _session
+    with _session_lock:
+        if _session is None:
+            session = _BridgeInfoSession()
+            session.start()
+            _session = session
+        return _session
+
+
+def close_session():
+    """Disconnect the shared client (see check_all_applications)."""
+    global _session
+    with _session_lock:
+        session, _session = _session, None
+    if session is not None:
+        session.close()
+
+
+def open_session(instances=()):
+    """Connect the shared client and subscribe to every given base topic up
+    front — the zigbee2mqtt checkers' batch method, so retained messages are
+    already arriving by the time the rows are checked."""
+    _get_session().subscribe(instances)
+
+
+def get_zigbee2mqtt_version(instance, timeout=BRIDGE_INFO_TIMEOUT):
     try:
-        current_version = None
-        
-        def on_message(client, userdata, message):
-            nonlocal current_version
-            try:
-                data = json.loads(message.payload.decode())
-                current_version = data.get("version")
-            except Exception as e:
-                print(f"  {instance}: Error parsing MQTT message - {e}")
-        
-        client = paho.Client(paho.CallbackAPIVersion.VERSION2, f"version_manager_{instance}")
-        client.username_pw_set(username=config.MQTT_USERNAME, password=config.MQTT_PASSWORD)
-        client.on_message = on_message
-        
-        client.connect(config.MQTT_BROKER)
-        client.loop_start()
-        client.subscribe([(f"{instance}/bridge/info", 0)])
-        time.sleep(2)  # Wait for message
-        client.disconnect()
-        client.loop_stop()
-        
+        current_version, error = _get_session().wait_for_version(instance, timeout)
+        if error:
+            print(f"  {instance}: {error}")
         return current_version
     except Exception as e:
         print(f"  {instance}: Error getting version - {e}")
-        return None
\ No newline at end of file
+        return None
@@ -1,8 +1,50 @@
 import sqlite3
 from pathlib import Path
 
+from src.versions import stored_key, version_lag
+
+# Bumped whenever init_db gains a migration; stored in PRAGMA user_version.
+SCHEMA_VERSION = 3
+
+# Per-check state, rewritten by every check. It lives in the narrow app_state
+# table, apart from the configuration in app_config, so a check-all's writes
+# touch small rows. The `applications` view joins the two back into the
+# original single-table shape, including inserts, updates and deletes.
+APP_STATE_COLUMNS = (
+    "current_version",
+    "latest_version",
+    "status",
+    "last_checked",
+    "last_upgraded",
+    "current_library_version",
+    "latest_library_version",
+)
+
+# Derived from current_version/latest_version by VersionManager.bulk_update
+# (see src/versions.py): sortable version keys and how far behind current
+# is, so lag queries run in SQL. NULL where a value isn't a version.
+VERSION_KEY_COLUMNS = ("current_key", "latest_key", "lag_major", "lag_minor", "lag_patch")
+
+APP_STATE_TABLE = """
+CREATE TABLE IF NOT EXISTS app_state (
+    application_id INTEGER PRIMARY KEY REFERENCES app_config(id),
+    current_version TEXT,
+    latest_version TEXT,
+    status TEXT,
+    last_checked TEXT,
+    last_upgraded TEXT,
+    current_library_version TEXT,
+    latest_library_version TEXT,
+    current_key TEXT,
+    latest_key TEXT,
+    lag_major INTEGER,
+    lag_minor INTEGER,
+    lag_patch INTEGER
+);
+"""
+
 SCHEMA = """
-CREATE TABLE IF NOT EXISTS applications (
+CREATE TABLE IF NOT EXISTS app_config (
     id INTEGER PRIMARY KEY AUTOINCREMENT,
     name TEXT NOT NULL,
     instance TEXT NOT NULL,
@@ -17,25 +59,70 @@ CREATE TABLE IF NOT EXISTS applications (
     esphome_key TEXT,
     github TEXT,
     dockerhub TEXT,
-    current_version TEXT,
-    latest_version TEXT,
-    status TEXT,
-    last_checked TEXT,
-    last_upgraded TEXT,
     check_current TEXT,
     check_latest TEXT,
     helm_values_file TEXT,
     extra_manifests TEXT,
     library_github TEXT,
-    current_library_version TEXT,
-    latest_library_version TEXT,
     notes TEXT,
     UNIQUE(name, instance)
 );
+""" + APP_STATE_TABLE + """
+-- Serves the --summary/--updates listings (rows by status).
+CREATE INDEX IF NOT EXISTS idx_app_state_status ON app_state(status);
+-- Serves --behind and the TUI's lag ordering (most behind first).
+CREATE INDEX IF NOT EXISTS idx_app_state_lag ON app_state(lag_major, lag_minor, lag_patch);
+
+CREATE VIEW IF NOT EXISTS applications AS
+SELECT c.id, c.name, c.instance, c.enabled, c.context, c.namespace, c.type, c.category,
+       c.version_pin, c.upgrade, c.target, c.esphome_key, c.github, c.dockerhub,
+       s.current_version, s.latest_version, s.status, s.last_checked, s.last_upgraded,
+       c.check_current, c.check_latest, c.helm_values_file, c.extra_manifests, c.library_github,
+       s.current_library_version, s.latest_library_version, c.notes,
+       s.current_key, s.latest_key, s.lag_major, s.lag_minor, s.lag_patch
+FROM app_config c LEFT JOIN app_state s ON s.application_id = c.id;
+
+CREATE TRIGGER IF NOT EXISTS applications_insert INSTEAD OF INSERT ON applications BEGIN
+    INSERT INTO app_config (id, name, instance, enabled, context, namespace, type, category,
+        version_pin, upgrade, target, esphome_key, github, dockerhub, check_current, check_latest,
+        helm_values_file, extra_manifests, library_github, notes)
+    VALUES (NEW.id, NEW.name, NEW.instance, COALESCE(NEW.enabled, 1), NEW.context, NEW.namespace,
+        NEW.type, NEW.category, NEW.version_pin, NEW.upgrade, NEW.target, NEW.esphome_key,
+        NEW.github, NEW.dockerhub, NEW.check_current, NEW.check_latest, NEW.helm_values_file,
+        NEW.extra_manifests, NEW.library_github, NEW.notes);
+    INSERT INTO app_state (application_id, current_version, latest_version, status, last_checked,
+        last_upgraded, current_library_version, latest_library_version,
+        current_key, latest_key, lag_major, lag_minor, lag_patch)
+    VALUES (last_insert_rowid(), NEW.current_version, NEW.latest_version, NEW.status,
+        NEW.last_checked, NEW.last_upgraded, NEW.current_library_version, NEW.latest_library_version,
+        NEW.current_key, NEW.latest_key, NEW.lag_major, NEW.lag_minor, NEW.lag_patch);
+END;
+
+CREATE TRIGGER IF NOT EXISTS applications_update INSTEAD OF UPDATE ON applications BEGIN
+    UPDATE app_config SET name = NEW.name, instance = NEW.instance, enabled = NEW.enabled,
+        context = NEW.context, namespace = NEW.namespace, type = NEW.type, category = NEW.category,
+        version_pin = NEW.version_pin, upgrade = NEW.upgrade, target = NEW.target,
+        esphome_key = NEW.esphome_key, github = NEW.github, dockerhub = NEW.dockerhub,
+        check_current = NEW.check_current, check_latest = NEW.check_latest,
+        helm_values_file = NEW.helm_values_file, extra_manifests = NEW.extra_manifests,
+        library_github = NEW.library_github, notes = NEW.notes
+    WHERE id = OLD.id;
+    INSERT OR REPLACE INTO app_state (application_id, current_version, latest_version, status,
+        last_checked, last_upgraded, current_library_version, latest_library_version,
+        current_key, latest_key, lag_major, lag_minor, lag_patch)
+    VALUES (OLD.id, NEW.current_version, NEW.latest_version, NEW.status, NEW.last_checked,
+        NEW.last_upgraded, NEW.current_library_version, NEW.latest_library_version,
+        NEW.current_key, NEW.latest_key, NEW.lag_major, NEW.lag_minor, NEW.lag_patch);
+END;
+
+CREATE TRIGGER IF NOT EXISTS applications_delete INSTEAD OF DELETE ON applications BEGIN
+    DELETE FROM app_state WHERE application_id = OLD.id;
+    DELETE FROM app_config WHERE id = OLD.id;
+END;
 
 CREATE TABLE IF NOT EXISTS transactions (
     id INTEGER PRIMARY KEY AUTOINCREMENT,
-    application_id INTEGER REFERENCES applications(id),
+    application_id INTEGER REFERENCES app_config(id),
     name TEXT NOT NULL,
     instance TEXT NOT NULL,
     upgrade_method TEXT,
@@ -46,20 +133,215 @@ CREATE TABLE IF NOT EXISTS transactions (
 );
 
 CREATE INDEX IF NOT EXISTS idx_transactions_timestamp ON transactions(timestamp);
+-- Exact (case-insensitive) name/instance history filters.
+CREATE INDEX IF NOT EXISTS idx_transactions_name_instance
+    ON transactions(lower(name), lower(instance), timestamp);
+
+-- Upgradable apt packages per ssh_apt host as of its last check; replaced
+-- wholesale on every check so the TUI can drill in without an SSH session.
+-- Keyed by architecture too: multi-arch hosts list libc6 amd64 and i386.
+CREATE TABLE IF NOT EXISTS upgradable_packages (
+    application_id INTEGER NOT NULL REFERENCES app_config(id),
+    package TEXT NOT NULL,
+    architecture TEXT NOT NULL DEFAULT '',
+    version TEXT,
+    from_version TEXT,
+    PRIMARY KEY (application_id, package, architecture)
+);
+
+-- One row per check per run (append-only): how long each phase took, how it
+-- went and what it saw. Rows past their retention are folded into
+-- check_rollups (see VersionManager.prune_check_log).
+CREATE TABLE IF NOT EXISTS checks (
+    id INTEGER PRIMARY KEY,
+    run_id INTEGER NOT NULL,
+    application_id INTEGER NOT NULL REFERENCES app_config(id),
+    started_at TEXT NOT NULL,
+    transport TEXT,
+    outcome TEXT NOT NULL,
+    current_ms INTEGER,
+    latest_ms INTEGER,
+    write_ms INTEGER,
+    current_version TEXT,
+    latest_version TEXT
+);
+
+CREATE INDEX IF NOT EXISTS idx_checks_application ON checks(application_id, started_at);
+CREATE INDEX IF NOT EXISTS idx_checks_started ON checks(started_at);
+
+-- Daily per-application totals of pruned checks rows.
+CREATE TABLE IF NOT EXISTS check_rollups (
+    application_id INTEGER NOT NULL REFERENCES app_config(id),
+    day TEXT NOT NULL,
+    checks INTEGER NOT NULL,
+    failures INTEGER NOT NULL,
+    total_ms INTEGER NOT NULL,
+    max_ms INTEGER NOT NULL,
+    PRIMARY KEY (application_id, day)
+) WITHOUT ROWID;
 """
 
+# Substring search over the history (see VersionManager.get_transaction_history):
+# a trigram full-text index kept in step with `transactions` by triggers.
+# Created, and filled from any existing rows, only if missing.
+HISTORY_SEARCH_SCHEMA = """
+BEGIN;
+CREATE VIRTUAL TABLE transactions_fts USING fts5(
+    name, instance, upgrade_method, detail,
+    content='transactions', content_rowid='id', tokenize='trigram'
+);
+CREATE TRIGGER transactions_fts_insert AFTER INSERT ON transactions BEGIN
+    INSERT INTO transactions_fts(rowid, name, instance, upgrade_method, detail)
+    VALUES (new.id, new.name, new.instance, new.upgrade_method, new.detail);
+END;
+CREATE TRIGGER transactions_fts_delete AFTER DELETE ON transactions BEGIN
+    INSERT INTO transactions_fts(transactions_fts, rowid, name, instance, upgrade_method, detail)
+    VALUES ('delete', old.id, old.name, old.instance, old.upgrade_method, old.detail);
+END;
+CREATE TRIGGER transactions_fts_update AFTER UPDATE ON transactions BEGIN
+    INSERT INTO transactions_fts(transactions_fts, rowid, name, instance, upgrade_method, detail)
+    VALUES ('delete', old.id, old.name, old.instance, old.upgrade_method, old.detail);
+    INSERT INTO transactions_fts(rowid, name, instance, upgrade_method, detail)
+    VALUES (new.id, new.name, new.instance, new.upgrade_method, new.detail);
+END;
+INSERT INTO transactions_fts(transactions_fts) VALUES ('rebuild');
+COMMIT;
+"""
+
+
+# How long a connection waits on another's lock (another process's write,
+# or a checkpoint) before raising "database is locked".
+BUSY_TIMEOUT = 30.0
+
 
 def get_connection(db_path: Path) -> sqlite3.Connection:
+    """The writer connection, shared by every thread of a process.
+
+    Writes go through VersionManager's lock, so worker threads never
+    interleave statements on it. The database runs in WAL mode, so readers
+    (see get_read_connection), including other processes such as a CLI
+    check-all beside the TUI, aren't blocked by writes and writes aren't
+    blocked by readers.
+    """
     db_path.parent.mkdir(parents=True, exist_ok=True)
-    # The TUI runs checks/upgrades on a worker thread (Textual's run_worker(thread=True))
-    # while this connection is created on the main thread. Usage always alternates
-    # rather than overlaps (App.call_from_thread blocks the worker until the main
-    # thread finishes), so a single shared connection is safe here.
-    conn = sqlite3.connect(db_path, check_same_thread=False)
+    conn = sqlite3.connect(db_path, check_same_thread=False, timeout=BUSY_TIMEOUT)
+    conn.row_factory = sqlite3.Row
+    conn.execute("PRAGMA journal_mode=WAL")
+    # Durable at every checkpoint rather than every commit; plenty for a
+    # cache of version checks, and it keeps per-row commits cheap.
+    conn.execute("PRAGMA synchronous=NORMAL")
+    return conn
+
+
+def get_read_connection(db_path: Path) -> sqlite3.Connection:
+    """A read-only connection for one thread. Reads from it see a consistent
+    snapshot of the last commit and never wait on the writer."""
+    conn = sqlite3.connect(f"{db_path.resolve().as_uri()}?mode=ro", uri=True, timeout=BUSY_TIMEOUT)
     conn.row_factory = sqlite3.Row
     return conn
 
 
+def has_history_search(conn: sqlite3.Connection) -> bool:
+    return conn.execute("SELECT 1 FROM sqlite_master WHERE name = 'transactions_fts'").fetchone() is not None
+
+
+def _split_app_state(conn: sqlite3.Connection) -> None:
+    """Migration 1: move the per-check columns out of the original
+    single-table `applications` into app_state (needs SQLite 3.35+ for
+    DROP COLUMN). Renaming the table repoints the other tables' references."""
+    columns = ", ".join(APP_STATE_COLUMNS)
+    try:
+        conn.executescript(
+            "BEGIN;"
+            "DROP INDEX IF EXISTS idx_applications_enabled_status;"
+            "ALTER TABLE applications RENAME TO app_config;"
+            + APP_STATE_TABLE
+            + f"INSERT INTO app_state (application_id, {columns}) SELECT id, {columns} FROM app_config;"
+            + "".join(f"ALTER TABLE app_config DROP COLUMN {col};" for col in APP_STATE_COLUMNS)
+            + "COMMIT;"
+        )
+    except sqlite3.Error:
+        conn.rollback()
+        raise
+
+
+def version_key_values(current_version, latest_version) -> tuple:
+    """VERSION_KEY_COLUMNS values for a row's current and latest versions."""
+    lag = version_lag(current_version, latest_version) or (None, None, None)
+    return (stored_key(current_version), stored_key(latest_version), *lag)
+
+
+def _add_version_keys(conn: sqlite3.Connection) -> None:
+    """Migration 2: add VERSION_KEY_COLUMNS to app_state (unless it was just
+    created with them), rebuild the applications view to expose them, and
+    fill them in for every row."""
+    existing = {row[1] for row in conn.execute("PRAGMA table_info(app_state)")}
+    rows = conn.execute("SELECT application_id, current_version, latest_version FROM app_state").fetchall()
+    try:
+        conn.executescript(
+            "BEGIN;"
+            + "".join(
+                f"ALTER TABLE app_state ADD COLUMN {col} {'TEXT' if col.endswith('_key') else 'INTEGER'};"
+                for col in VERSION_KEY_COLUMNS
+                if col not in existing
+            )
+            # Dropping the view drops its triggers; SCHEMA recreates both.
+            + "DROP VIEW IF EXISTS applications;"
+        )
+        conn.executemany(
+            f"UPDATE app_state SET {', '.join(f'{col} = ?' for col in VERSION_KEY_COLUMNS)} "
+            "WHERE application_id = ?",
+            [(*version_key_values(current, latest), app_id) for app_id, current, latest in rows],
+        )
+        conn.commit()
+    except sqlite3.Error:
+        conn.rollback()
+        raise
+
+
+def _add_package_architecture(conn: sqlite3.Connection) -> None:
+    """Migration 3: add `architecture` to upgradable_packages' primary key.
+    Existing rows keep an empty architecture until their host's next check."""
+    try:
+        conn.executescript(
+            "BEGIN;"
+            "ALTER TABLE upgradable_packages RENAME TO upgradable_packages_old;"
+            "CREATE TABLE upgradable_packages ("
+            "application_id INTEGER NOT NULL REFERENCES app_config(id), "
+            "package TEXT NOT NULL, architecture TEXT NOT NULL DEFAULT '', "
+            "version TEXT, from_version TEXT, "
+            "PRIMARY KEY (application_id, package, architecture));"
+            "INSERT INTO upgradable_packages (application_id, package, version, from_version) "
+            "SELECT application_id, package, version, from_version FROM upgradable_packages_old;"
+            "DROP TABLE upgradable_packages_old;"
+            "COMMIT;"
+        )
+    except sqlite3.Error:
+        conn.rollback()
+        raise
+
+
 def init_db(conn: sqlite3.Connection) -> None:
+    version = conn.execute("PRAGMA user_version").fetchone()[0]
+    if version < 1 and conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'applications'"
+    ).fetchone():
+        _split_app_state(conn)
+    if version < 2 and conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'app_state'"
+    ).fetchone():
+        _add_version_keys(conn)
+    if version < 3 and conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'upgradable_packages'"
+    ).fetchone():
+        _add_package_architecture(conn)
     conn.executescript(SCHEMA)
+    conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
     conn.commit()
+    if not has_history_search(conn):
+        try:
+            conn.executescript(HISTORY_SEARCH_SCHEMA)
+        except sqlite3.OperationalError:
+            # SQLite built without FTS5 or the trigram tokenizer (< 3.34):
+            # history search falls back to LIKE scans.
+            conn.rollback()
@@ -1,8 +1,11 @@
+import os
 import sys
 from datetime import datetime
 from pathlib import Path
 
-LOG_PATH = Path(__file__).resolve().parent.parent / "logs" / "version_checker.log"
+LOG_PATH = Path(
+    os.environ.get("LOG_PATH", Path(__file__).resolve().parent.parent / "logs" / "version_checker.log")
+)
 
 
 class Tee:
@@ -23,8 +26,8 @@ class Tee:
 
 
 def open_log_file():
-    """Open logs/version_checker.log for appending, with a run-start banner."""
-    LOG_PATH.parent.mkdir(exist_ok=True)
+    """Open logs/version_checker.log (or $LOG_PATH) for appending, with a run-start banner."""
+    LOG_PATH.parent.mkdir(parents=True, exist_ok=True)
     log_file = open(LOG_PATH, "a")
     log_file.write(f"\n=== {datetime.now():%Y-%m-%d %H:%M:%S} ===\n")
     log_file.flush()
@@ -0,0 +1,151 @@
+import heapq
+from datetime import datetime
+
+from src.checkers.registry import batch_groups
+
+# How many checks may talk to one resource (host, kubectl context, broker)
+# at once, by transport. A check that isn't idempotent never overlaps
+# another on the same resource.
+RESOURCE_LIMITS = {"http": 4, "kubectl": 4, "ssh": 2, "mqtt": 16, "esphome": 16, "local": 2}
+DEFAULT_RESOURCE_LIMIT = 4
+
+
+def _age_seconds(last_checked, now):
+    try:
+        return (now - datetime.strptime(last_checked, "%Y-%m-%d %H:%M:%S")).total_seconds()
+    except (TypeError, ValueError):
+        return None
+
+
+def _entry(idx, app_data, checker, latest_cost):
+    if checker is None:
+        transport, resource, limit, cost = "-", None, None, 0.0
+    else:
+        transport = checker.transport
+        resource = (transport, checker.resource_key(app_data))
+        limit = RESOURCE_LIMITS.get(transport, DEFAULT_RESOURCE_LIMIT) if checker.idempotent else 1
+        cost = checker.cost
+    return {
+        "idx": idx,
+        "name": app_data.get("Name", ""),
+        "instance": app_data.get("Instance", ""),
+        "transport": transport,
+        "resource": resource,
+        "limit": limit,
+        "cost": cost,
+        "latest_key": latest_cost[0],
+        "latest_cost": latest_cost[1],
+        "batched": False,
+    }
+
+
+def build_plan(rows, checker_for, latest_cost_for, max_workers, skip_fresh=False, deferred=(), now=None):
+    """Plan a check-all run without running anything.
+
+    `rows` is [(idx, app_data)] for the enabled rows; `checker_for(app_data)`
+    returns the row's Checker (or None) and `latest_cost_for(app_data)` a
+    (cache key, seconds) pair for its latest-version lookup (key None when
+    the lookup isn't cached). Rows in `deferred` are queued last.
+
+    Submit order: every batch first, then unbatched rows longest first (so
+    the slow checks don't start last and stretch the run), then batched
+    rows, then deferred rows. With `skip_fresh`, rows checked within their
+    checker's ttl are left out.
+
+    Returns {"batches", "rows", "skipped", "estimated_seconds",
+    "sequential_seconds"}; each row entry carries its transport, resource,
+    concurrency limit and cost.
+    """
+    now = now or datetime.now()
+    entries, skipped, checkers = [], [], {}
+    for idx, app_data in rows:
+        checker = checker_for(app_data)
+        entry = _entry(idx, app_data, checker, latest_cost_for(app_data))
+        if skip_fresh and checker is not None and checker.ttl and app_data.get("Current_Version"):
+            age = _age_seconds(app_data.get("Last_Checked"), now)
+            if age is not None and 0 <= age < checker.ttl:
+                skipped.append(entry)
+                continue
+        entries.append(entry)
+        checkers[idx] = (app_data, checker)
+
+    groups = batch_groups(((idx, app_data) for idx, (app_data, _) in checkers.items()), checker_for)
+    batches = []
+    for (batch, key), indices in groups.items():
+        checker = checkers[indices[0]][1]
+        batches.append({
+            "batch": batch,
+            "key": key,
+            "transport": checker.transport,
+            "indices": indices,
+            "cost": checker.batch_cost,
+        })
+    batched = {idx: i for i, b in enumerate(batches) for idx in b["indices"]}
+    for entry in entries:
+        entry["batched"] = entry["idx"] in batched
+
+    deferred = set(deferred)
+
+    def _rank(entry):
+        if entry["idx"] in deferred:
+            tier = 2
+        elif entry["batched"]:
+            tier = 1
+        else:
+            tier = 0
+        return tier, -(entry["cost"] + entry["latest_cost"])
+
+    entries.sort(key=_rank)
+
+    # Cached latest-version lookups are only paid by the first row to ask.
+    seen = set()
+    for entry in entries:
+        key = entry["latest_key"]
+        if key is not None:
+            if key in seen:
+                entry["latest_cost"] = 0.0
+            seen.add(key)
+
+    return {
+        "batches": batches,
+        "rows": entries,
+        "skipped": skipped,
+        "estimated_seconds": estimate_wall_time(batches, entries, batched, max_workers),
+        "sequential_seconds": sum(b["cost"] for b in batches)
+        + sum(e["cost"] + e["latest_cost"] for e in entries),
+    }
+
+
+def estimate_wall_time(batches, entries, batched, max_workers):
+    """Simulate the worker pool over the plan's submit order.
+
+    Workers take jobs in order; a batched row can't start before its batch
+    has finished, and a row waits while its resource is at its limit —
+    which is how check_all_applications behaves.
+    """
+    workers = [0.0] * max(1, max_workers)
+    heapq.heapify(workers)
+    batch_ends = []
+    for batch in batches:
+        start = heapq.heappop(workers)
+        end = start + batch["cost"]
+        batch_ends.append(end)
+        heapq.heappush(workers, end)
+
+    active = {}
+    finish = max(batch_ends, default=0.0)
+    for entry in entries:
+        start = heapq.heappop(workers)
+        if entry["idx"] in batched:
+            start = max(start, batch_ends[batched[entry["idx"]]])
+        resource = entry["resource"]
+        if resource is not None:
+            ends = sorted(e for e in active.get(resource, []) if e > start)
+            if len(ends) >= entry["limit"]:
+                start = ends[len(ends) - entry["limit"]]
+        end = start + entry["cost"] + entry["latest_cost"]
+        if resource is not None:
+            active.setdefault(resource, []).append(end)
+        heapq.heappush(workers, end)
+        finish = max(finish, end)
+    return finish
@@ -1,6 +1,7 @@
 import traceback
 from contextlib import redirect_stdout
 
+import config
 from version_manager import format_version
 
 from textual.app import App, ComposeResult
@@ -181,11 +182,18 @@ class EditScreen(ModalScreen[dict | None]):
         self.dismiss(updates)
 
 
-HISTORY_LIMIT = 40
+HISTORY_PAGE_SIZE = 100
+# Load the next page once the view is within this many rows of the end.
+HISTORY_PREFETCH_ROWS = 20
 
 
 class HistoryScreen(ModalScreen[None]):
-    """Read-only browser over the `transactions` table (most recent first, capped)."""
+    """Read-only browser over the `transactions` table, most recent first.
+
+    Rows arrive a page at a time (keyset pages from
+    VersionManager.get_transaction_page) as the cursor or scroll position
+    nears the end of what's loaded.
+    """
 
     BINDINGS = [Binding("escape", "close", "Close")]
 
@@ -220,11 +228,14 @@ class HistoryScreen(ModalScreen[None]):
     def __init__(self, vm) -> None:
         super().__init__()
         self.vm = vm
+        self._search = ""
+        self._next_page = None
+        self._loaded = 0
 
     def compose(self) -> ComposeResult:
         yield Vertical(
             Label("Upgrade History (Esc to close)", id="history-title"),
-            Input(placeholder="Filter by app name...", id="history-filter"),
+            Input(placeholder="Filter by app, instance, method or detail...", id="history-filter"),
             DataTable(id="history-table", cursor_type="row"),
             Static(id="history-count"),
             id="history-dialog",
@@ -234,18 +245,36 @@ class HistoryScreen(ModalScreen[None]):
         table = self.query_one(DataTable)
         table.add_columns("Timestamp", "Name", "Instance", "Method", "From", "To", "Detail")
         self._reload("")
+        self.watch(table, "scroll_y", self._on_scroll, init=False)
         self.query_one("#history-filter", Input).focus()
 
     def on_input_changed(self, event: Input.Changed) -> None:
         if event.input.id == "history-filter":
             self._reload(event.value)
 
-    def _reload(self, name_filter: str) -> None:
+    def on_data_table_row_highlighted(self, event: DataTable.RowHighlighted) -> None:
+        if event.cursor_row >= self._loaded - HISTORY_PREFETCH_ROWS:
+            self._load_page()
+
+    def _on_scroll(self, scroll_y: float) -> None:
         table = self.query_one(DataTable)
-        table.clear()
-        rows = self.vm.get_transaction_history(
-            limit=HISTORY_LIMIT, name=name_filter, fuzzy_name=True
+        if scroll_y >= table.max_scroll_y - HISTORY_PREFETCH_ROWS:
+            self._load_page()
+
+    def _reload(self, search: str) -> None:
+        self._search = search
+        self._next_page = None
+        self._loaded = 0
+        self.query_one(DataTable).clear()
+        self._load_page(first=True)
+
+    def _load_page(self, first: bool = False) -> None:
+        if not first and self._next_page is None:
+            return
+        rows, self._next_page = self.vm.get_transaction_page(
+            HISTORY_PAGE_SIZE, self._next_page, search=self._search
         )
+        table = self.query_one(DataTable)
         for tx in rows:
             table.add_row(
                 tx["timestamp"],
@@ -256,9 +285,66 @@ class HistoryScreen(ModalScreen[None]):
                 tx["to_version"] or "",
                 tx["detail"] or "",
             )
-        self.query_one("#history-count", Static).update(
-            f"Showing {len(rows)} transaction(s), capped at {HISTORY_LIMIT}"
+        self._loaded += len(rows)
+        more = ", scroll for more" if self._next_page is not None else ""
+        self.query_one("#history-count", Static).update(f"Showing {self._loaded} transaction(s){more}")
+
+    def action_close(self) -> None:
+        self.dismiss(None)
+
+
+class PackagesScreen(ModalScreen[None]):
+    """Read-only list of the upgradable apt packages stored by a host's last check."""
+
+    BINDINGS = [Binding("escape", "close", "Close")]
+
+    CSS = """
+    PackagesScreen {
+        align: center middle;
+    }
+    #packages-dialog {
+        width: 100%;
+        height: 100%;
+        border: thick $primary;
+        background: $surface;
+        padding: 1 2;
+    }
+    #packages-title {
+        height: 1;
+        content-align: center middle;
+        text-style: bold;
+    }
+    #packages-table {
+        height: 1fr;
+    }
+    #packages-count {
+        height: 1;
+        color: $text-muted;
+    }
+    """
+
+    def __init__(self, title: str, packages: list[dict]) -> None:
+        super().__init__()
+        self.title_text = title
+        self.packages = packages
+
+    def compose(self) -> ComposeResult:
+        yield Vertical(
+            Label(f"{self.title_text} (Esc to close)", id="packages-title"),
+            DataTable(id="packages-table", cursor_type="row"),
+            Static(id="packages-count"),
+            id="packages-dialog",
+        )
+
+    def on_mount(self) -> None:
+        table = self.query_one(DataTable)
+        table.add_columns("Package", "Arch", "From", "To")
+        for pkg in self.packages:
+            table.add_row(pkg["package"], pkg["architecture"], pkg["from_version"] or "", pkg["version"] or "")
+        self.query_one("#packages-count", Static).update(
+            f"{len(self.packages)} upgradable package(s) as of the last check"
         )
+        table.focus()
 
     def action_close(self) -> None:
         self.dismiss(None)
@@ -331,6 +417,8 @@ class VersionCheckerApp(App):
         Binding("U", "upgrade_selected_force", "Force Upgrade Selected"),
         Binding("e", "edit_selected", "Edit"),
         Binding("h", "show_history", "History"),
+        Binding("p", "show_packages", "Packages"),
+        Binding("o", "toggle_lag_order", "Order by Lag"),
         Binding("r", "refresh_view", "Refresh"),
         Binding("q", "quit", "Quit"),
     ]
@@ -341,6 +429,7 @@ class VersionCheckerApp(App):
         self.log_file = log_file
         self.selected: set[int] = set()
         self.view_mode = "updates"
+        self.lag_order = False
         self.busy = False
         self.row_idx_map: list[int] = []
 
@@ -356,39 +445,40 @@ class VersionCheckerApp(App):
         table.add_columns("Sel", "Name", "Instance", "Current", "Latest", "Status")
         self.refresh_table()
 
-    def get_visible_rows(self) -> list[int]:
-        rows = []
-        for idx, note in enumerate(self.vm.notes):
-            fm = note["frontmatter"]
-            if self.view_mode == "disabled":
-                if fm.get("enabled", True) is True:
-                    continue
-                rows.append(idx)
-                continue
-            if fm.get("enabled", True) is not True:
-                continue
-            if self.view_mode == "updates" and fm.get("status") != "Update Available":
-                continue
-            rows.append(idx)
+    def get_visible_rows(self, snapshot=None) -> list[int]:
+        snapshot = snapshot or self.vm.snapshot
+        if self.view_mode == "disabled":
+            rows = snapshot.index.disabled()
+        elif self.view_mode == "updates":
+            rows = snapshot.index.with_status("Update Available")
+        else:
+            rows = snapshot.index.enabled()
+        if self.lag_order:
+            # Most releases behind first; rows without a lag keep name order after.
+            rank = {app_id: pos for pos, app_id in enumerate(self.vm.get_lag_order())}
+            rows.sort(key=lambda idx: rank.get(snapshot.records[idx].id, len(rank)))
         return rows
 
     def refresh_table(self) -> None:
+        # One snapshot for the whole redraw: worker threads may publish newer
+        # ones meanwhile, but rows and records here stay from the same version.
+        snapshot = self.vm.snapshot
         table = self.query_one(DataTable)
         cursor_row = table.cursor_row
         table.clear()
-        self.row_idx_map = self.get_visible_rows()
+        self.row_idx_map = self.get_visible_rows(snapshot)
 
         for idx in self.row_idx_map:
-            fm = self.vm.notes[idx]["frontmatter"]
+            record = snapshot.records[idx]
             mark = "✓" if idx in self.selected else ""
-            status = fm.get("status") or ""
+            status = record.status or ""
             icon = self.vm.STATUS_ICONS.get(status, "")
             table.add_row(
                 mark,
-                fm.get("name", ""),
-                fm.get("instance", ""),
-                format_version(fm.get("current_version"), fm.get("current_library_version"), empty=""),
-                format_version(fm.get("latest_version"), fm.get("latest_library_version"), empty=""),
+                record.name,
+                record.instance,
+                format_version(record.current_version, record.current_library_version, empty=""),
+                format_version(record.latest_version, record.latest_library_version, empty=""),
                 f"{icon} {status}".strip(),
                 key=str(idx),
             )
@@ -397,7 +487,8 @@ class VersionCheckerApp(App):
             table.move_cursor(row=min(cursor_row, len(self.row_idx_map) - 1))
 
         view_label = {"updates": "Updates", "all": "All Applications", "disabled": "Disabled"}[self.view_mode]
-        self.sub_title = f"{view_label} — {len(self.row_idx_map)} apps, {len(self.selected)} selected"
+        order_label = ", by lag" if self.lag_order else ""
+        self.sub_title = f"{view_label}{order_label} — {len(self.row_idx_map)} apps, {len(self.selected)} selected"
 
     def _cursor_idx(self) -> list[int]:
         table = self.query_one(DataTable)
@@ -429,6 +520,10 @@ class VersionCheckerApp(App):
         self.view_mode = order[(order.index(self.view_mode) + 1) % len(order)]
         self.refresh_table()
 
+    def action_toggle_lag_order(self) -> None:
+        self.lag_order = not self.lag_order
+        self.refresh_table()
+
     def action_refresh_view(self) -> None:
         self.refresh_table()
 
@@ -546,6 +641,21 @@ class VersionCheckerApp(App):
             return
         self.push_screen(HistoryScreen(self.vm))
 
+    def action_show_packages(self) -> None:
+        if self.busy:
+            return
+        cursor = self._cursor_idx()
+        if not cursor:
+            self.notify("No application highlighted", severity="warning")
+            return
+        idx = cursor[0]
+        row_data = self.vm.get_row_data(idx)
+        if row_data.get("Check_Latest") != "ssh_apt":
+            self.notify("Package lists are only recorded for ssh_apt hosts", severity="warning")
+            return
+        title = f"Upgradable packages on {row_data.get('Name', '')} ({row_data.get('Instance', '')})"
+        self.push_screen(PackagesScreen(title, self.vm.get_upgradable_packages(idx)))
+
     def _on_background_done(self, message: str) -> None:
         self._set_busy(False)
         self.selected.clear()
@@ -560,4 +670,15 @@ class VersionCheckerApp(App):
 
 
 def run_tui(vm, log_file) -> None:
-    VersionCheckerApp(vm, log_file).run()
+    # The TUI is long-lived, so an mDNS listener started here stays warm
+    # across check-alls instead of paying the start-up window every run.
+    if not config.ESPHOME_MDNS:
+        VersionCheckerApp(vm, log_file).run()
+        return
+
+    from src.checkers.esphome_mdns import start_mdns_listener, stop_mdns_listener
+    start_mdns_listener()
+    try:
+        VersionCheckerApp(vm, log_file).run()
+    finally:
+        stop_mdns_listener()
@@ -0,0 +1,73 @@
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+
+def check_acyclic(nodes):
+    """Raise ValueError if the "after" edges of `nodes` form a cycle."""
+    remaining = {key: set(node.get("after", ())) & nodes.keys() for key, node in nodes.items()}
+    while remaining:
+        ready = [key for key, deps in remaining.items() if not deps]
+        if not ready:
+            raise ValueError(f"Dependency cycle among {list(remaining)}")
+        for key in ready:
+            del remaining[key]
+        for deps in remaining.values():
+            deps.difference_update(ready)
+
+
+def run_graph(nodes, max_workers, succeeded=bool, on_done=None, on_skip=None):
+    """Run a dependency graph of jobs on a thread pool.
+
+    `nodes` is {key: {"run": callable, "after": [keys]}}. A node is started
+    once every node in its "after" list has finished, on up to
+    `max_workers` threads; nodes become ready in `nodes` order. If a
+    prerequisite's result isn't `succeeded(result)` (or the prerequisite was
+    itself skipped), the node isn't run and on_skip(key, prerequisite) is
+    called instead. on_done(key, result) is called as each node finishes.
+    Both callbacks run on the calling thread. "after" keys that aren't in
+    `nodes` are ignored.
+
+    Returns {key: result} for the nodes that ran.
+    """
+    check_acyclic(nodes)
+    waiting = {key: set(node.get("after", ())) & nodes.keys() for key, node in nodes.items()}
+    dependents = {}
+    for key, deps in waiting.items():
+        for dep in deps:
+            dependents.setdefault(dep, []).append(key)
+    blocked = {}
+    results = {}
+
+    def finish(key, ok):
+        for dependent in dependents.get(key, ()):
+            if not ok:
+                blocked.setdefault(dependent, key)
+            waiting[dependent].discard(key)
+
+    with ThreadPoolExecutor(max_workers=max(1, max_workers)) as executor:
+        running = {}
+
+        def start_ready():
+            while True:
+                ready = [key for key, deps in waiting.items() if not deps]
+                if not ready:
+                    return
+                for key in ready:
+                    del waiting[key]
+                    if key in blocked:
+                        if on_skip:
+                            on_skip(key, blocked[key])
+                        finish(key, False)
+                    else:
+                        running[executor.submit(nodes[key]["run"])] = key
+
+        start_ready()
+        while running:
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                key = running.pop(future)
+                results[key] = future.result()
+                if on_done:
+                    on_done(key, results[key])
+                finish(key, succeeded(results[key]))
+            start_ready()
+    return results
@@ -0,0 +1,132 @@
+"""Version parsing and ordering shared by the checkers and status decisions.
+
+A version string is parsed once (memoized) into a sortable key:
+
+    (epoch, release, pre_rank, pre_number, revision, build, suffix)
+
+covering semver and calver (`1.2.3`, `2024.10.1`, leading `v`), prerelease
+tags (`1.2.3-rc.1`, `2.0.0b3`, `1.0-beta2`), Debian epochs and revisions
+(`1:2.3.4-1ubuntu2`) and k3s builds (`v1.30.2+k3s1`). Trailing zero release
+components are dropped so `1.2` and `1.2.0` compare equal; anything that
+doesn't start with a number sorts below every parsed version.
+"""
+import re
+from functools import lru_cache
+
+_VERSION_RE = re.compile(
+    r"""
+    ^v?
+    (?:(?P<epoch>\d+):)?
+    (?P<release>\d+(?:\.\d+)*)
+    (?:[-._]?(?:
+        (?P<pre_label>dev|alpha|beta|preview|pre|rc)[-._]?(?P<pre_number>\d*)
+        # One-letter forms need their number (2.0.0b3); 1.2.3a is a release.
+        |(?P<short_label>[abc])(?P<short_number>\d+)
+    )(?![a-z]))?
+    (?:[-_.](?P<revision>\d+)(?P<revision_suffix>[a-z][a-z0-9.~]*)?)?
+    (?:\+(?P<build>[a-z0-9._-]*))?
+    (?P<suffix>.*)$
+    """,
+    re.IGNORECASE | re.VERBOSE,
+)
+
+# Prereleases sort below the release itself (rank 4).
+_PRE_RANKS = {"dev": 0, "alpha": 1, "a": 1, "beta": 2, "b": 2, "preview": 3, "pre": 3, "rc": 3, "c": 3}
+_RELEASE_RANK = 4
+
+_BUILD_NUMBER_RE = re.compile(r"(\d+)$")
+
+_UNPARSED = -1
+
+
+@lru_cache(maxsize=8192)
+def version_key(version):
+    """Sortable key for `version`; None, "" and unparseable strings sort first."""
+    text = str(version or "").strip()
+    match = _VERSION_RE.match(text)
+    if not match:
+        return (_UNPARSED, (), 0, 0, 0, 0, text.lower())
+    release = [int(part) for part in match["release"].split(".")]
+    while len(release) > 1 and release[-1] == 0:
+        release.pop()
+    pre_label = (match["pre_label"] or match["short_label"] or "").lower()
+    # Build metadata orders by its trailing number: +k3s1 < +k3s2.
+    build = _BUILD_NUMBER_RE.search(match["build"] or "")
+    return (
+        int(match["epoch"] or 0),
+        tuple(release),
+        _PRE_RANKS[pre_label] if pre_label else _RELEASE_RANK,
+        int(match["pre_number"] or match["short_number"] or 0),
+        int(match["revision"] or 0),
+        int(build[1]) if build else 0,
+        ((match["revision_suffix"] or "") + match["suffix"]).lower(),
+    )
+
+
+def is_parsed(version):
+    return version_key(version)[0] != _UNPARSED
+
+
+def same_version(a, b):
+    """True when `a` and `b` name the same version, ignoring formatting
+    (a leading `v`, trailing `.0`, case)."""
+    if a == b:
+        return True
+    if not (is_parsed(a) and is_parsed(b)):
+        return str(a or "").strip().lower() == str(b or "").strip().lower()
+    return version_key(a) == version_key(b)
+
+
+def newest(versions):
+    """The highest of `versions` by version_key, or None if empty."""
+    return max(versions, key=version_key, default=None)
+
+
+# A stored key needs at least major.minor, so counts like "12 packages"
+# or "0 need updates" aren't mistaken for versions.
+_STORABLE_RE = re.compile(r"^v?(?:\d+:)?\d+\.\d", re.IGNORECASE)
+
+
+def _encode_int(n):
+    # Length-prefixed so numbers compare correctly as text: 9 -> "19", 10 -> "210".
+    digits = str(n)
+    return f"{len(digits)}{digits}"
+
+
+def stored_key(version):
+    """version_key as a string that sorts the same way under SQLite's text
+    ordering (stored in app_state.current_key/latest_key), or None when
+    `version` isn't a version. The free-form suffix is left out."""
+    text = str(version or "").strip()
+    if not _STORABLE_RE.match(text):
+        return None
+    epoch, release, pre_rank, pre_number, revision, build, _ = version_key(text)
+    # "-" sorts below ".", so 1.2 orders before 1.2.1.
+    return "-".join((
+        _encode_int(epoch),
+        ".".join(_encode_int(part) for part in release),
+        f"{pre_rank}{_encode_int(pre_number)}",
+        _encode_int(revision),
+        _encode_int(build),
+    ))
+
+
+def version_lag(current, latest):
+    """(major, minor, patch) releases `current` is behind `latest`: the
+    difference at the first release component that differs, zero elsewhere
+    and (0, 0, 0) when current is not older. None unless both are versions
+    (see stored_key) with the same epoch."""
+    if stored_key(current) is None or stored_key(latest) is None:
+        return None
+    current_key, latest_key = version_key(current), version_key(latest)
+    if current_key[0] != latest_key[0]:
+        return None
+    lag = [0, 0, 0]
+    if current_key < latest_key:
+        current_release = current_key[1] + (0,) * 3
+        latest_release = latest_key[1] + (0,) * 3
+        for position in range(3):
+            if latest_release[position] != current_release[position]:
+                lag[position] = max(latest_release[position] - current_release[position], 0)
+                break
+    return tuple(lag)
@@ -2,142 +2,115 @@
 
 from datetime import datetime
 from concurrent.futures import ThreadPoolExecutor, as_completed
+from functools import partial
+import contextlib
 import io
-import json
 import sys
 import threading
-import urllib3
+import time
+import warnings
 from pathlib import Path
 
-urllib3.disable_warnings(urllib3.exceptions.NotOpenSSLWarning)
+# Silence urllib3's LibreSSL warning without importing urllib3 here: it (and
+# requests) load only once a checker that needs them runs.
+warnings.filterwarnings("ignore", message="urllib3 v2 only supports OpenSSL")
 
 from src import db
-
-from src.checkers.github import get_github_latest_version, get_github_latest_tag
-from src.checkers.home_assistant import get_home_assistant_version
-from src.checkers.esphome import get_esphome_version
-from src.checkers.music_assistant import get_music_assistant_version
-from src.checkers.ble_proxy import get_ble_proxy_version
-from src.checkers.konnected import get_konnected_version, get_konnected_current_version
-from src.checkers.airgradient import (
-    get_airgradient_version,
-    get_airgradient_current_version,
-)
-from src.checkers.opnsense import get_opnsense_version
-from src.checkers.k3s import get_k3s_current_version
-from src.checkers.linux_kernel import is_kernel_only_update
-from src.checkers.zigbee2mqtt import get_zigbee2mqtt_version
-from src.checkers.kopia import get_kopia_version
-from src.checkers.kubectl import (
-    get_telegraf_version,
-    get_mosquitto_version,
-    get_victoriametrics_version,
-    get_calico_version,
-    get_metallb_version,
-    get_alertmanager_version,
-    get_fluentbit_version,
-    get_mongodb_version,
-    get_opensearch_version,
-    get_pgadmin_version,
-    get_unpoller_version,
-    get_certmanager_version,
-    get_postfix_version,
-    get_garage_version,
-)
-from src.checkers.cnpg import get_cnpg_version, get_cnpg_postgres_latest_version
-from src.checkers.server_status import check_server_status
-from src.checkers.proxmox import get_proxmox_version, get_proxmox_latest_version
-from src.checkers.tailscale import check_tailscale_versions
-from src.checkers.traefik import get_traefik_version
-from src.checkers.graylog import (
-    get_graylog_current_version,
-    get_graylog_latest_version_from_repo,
-    get_postgresql_latest_version_from_ghcr,
-)
-from src.checkers.grafana import get_grafana_version
-from src.checkers.mongodb import get_mongodb_latest_version
-from src.checkers.unifi_network import (
-    get_ui_network_version,
-    get_unifi_network_latest_version,
-    get_unifi_os_server_latest_version,
-)
-from src.checkers.syncthing import check_syncthing_current_version
-from src.checkers.awx import check_awx_current_version
-from src.checkers.graylog_compat import get_opensearch_compatible_version
-from src.checkers.dockerhub import (
-    get_dockerhub_latest_version,
-    get_dockerhub_latest_beta,
-    clear_cache as dockerhub_clear_cache,
-)
-from src.checkers.n8n import get_n8n_version_kubectl
-from src.checkers.openclaw import get_openclaw_version
-from src.checkers.wyoming import get_rhasspy_version, get_wyoming_satellite_version
-from src.checkers.ollama import get_ollama_version
-from src.checkers.docker import get_docker_version
-from src.checkers.portainer import get_portainer_version
-from src.checkers.open_webui import get_open_webui_version
-from src.checkers.vault import get_vault_version
-from src.checkers.uptime_kuma import get_uptime_kuma_version
-from src.checkers.upgrade import trigger_awx_upgrade, trigger_awx_apt_upgrade, trigger_awx_llm_upgrade, trigger_awx_esphome_upgrade, trigger_awx_calico_upgrade, trigger_awx_uos_upgrade, trigger_vault_upgrade_workflow, update_manifest_version, update_helm_values_version, git_commit_push_manifest, kubectl_apply_manifest, AWX_UPGRADE_METHODS, MANIFEST_UPGRADE_METHODS, HELM_UPGRADE_METHODS, CR_UPGRADE_METHODS
+from src.app_index import AppIndex
+from src.app_record import FIELD_MAP, AppRecord, RowView, value_to_db
+from src.app_snapshot import AppSnapshot
+
+from src.checkers.registry import Checker, lazy, call_if_imported, resolve_update_entity
+from src.planner import build_plan
+from src.upgrade_graph import run_graph
+from src.versions import same_version
 import config
 
 
-FIELD_MAP = {
-    "Name": "name",
-    "Enabled": "enabled",
-    "Context": "context",
-    "Namespace": "namespace",
-    "Instance": "instance",
-    "Type": "type",
-    "Category": "category",
-    "Version_Pin": "version_pin",
-    "Upgrade": "upgrade",
-    "Target": "target",
-    "Esphome_Key": "esphome_key",
-    "GitHub": "github",
-    "DockerHub": "dockerhub",
-    "Current_Version": "current_version",
-    "Latest_Version": "latest_version",
-    "Status": "status",
-    "Last_Checked": "last_checked",
-    "Last_Upgraded": "last_upgraded",
-    "Check_Current": "check_current",
-    "Check_Latest": "check_latest",
-    "Helm_Values_File": "helm_values_file",
-    "Extra_Manifests": "extra_manifests",
-    "Library_GitHub": "library_github",
-    "Current_Library_Version": "current_library_version",
-    "Latest_Library_Version": "latest_library_version",
-    "Notes": "notes",
+# Listings for the read-only commands, which query SQLite directly instead
+# of loading every row (see check_versions.py).
+_ENABLED_WHERE = "enabled = 1"
+_UPDATES_WHERE = "enabled = 1 AND status = 'Update Available'"
+
+# --behind levels over the stored lag columns (see db.VERSION_KEY_COLUMNS).
+_BEHIND_WHERE = {
+    "major": "lag_major > 0",
+    "minor": "(lag_major > 0 OR lag_minor > 0)",
+    "patch": "(lag_major > 0 OR lag_minor > 0 OR lag_patch > 0)",
 }
-YAML_TO_FIELD = {v: k for k, v in FIELD_MAP.items()}
+_LAG_ORDER = "lag_major DESC, lag_minor DESC, lag_patch DESC"
+_LAG_LABEL_SQL = (
+    "CASE WHEN lag_major > 0 THEN lag_major || ' major' "
+    "WHEN lag_minor > 0 THEN lag_minor || ' minor' ELSE lag_patch || ' patch' END"
+)
+
+
+def _formatted_length_sql(version_col: str, library_col: str) -> str:
+    """SQL for the length of format_version(version, library, empty="")."""
+    return (
+        f"COALESCE(LENGTH(NULLIF({version_col}, '')), 0) + "
+        f"CASE WHEN COALESCE({library_col}, '') = '' THEN 0 ELSE LENGTH({library_col}) + 7 END"
+    )
+
+
+_HISTORY_SELECT = "id, name, instance, upgrade_method, from_version, to_version, timestamp, detail"
+
+# Columns the TUI's history filter searches (see _history_filters).
+_HISTORY_SEARCH_COLUMNS = ("name", "instance", "upgrade_method", "detail")
+
 
-# Columns with non-string storage representations that need conversion
-# between the DB row and the in-memory frontmatter dict.
-_BOOL_COLUMNS = {"enabled"}
-_JSON_COLUMNS = {"extra_manifests"}
+# A checks row's total duration; phases a failed check never reached are NULL.
+_CHECK_MS_SQL = "COALESCE(current_ms, 0) + COALESCE(latest_ms, 0) + COALESCE(write_ms, 0)"
 
 
-def _row_to_frontmatter(row) -> dict:
-    fm = {}
-    for col in row.keys():
-        value = row[col]
-        if col == "id":
-            continue
-        if col in _BOOL_COLUMNS:
-            value = bool(value)
-        elif col in _JSON_COLUMNS:
-            value = json.loads(value) if value else []
-        fm[col] = value
-    return fm
+def new_run_id() -> int:
+    """Identifier grouping one run's rows in the checks log (ms since epoch)."""
+    return time.time_ns() // 1_000_000
 
 
-def _frontmatter_value_to_db(col: str, value):
-    if col in _BOOL_COLUMNS:
-        return int(bool(value))
-    if col in _JSON_COLUMNS:
-        return json.dumps(value) if value else None
-    return value
+def _elapsed_ms(start: float) -> int:
+    return round((time.perf_counter() - start) * 1000)
+
+
+def _index_fields(record) -> tuple:
+    return record.name, record.instance, record.status, record.enabled is True
+
+
+class _ThreadBufferedStdout:
+    """sys.stdout stand-in for worker pools: what a thread prints after
+    start() collects in that thread's buffer until take(), so each task's
+    output can be written out in one piece instead of interleaving with
+    other workers'. Threads that haven't called start() write through."""
+
+    def __init__(self, real):
+        self.real = real
+        self._local = threading.local()
+
+    def start(self):
+        self._local.buffer = io.StringIO()
+
+    def take(self) -> str:
+        buffer, self._local.buffer = self._local.buffer, None
+        return buffer.getvalue()
+
+    def write(self, text):
+        buffer = getattr(self._local, "buffer", None)
+        if buffer is not None:
+            buffer.write(text)
+        else:
+            self.real.write(text)
+
+    def flush(self):
+        self.real.flush()
+
+
+# ansible-esphome AWX target patterns for apps whose devices aren't named after the app.
+_ESPHOME_TARGETS = {"konnected": "garage-door-opener", "esp-heat-control": "heat-control"}
+
+
+def _upgrade_tally(launched=0, manifests_updated=0, skipped=0) -> dict:
+    """Counts an upgrade run reports, per graph node and in total."""
+    return {"launched": launched, "manifests_updated": manifests_updated, "skipped": skipped}
 
 
 def format_version(version, library_version=None, empty="N/A"):
@@ -148,21 +121,61 @@ def format_version(version, library_version=None, empty="N/A"):
     return f"{display} (lib {library_version})" if library_version else display
 
 
-def _kubectl_checker(func):
-    """Adapt f(instance, context=, namespace=) to an app_data dict."""
-    return lambda a: func(a["Instance"], context=a["Context"] or None, namespace=a["Namespace"] or None)
+def _kubectl_batch(rows):
+    from src.checkers.base import prefetch_pods
+    prefetch_pods(rows[0]["Context"] or None)
+
 
+def _context(a):
+    return a["Context"] or None
 
-def _api_checker(func):
+
+def _kubectl_checker(ref, cost=1.0):
+    """Adapt f(instance, context=, namespace=) to an app_data dict; rows on
+    the same context share one `kubectl get pods -A` snapshot."""
+    func = lazy(ref)
+    return Checker(
+        lambda a: func(a["Instance"], context=a["Context"] or None, namespace=a["Namespace"] or None),
+        batch=_kubectl_batch,
+        group_key=_context,
+        transport="kubectl",
+        resource_key=_context,
+        cost=cost,
+        batch_cost=1.5,
+    )
+
+
+def _api_checker(ref, **meta):
     """Adapt f(instance, url) to an app_data dict."""
-    return lambda a: func(a["Instance"], a["Target"])
+    func = lazy(ref)
+    return Checker(lambda a: func(a["Instance"], a["Target"]), **meta)
 
 
-def _esphome_checker(a):
-    return get_ble_proxy_version(a["Instance"], a["Target"], a["Esphome_Key"])
+def _esphome_batch(rows):
+    from src.checkers.esphome_device import sweep_esphome_devices
+    sweep_esphome_devices((a["Target"], a["Esphome_Key"]) for a in rows)
+
+
+def _esphome_device_checker(ref):
+    """Adapt f(instance, url, encryption_key) to an app_data dict; all devices
+    are read in one concurrent native-API sweep on a shared event loop."""
+    func = lazy(ref)
+    return Checker(
+        lambda a: func(a["Instance"], a["Target"], a["Esphome_Key"]),
+        batch=_esphome_batch,
+        transport="esphome",
+        cost=0.1,
+        batch_cost=2.0,
+    )
+
+
+def _zigbee2mqtt_batch(rows):
+    from src.checkers.zigbee2mqtt import open_session
+    open_session([a["Instance"] for a in rows])
 
 
 def _tailscale_checker(a):
+    from src.checkers.tailscale import check_tailscale_versions
     print("  Checking all Tailscale devices...")
     results = check_tailscale_versions(
         api_key=config.TAILSCALE_ACCESS_TOKEN, tailnet=config.TAILSCALE_TAILNET
@@ -175,61 +188,141 @@ def _tailscale_checker(a):
     }
 
 
+_get_esphome_version = lazy("src.checkers.esphome:get_esphome_version")
+_get_ha_update_versions = lazy("src.checkers.home_assistant:get_ha_update_versions")
+_get_k3s_current_version = lazy("src.checkers.k3s:get_k3s_current_version")
+_get_zigbee2mqtt_version = lazy("src.checkers.zigbee2mqtt:get_zigbee2mqtt_version")
+
 # Current-version dispatch: one entry per application name; each checker takes
 # the PascalCase app_data dict and returns a version string, a dict (normalized
-# in get_current_version), or None. ssh/ssh_apt rows are dispatched by method
-# instead — their names describe host classes (rpi, ubuntu, ...), not one app.
+# in get_current_version), or None. Entries are Checker registrations (see
+# src/checkers/registry.py): besides the check itself they carry an optional
+# batch method and the transport/resource/cost/ttl metadata the planner uses.
+# Checker functions are "module:function" references, imported the first time
+# a row of that type is checked. ssh/ssh_apt rows are dispatched by method
+# instead (SERVER_STATUS_CHECKER) — their names describe host classes (rpi,
+# ubuntu, ...), not one app.
 CURRENT_CHECKERS = {
     # HTTP/API
-    "homeassistant": _api_checker(get_home_assistant_version),
-    "esphome": lambda a: get_esphome_version(a["Target"]),
-    "ble-proxy": _esphome_checker,
-    "co2": _esphome_checker,
-    "m5-echo": _esphome_checker,
-    "esp-heat-control": _esphome_checker,
-    "konnected": lambda a: get_konnected_current_version(a["Instance"], a["Target"], a["Esphome_Key"]),
-    "airgradient": lambda a: get_airgradient_current_version(a["Instance"], a["Target"], a["Esphome_Key"]),
-    "traefik": _api_checker(get_traefik_version),
-    "opnsense": _api_checker(get_opnsense_version),
-    "proxmox": _api_checker(get_proxmox_version),
-    "tailscale": _tailscale_checker,
-    "graylog": _api_checker(get_graylog_current_version),
-    "ui-network": _api_checker(get_ui_network_version),
-    "awx": _api_checker(check_awx_current_version),
-    "syncthing": _api_checker(check_syncthing_current_version),
-    "ollama": _api_checker(get_ollama_version),
-    "portainer": _api_checker(get_portainer_version),
-    "openwebui": _api_checker(get_open_webui_version),
-    "uptime-kuma": _api_checker(get_uptime_kuma_version),
-    "music-assistant": _api_checker(get_music_assistant_version),
+    "homeassistant": _api_checker("src.checkers.home_assistant:get_home_assistant_version", cost=0.3),
+    "esphome": Checker(lambda a: _get_esphome_version(a["Target"]), cost=0.5),
+    "ble-proxy": _esphome_device_checker("src.checkers.ble_proxy:get_ble_proxy_version"),
+    "co2": _esphome_device_checker("src.checkers.ble_proxy:get_ble_proxy_version"),
+    "m5-echo": _esphome_device_checker("src.checkers.ble_proxy:get_ble_proxy_version"),
+    "esp-heat-control": _esphome_device_checker("src.checkers.ble_proxy:get_ble_proxy_version"),
+    "konnected": _esphome_device_checker("src.checkers.konnected:get_konnected_current_version"),
+    "airgradient": _esphome_device_checker("src.checkers.airgradient:get_airgradient_current_version"),
+    "traefik": _api_checker("src.checkers.traefik:get_traefik_version", cost=0.3),
+    "opnsense": _api_checker("src.checkers.opnsense:get_opnsense_version", cost=0.5),
+    "proxmox": _api_checker(
+        "src.checkers.proxmox:get_proxmox_version",
+        resource_key=lambda a: config.PROXMOX_CLUSTER_URL, cost=0.3, ttl=3600,
+    ),
+    "tailscale": Checker(_tailscale_checker, resource_key=lambda a: "api.tailscale.com", cost=1.5, ttl=3600),
+    "graylog": _api_checker("src.checkers.graylog:get_graylog_current_version", cost=0.5),
+    "ui-network": _api_checker(
+        "src.checkers.unifi_network:get_ui_network_version", resource_key=lambda a: "api.ui.com", cost=0.5
+    ),
+    "awx": _api_checker("src.checkers.awx:check_awx_current_version", cost=0.5),
+    "syncthing": _api_checker("src.checkers.syncthing:check_syncthing_current_version", cost=0.3),
+    "ollama": _api_checker("src.checkers.ollama:get_ollama_version", cost=0.3),
+    "portainer": _api_checker("src.checkers.portainer:get_portainer_version", cost=0.5),
+    "openwebui": _api_checker("src.checkers.open_webui:get_open_webui_version", cost=0.5),
+    "uptime-kuma": _api_checker("src.checkers.uptime_kuma:get_uptime_kuma_version", cost=3.0),
+    "music-assistant": _api_checker("src.checkers.music_assistant:get_music_assistant_version", cost=1.0),
     # kubectl
-    "telegraf": _kubectl_checker(get_telegraf_version),
-    "victoriametrics": _kubectl_checker(get_victoriametrics_version),
-    "mosquitto": _kubectl_checker(get_mosquitto_version),
-    "calico": _kubectl_checker(get_calico_version),
-    "metallb": _kubectl_checker(get_metallb_version),
-    "alertmanager": _kubectl_checker(get_alertmanager_version),
-    "fluent-bit": _kubectl_checker(get_fluentbit_version),
-    "mongodb": _kubectl_checker(get_mongodb_version),
-    "opensearch": _kubectl_checker(get_opensearch_version),
-    "cnpg": _kubectl_checker(get_cnpg_version),
-    "pgadmin": _kubectl_checker(get_pgadmin_version),
-    "grafana": _kubectl_checker(get_grafana_version),
-    "unpoller": _kubectl_checker(get_unpoller_version),
-    "cert-manager": _kubectl_checker(get_certmanager_version),
-    "postfix": _kubectl_checker(get_postfix_version),
-    "garage": _kubectl_checker(get_garage_version),
-    "n8n": _kubectl_checker(get_n8n_version_kubectl),
-    "openclaw": _kubectl_checker(get_openclaw_version),
-    "vault": _kubectl_checker(get_vault_version),
-    "k3s": lambda a: get_k3s_current_version(a["Instance"], context=a["Context"] or None),
-    "rhasspy": _api_checker(get_rhasspy_version),
+    "telegraf": _kubectl_checker("src.checkers.kubectl:get_telegraf_version"),
+    "victoriametrics": _kubectl_checker("src.checkers.kubectl:get_victoriametrics_version"),
+    "mosquitto": _kubectl_checker("src.checkers.kubectl:get_mosquitto_version"),
+    "calico": _kubectl_checker("src.checkers.kubectl:get_calico_version", cost=0.1),
+    "metallb": _kubectl_checker("src.checkers.kubectl:get_metallb_version", cost=0.1),
+    "alertmanager": _kubectl_checker("src.checkers.kubectl:get_alertmanager_version"),
+    "fluent-bit": _kubectl_checker("src.checkers.kubectl:get_fluentbit_version"),
+    "mongodb": _kubectl_checker("src.checkers.kubectl:get_mongodb_version", cost=2.0),
+    "opensearch": _kubectl_checker("src.checkers.kubectl:get_opensearch_version"),
+    "cnpg": _kubectl_checker("src.checkers.cnpg:get_cnpg_version", cost=2.0),
+    "pgadmin": _kubectl_checker("src.checkers.kubectl:get_pgadmin_version"),
+    "grafana": _kubectl_checker("src.checkers.grafana:get_grafana_version", cost=1.5),
+    "unpoller": _kubectl_checker("src.checkers.kubectl:get_unpoller_version"),
+    "cert-manager": _kubectl_checker("src.checkers.kubectl:get_certmanager_version"),
+    "postfix": _kubectl_checker("src.checkers.kubectl:get_postfix_version"),
+    "garage": _kubectl_checker("src.checkers.kubectl:get_garage_version"),
+    "n8n": _kubectl_checker("src.checkers.n8n:get_n8n_version_kubectl"),
+    "openclaw": _kubectl_checker("src.checkers.openclaw:get_openclaw_version"),
+    "vault": _kubectl_checker("src.checkers.vault:get_vault_version"),
+    "k3s": Checker(
+        lambda a: _get_k3s_current_version(a["Instance"], context=a["Context"] or None),
+        transport="kubectl", resource_key=_context, cost=1.0,
+    ),
+    "rhasspy": _api_checker(
+        "src.checkers.wyoming:get_rhasspy_version", transport="kubectl", resource_key=_context, cost=1.5
+    ),
     # MQTT
-    "zigbee2mqtt": lambda a: get_zigbee2mqtt_version(a["Instance"]),
+    "zigbee2mqtt": Checker(
+        lambda a: _get_zigbee2mqtt_version(a["Instance"]),
+        batch=_zigbee2mqtt_batch,
+        group_key=lambda a: config.MQTT_BROKER,
+        transport="mqtt",
+        resource_key=lambda a: config.MQTT_BROKER,
+        cost=0.1,
+        batch_cost=0.5,
+    ),
     # local commands / SSH
-    "kopia": _api_checker(get_kopia_version),
-    "docker": _api_checker(get_docker_version),
-    "wyoming-satellite": _api_checker(get_wyoming_satellite_version),
+    "kopia": _api_checker("src.checkers.kopia:get_kopia_version", transport="local", cost=1.0),
+    "docker": _api_checker("src.checkers.docker:get_docker_version", transport="ssh", cost=2.0),
+    "wyoming-satellite": _api_checker(
+        "src.checkers.wyoming:get_wyoming_satellite_version", transport="ssh", cost=2.0
+    ),
+}
+
+# ssh_apt rows: one SSH probe per host that may run `apt-get update` first —
+# slow, and not idempotent (it rewrites the host's package lists).
+SERVER_STATUS_CHECKER = _api_checker(
+    "src.checkers.server_status:check_server_status",
+    transport="ssh",
+    resource_key=lambda a: a["Instance"],
+    cost=8.0,
+    idempotent=False,
+    ttl=3600,
+)
+
+# Run-scoped state in checker modules: caches reset before every check-all
+# (so a long-lived TUI session doesn't serve its first run's results forever)
+# and resources released after it. Modules a run never imported are skipped.
+RUN_CACHE_RESETS = (
+    "src.checkers.github:clear_cache",
+    "src.checkers.dockerhub:clear_cache",
+    "src.checkers.unifi_network:clear_cache",
+    "src.checkers.proxmox:clear_cache",
+)
+# Shared snapshots that hold current versions. Besides each check-all, these
+# are reset before any check outside one (a TUI recheck, say after an
+# upgrade), which must read the device rather than the last run's snapshot.
+CURRENT_CACHE_RESETS = (
+    "src.checkers.unifi_network:clear_hosts",
+    "src.checkers.proxmox:clear_cluster_versions",
+    "src.checkers.home_assistant:clear_cache",
+)
+RUN_CLEANUPS = (
+    "src.checkers.linux_kernel:clear_apt_refreshes",
+    "src.checkers.esphome_device:clear_esphome_sweep",
+    "src.checkers.base:clear_pod_snapshots",
+    "src.checkers.zigbee2mqtt:close_session",
+)
+
+# Planner metadata for get_latest_version's sources: typical seconds per
+# lookup, and whether the lookup is cached per run (rows sharing a repository
+# then only pay once).
+LATEST_SOURCES = {
+    "github_release": (0.5, True),
+    "github_tag": (0.5, True),
+    "docker_hub": (0.8, True),
+    "proxmox": (0.5, True),
+    "unifi_network": (1.0, True),
+    "unifi_os_server": (1.0, True),
+    "graylog_compat": (1.0, False),
+    "helm_search": (3.0, False),
+    "helm_chart": (3.0, False),
 }
 
 
@@ -246,139 +339,294 @@ class VersionManager:
         getattr(config, "DATABASE_PATH", str(Path(__file__).parent / "data" / "version_checker.db"))
     )
 
-    def __init__(self, db_path=None):
+    def __init__(self, db_path=None, load=True):
         self.db_path = Path(db_path) if db_path else self.DEFAULT_DB_PATH
         self.conn = db.get_connection(self.db_path)
         db.init_db(self.conn)
-        self.notes = []
-        self._db_lock = threading.Lock()
-        self.load_data()
+        self._history_fts = db.has_history_search(self.conn)
+        # The loaded rows, replaced whole on every committed change (see
+        # transaction and bulk_update); records and index read through it.
+        self.snapshot = AppSnapshot(0, (), AppIndex())
+        self._pending = None
+        # self.conn is the writer, serialized by _db_lock (see transaction);
+        # reads go through a read-only connection per thread (see _reader).
+        self._db_lock = threading.RLock()
+        self._tx_depth = 0
+        self._readers = threading.local()
+        # Rows mapped to a Home Assistant update entity; one cached
+        # /api/states call per HA instance.
+        self._ha_update_checker = Checker(
+            self._get_ha_update_versions,
+            resource_key=lambda a: resolve_update_entity(a["Name"], a["Instance"])[0],
+            cost=0.3,
+        )
+        if load:
+            self.load_data()
+
+    @property
+    def records(self):
+        return self.snapshot.records
+
+    @property
+    def index(self):
+        return self.snapshot.index
+
+    def _reader(self):
+        """This thread's read connection, opened on first use."""
+        conn = getattr(self._readers, "conn", None)
+        if conn is None:
+            conn = self._readers.conn = db.get_read_connection(self.db_path)
+        return conn
+
+    @contextlib.contextmanager
+    def transaction(self):
+        """Hold the writer for a group of writes and commit them once at the
+        end, or roll them back if the block raises. Blocks nest; only the
+        outermost one commits, so the write methods below can be combined
+        (e.g. a row update plus its transactions entry) into one commit.
+
+        Row changes made inside build a pending snapshot, published as
+        `self.snapshot` after the commit and dropped on rollback.
+        """
+        with self._db_lock:
+            outermost = not self._tx_depth
+            self._tx_depth += 1
+            try:
+                yield self.conn
+                if outermost:
+                    self.conn.commit()
+                    if self._pending is not None:
+                        self.snapshot = self._pending
+            except BaseException:
+                if outermost:
+                    self.conn.rollback()
+                raise
+            finally:
+                self._tx_depth -= 1
+                if outermost:
+                    self._pending = None
 
     def load_data(self):
-        rows = self.conn.execute(
+        rows = self._reader().execute(
             "SELECT * FROM applications ORDER BY name, instance"
         ).fetchall()
-        self.notes = [{"id": row["id"], "frontmatter": _row_to_frontmatter(row)} for row in rows]
-        enabled = sum(1 for n in self.notes if n["frontmatter"].get("enabled", True) is True)
-        print(f"Loaded {len(self.notes)} applications from database ({enabled} enabled)")
+        records = tuple(AppRecord.from_row(row) for row in rows)
+        with self._db_lock:
+            self.snapshot = AppSnapshot(
+                self.snapshot.version + 1, records, AppIndex(_index_fields(record) for record in records)
+            )
+        print(f"Loaded {len(self.records)} applications from database ({len(self.index.enabled())} enabled)")
 
     def save_workbook(self):
         pass
 
     def log_transaction(self, idx: int, upgrade_method: str, from_version: str, to_version: str, detail: str = "") -> None:
-        fm = self.notes[idx]["frontmatter"]
-        self.conn.execute(
-            "INSERT INTO transactions (application_id, name, instance, upgrade_method, from_version, to_version, timestamp, detail) "
-            "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
-            (
-                self.notes[idx]["id"],
-                fm.get("name", ""),
-                fm.get("instance", ""),
-                upgrade_method,
-                from_version,
-                to_version,
-                datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-                detail,
-            ),
-        )
-        self.conn.commit()
+        record = self.records[idx]
+        with self.transaction():
+            self.conn.execute(
+                "INSERT INTO transactions (application_id, name, instance, upgrade_method, from_version, to_version, timestamp, detail) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    record.id,
+                    record.name,
+                    record.instance,
+                    upgrade_method,
+                    from_version,
+                    to_version,
+                    datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+                    detail,
+                ),
+            )
 
-    def get_transaction_history(
-        self, limit: int | None = 40, name: str = "", instance: str = "", fuzzy_name: bool = False
-    ) -> list[dict]:
-        """Most recent transactions first, capped at `limit`.
+    def _history_filters(
+        self, name: str = "", instance: str = "", fuzzy_name: bool = False, search: str = ""
+    ) -> tuple[list, list]:
+        """WHERE conditions and params for the history filters.
 
         `name`/`instance` match exactly (case-insensitive) unless `fuzzy_name`
-        is set, in which case `name` is a substring match — used by the TUI's
-        live filter box, where typing a partial app name should narrow results
-        immediately rather than requiring the full exact name.
+        is set, in which case `name` is a substring match. `search` is a
+        substring match across name, instance, method and detail — used by
+        the TUI's live filter box, where typing part of an app name (or a
+        method, or a word from the detail) should narrow results immediately.
+        Both substring matches use the trigram index where available.
         """
-        query = (
-            "SELECT name, instance, upgrade_method, from_version, to_version, timestamp, detail "
-            "FROM transactions"
-        )
         conditions = []
         params: list = []
         if name:
             if fuzzy_name:
-                conditions.append("name LIKE ?")
-                params.append(f"%{name}%")
+                self._add_history_search(conditions, params, ("name",), name)
             else:
-                conditions.append("LOWER(name) = LOWER(?)")
+                conditions.append("lower(name) = lower(?)")
                 params.append(name)
         if instance:
-            conditions.append("LOWER(instance) = LOWER(?)")
+            conditions.append("lower(instance) = lower(?)")
             params.append(instance)
+        if search:
+            self._add_history_search(conditions, params, _HISTORY_SEARCH_COLUMNS, search)
+        return conditions, params
+
+    def _history_query(self, conditions: list, params: list, limit: int | None) -> list[dict]:
+        query = f"SELECT {_HISTORY_SELECT} FROM transactions"
         if conditions:
             query += " WHERE " + " AND ".join(conditions)
-        query += " ORDER BY timestamp DESC"
+        # id breaks timestamp ties, so (timestamp, id) orders rows totally.
+        query += " ORDER BY timestamp DESC, id DESC"
         if limit:
             query += " LIMIT ?"
-            params.append(limit)
-        rows = self.conn.execute(query, params).fetchall()
+            params = params + [limit]
+        return [dict(row) for row in self._reader().execute(query, params)]
+
+    def get_transaction_history(
+        self, limit: int | None = 40, name: str = "", instance: str = "", fuzzy_name: bool = False,
+        search: str = "",
+    ) -> list[dict]:
+        """Most recent transactions first, capped at `limit` (see _history_filters)."""
+        conditions, params = self._history_filters(name, instance, fuzzy_name, search)
+        return self._history_query(conditions, params, limit)
+
+    def get_transaction_page(
+        self, limit: int = 40, before: tuple | None = None, name: str = "", instance: str = "",
+        fuzzy_name: bool = False, search: str = "",
+    ) -> tuple[list[dict], tuple | None]:
+        """One page of history, most recent first, starting after the
+        `before` cursor (None for the newest page).
+
+        Returns (rows, cursor): pass the cursor back as `before` for the next
+        page; it is None once the history is exhausted. Pages are keyset
+        seeks on (timestamp, id), so a page deep in the history costs the
+        same as the first.
+        """
+        conditions, params = self._history_filters(name, instance, fuzzy_name, search)
+        if before is not None:
+            conditions.append("(timestamp, id) < (?, ?)")
+            params.extend(before)
+        rows = self._history_query(conditions, params, limit + 1)
+        if len(rows) <= limit:
+            return rows, None
+        rows = rows[:limit]
+        return rows, (rows[-1]["timestamp"], rows[-1]["id"])
+
+    def history_cursor(self, transaction_id: int) -> tuple | None:
+        """The page cursor positioned just after transaction `transaction_id`."""
+        row = self._reader().execute(
+            "SELECT timestamp, id FROM transactions WHERE id = ?", (transaction_id,)
+        ).fetchone()
+        return tuple(row) if row else None
+
+    def _add_history_search(self, conditions: list, params: list, columns: tuple, term: str) -> None:
+        """Substring match of `term` in any of `columns`: an FTS5 trigram query,
+        or a LIKE scan for terms too short for trigrams (or without FTS5)."""
+        if self._history_fts and len(term) >= 3:
+            conditions.append("id IN (SELECT rowid FROM transactions_fts WHERE transactions_fts MATCH ?)")
+            phrase = term.replace('"', '""')
+            params.append(f"{{{' '.join(columns)}}} : \"{phrase}\"")
+        else:
+            conditions.append("(" + " OR ".join(f"{col} LIKE ?" for col in columns) + ")")
+            params.extend([f"%{term}%"] * len(columns))
+
+    def get_upgradable_packages(self, idx: int) -> list[dict]:
+        """Upgradable apt packages recorded by the row's last ssh_apt check."""
+        rows = self._reader().execute(
+            "SELECT package, architecture, version, from_version FROM upgradable_packages "
+            "WHERE application_id = ? ORDER BY package, architecture",
+            (self.records[idx].id,),
+        ).fetchall()
         return [dict(row) for row in rows]
 
-    def get_row_data(self, idx: int) -> dict:
-        fm = self.notes[idx]["frontmatter"]
-        data = {}
-        for yaml_key, pascal_key in YAML_TO_FIELD.items():
-            val = fm.get(yaml_key)
-            data[pascal_key] = val if val is not None else ""
-        return data
+    def set_upgradable_packages(self, idx: int, packages: list[dict]) -> None:
+        app_id = self.records[idx].id
+        with self.transaction():
+            self.conn.execute("DELETE FROM upgradable_packages WHERE application_id = ?", (app_id,))
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO upgradable_packages "
+                "(application_id, package, architecture, version, from_version) VALUES (?, ?, ?, ?, ?)",
+                [(app_id, p["package"], p["architecture"], p["version"], p["from_version"]) for p in packages],
+            )
+
+    def get_row_data(self, idx: int) -> RowView:
+        """PascalCase view of the row ("" for NULL); reads through to the record."""
+        return RowView(self.records[idx])
 
     def update_row_data(self, idx: int, updates: dict) -> None:
-        fm = self.notes[idx]["frontmatter"]
-        changed_columns = {}
-        for pascal_key, value in updates.items():
-            column = FIELD_MAP.get(pascal_key)
-            if column:
-                fm[column] = value if value != "" else None
-                changed_columns[column] = fm[column]
-
-        if not changed_columns:
+        self.bulk_update([(idx, updates)])
+
+    def bulk_update(self, rows: list[tuple[int, dict]]) -> None:
+        """Apply PascalCase `updates` to each (idx, updates) row in one commit.
+
+        "" is stored as NULL and unknown keys are ignored. Rows changing the
+        same set of columns share one executemany: check results are upserted
+        into app_state, with the version keys and lag recomputed when either
+        version changes, and configuration edits go to app_config (see
+        src/db.py).
+        The changed rows are copied into the next snapshot, which readers
+        see once the outermost transaction commits.
+        """
+        changes = []
+        for idx, updates in rows:
+            changed_columns = {}
+            for pascal_key, value in updates.items():
+                column = FIELD_MAP.get(pascal_key)
+                if column:
+                    changed_columns[column] = value if value != "" else None
+            if changed_columns:
+                changes.append((idx, changed_columns))
+        if not changes:
             return
 
-        set_clause = ", ".join(f"{col} = ?" for col in changed_columns)
-        values = [_frontmatter_value_to_db(col, val) for col, val in changed_columns.items()]
-        values.append(self.notes[idx]["id"])
-        with self._db_lock:
-            self.conn.execute(f"UPDATE applications SET {set_clause} WHERE id = ?", values)
-            self.conn.commit()
+        with self.transaction():
+            base = self._pending or self.snapshot
+            state_groups = {}
+            config_groups = {}
+            for idx, changed_columns in changes:
+                record = base.records[idx]
+                state = {col: val for col, val in changed_columns.items() if col in db.APP_STATE_COLUMNS}
+                config_columns = tuple(col for col in changed_columns if col not in state)
+                if "current_version" in state or "latest_version" in state:
+                    state.update(zip(db.VERSION_KEY_COLUMNS, db.version_key_values(
+                        state.get("current_version", record.current_version),
+                        state.get("latest_version", record.latest_version),
+                    )))
+                if state:
+                    state_groups.setdefault(tuple(state), []).append([record.id, *state.values()])
+                if config_columns:
+                    config_groups.setdefault(config_columns, []).append(
+                        [*(value_to_db(col, changed_columns[col]) for col in config_columns), record.id]
+                    )
+
+            for state, params in state_groups.items():
+                self.conn.executemany(
+                    f"INSERT INTO app_state (application_id, {', '.join(state)}) "
+                    f"VALUES (?{', ?' * len(state)}) ON CONFLICT (application_id) DO UPDATE SET "
+                    + ", ".join(f"{col} = excluded.{col}" for col in state),
+                    params,
+                )
+            for config_columns, params in config_groups.items():
+                set_clause = ", ".join(f"{col} = ?" for col in config_columns)
+                self.conn.executemany(f"UPDATE app_config SET {set_clause} WHERE id = ?", params)
+
+            records = list(base.records)
+            for idx, changed_columns in changes:
+                records[idx] = records[idx].replace(changed_columns)
+            self._pending = AppSnapshot(
+                base.version + 1,
+                tuple(records),
+                base.index.updated((idx, _index_fields(records[idx])) for idx, _ in changes),
+            )
 
     def find_application_row(self, app_name: str, instance: str = "prod") -> int | None:
-        for idx, note in enumerate(self.notes):
-            fm = note["frontmatter"]
-            if (
-                str(fm.get("name", "")).lower() == app_name.lower()
-                and str(fm.get("instance", "")).lower() == instance.lower()
-            ):
-                return idx
-        return None
+        return self.index.find(app_name, instance)
 
     def find_application_rows_by_name(self, app_name: str, instance: str = "") -> list[int]:
-        matches = []
-        for idx, note in enumerate(self.notes):
-            fm = note["frontmatter"]
-            if fm.get("enabled", True) is not True:
-                continue
-            if str(fm.get("name", "")).lower() != app_name.lower():
-                continue
-            if instance and str(fm.get("instance", "")).lower() != instance.lower():
-                continue
-            matches.append(idx)
-        return matches
+        return self.index.rows_by_name(app_name, instance)
 
     def get_all_application_names(self) -> list[str]:
-        names = set()
-        for note in self.notes:
-            fm = note["frontmatter"]
-            if fm.get("enabled", True) is not True:
-                continue
-            if fm.get("name"):
-                names.add(fm["name"])
-        return sorted(names)
+        return self.index.enabled_names()
 
     def _get_dockerhub_version_for_app(self, app_name, dockerhub_repo, version_pin=None):
+        from src.checkers.dockerhub import get_dockerhub_latest_version, get_dockerhub_latest_beta
+        from src.checkers.graylog import get_graylog_latest_version_from_repo, get_postgresql_latest_version_from_ghcr
+        from src.checkers.mongodb import get_mongodb_latest_version
+
         if version_pin == "beta":
             return get_dockerhub_latest_beta(dockerhub_repo)
         if app_name == "mongodb":
@@ -394,6 +642,9 @@ class VersionManager:
             return get_dockerhub_latest_version(dockerhub_repo)
 
     def _get_github_version_for_app(self, app_name, github_repo, check_latest):
+        from src.checkers.github import get_github_latest_version, get_github_latest_tag
+        from src.checkers.mongodb import get_mongodb_latest_version
+
         if app_name == "mongodb" and github_repo == "mongodb/mongo":
             return get_mongodb_latest_version()
         elif check_latest == "github_release":
@@ -413,19 +664,24 @@ class VersionManager:
         elif check_latest == "docker_hub":
             if dockerhub_repo and dockerhub_repo.strip():
                 if app_name == "cnpg" and "postgres-containers" in dockerhub_repo:
+                    from src.checkers.cnpg import get_cnpg_postgres_latest_version
                     latest_version = get_cnpg_postgres_latest_version()
                 else:
                     latest_version = self._get_dockerhub_version_for_app(
                         app_name, dockerhub_repo, version_pin
                     )
         elif check_latest == "proxmox":
+            from src.checkers.proxmox import get_proxmox_latest_version
             latest_version = get_proxmox_latest_version(include_ceph=True)
         elif check_latest == "unifi_network":
             if app_name == "ui-network":
+                from src.checkers.unifi_network import get_unifi_network_latest_version
                 latest_version = get_unifi_network_latest_version()
         elif check_latest == "unifi_os_server":
+            from src.checkers.unifi_network import get_unifi_os_server_latest_version
             latest_version = get_unifi_os_server_latest_version()
         elif check_latest == "graylog_compat":
+            from src.checkers.graylog_compat import get_opensearch_compatible_version
             latest_version = get_opensearch_compatible_version()
         elif check_latest == "helm_search":
             if github_repo and github_repo.strip():
@@ -445,33 +701,98 @@ class VersionManager:
 
         return latest_version
 
-    def get_current_version(self, app_data):
-        app_name = app_data.get("Name", "")
+    def _get_ha_update_versions(self, app_data):
+        """Current and latest version from the Home Assistant update entity
+        mapped to this row in HA_UPDATE_ENTITIES, or None to use the row's own
+        checker. The HA URL is the Target of that instance's homeassistant row."""
+        instance = app_data.get("Instance", "")
+        mapped = resolve_update_entity(app_data.get("Name", ""), instance)
+        if mapped is None:
+            return None
+        ha_instance, entity_id = mapped
+        ha_idx = self.find_application_row("homeassistant", ha_instance)
+        url = self.records[ha_idx].target if ha_idx is not None else None
+        if not url:
+            print(f"  {instance}: No homeassistant row for instance {ha_instance}")
+            return None
+        return _get_ha_update_versions(instance, ha_instance, url, entity_id)
+
+    def _native_checker(self, app_data):
+        """The row's own Checker: its app's registration, or the ssh_apt one."""
+        checker = CURRENT_CHECKERS.get(app_data.get("Name", ""))
+        if checker is None and app_data.get("Check_Current") == "ssh" and app_data.get("Check_Latest") == "ssh_apt":
+            checker = SERVER_STATUS_CHECKER
+        return checker
+
+    def _checker_for(self, app_data):
+        """The Checker describing how a check-all run will read the row."""
+        if resolve_update_entity(app_data.get("Name", ""), app_data.get("Instance", "")) is not None:
+            return self._ha_update_checker
+        return self._native_checker(app_data)
+
+    def _latest_cost(self, app_data):
+        """(cache key, seconds) of the row's latest-version lookup for the planner."""
+        checker = self._checker_for(app_data)
+        if checker is SERVER_STATUS_CHECKER or checker is self._ha_update_checker:
+            return None, 0.0  # these report the latest version themselves
+        source = app_data.get("Check_Latest", "")
+        cost, cached = LATEST_SOURCES.get(source, (0.0, False))
+        repo = app_data.get("GitHub") or app_data.get("DockerHub") or ""
+        return ((source, repo) if cached else None), cost
 
-        checker = CURRENT_CHECKERS.get(app_name)
-        if checker is not None:
-            result = checker(app_data)
-        elif app_data.get("Check_Current") == "ssh" and app_data.get("Check_Latest") == "ssh_apt":
-            result = check_server_status(app_data.get("Instance", ""), app_data.get("Target", ""))
-        else:
-            result = None
+    def get_current_version(self, app_data):
+        result = self._get_ha_update_versions(app_data)
+        if result is None:
+            checker = self._native_checker(app_data)
+            if checker is not None:
+                result = checker(app_data)
 
         current_version = None
         latest_version = None
         firmware_update_available = False
         library_current_version = None
+        upgradable_packages = None
 
         if isinstance(result, dict):
             current_version = result.get("current_version") or result.get("esphome_version")
             latest_version = result.get("full_version") or result.get("latest_version")
             firmware_update_available = result.get("firmware_update_available", False)
             library_current_version = result.get("library_version")
+            upgradable_packages = result.get("upgradable_packages")
         else:
             current_version = result
 
-        return current_version, latest_version, firmware_update_available, library_current_version
+        return current_version, latest_version, firmware_update_available, library_current_version, upgradable_packages
+
+    def check_single_application(self, idx: int, verbose: bool = True, run_id: int | None = None):
+        """Check one row, store the result and log the check (see _log_check).
 
-    def check_single_application(self, idx: int, verbose: bool = True):
+        Returns the row's label when no current version could be read.
+        `run_id` groups a check-all's rows in the log; a standalone check is
+        its own run, and rereads current versions instead of using the last
+        check-all's shared snapshots.
+        """
+        if run_id is None:
+            call_if_imported(CURRENT_CACHE_RESETS)
+        started_at = datetime.now()
+        log = {"outcome": "error"}
+        try:
+            return self._check_application(idx, verbose, log)
+        finally:
+            # The row's writes and its checks entry commit together. The
+            # checker has already returned, so the writer isn't held across
+            # network calls.
+            with self.transaction():
+                if "updates" in log:
+                    phase_start = time.perf_counter()
+                    self.update_row_data(idx, log.pop("updates"))
+                    upgradable_packages = log.pop("upgradable_packages")
+                    if upgradable_packages is not None:
+                        self.set_upgradable_packages(idx, upgradable_packages)
+                    log["write_ms"] = _elapsed_ms(phase_start)
+                self._log_check(idx, run_id or new_run_id(), started_at, log)
+
+    def _check_application(self, idx: int, verbose: bool, log: dict):
         app_data = self.get_row_data(idx)
         app_name = app_data.get("Name", "")
         instance = app_data.get("Instance", "prod")
@@ -485,22 +806,32 @@ class VersionManager:
             print(f"Checking {app_name} ({instance})...")
 
         version_pin = app_data.get("Version_Pin", "")
-        latest_version = self.get_latest_version(
-            app_name, check_latest, github_repo, dockerhub_repo, version_pin
-        )
-        current_version, ssh_latest_version, firmware_update_available, library_current_version = (
-            self.get_current_version(app_data)
-        )
-
+        phase_start = time.perf_counter()
+        (
+            current_version, ssh_latest_version, firmware_update_available,
+            library_current_version, upgradable_packages,
+        ) = self.get_current_version(app_data)
+        log["current_ms"] = _elapsed_ms(phase_start)
+
+        # A checker that reports the latest version itself (apt, HA update
+        # entities, device firmware) makes the registry lookup redundant.
+        phase_start = time.perf_counter()
         if ssh_latest_version:
             latest_version = ssh_latest_version
+        else:
+            latest_version = self.get_latest_version(
+                app_name, check_latest, github_repo, dockerhub_repo, version_pin
+            )
 
         library_latest_version = None
         if library_github and library_github.strip():
             if app_name == "konnected":
+                from src.checkers.konnected import get_konnected_version
                 library_latest_version = get_konnected_version(instance, None, library_github)
             elif app_name == "airgradient":
+                from src.checkers.airgradient import get_airgradient_version
                 library_latest_version = get_airgradient_version(instance, None, library_github)
+        log["latest_ms"] = _elapsed_ms(phase_start)
 
         timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
         updates = {"Last_Checked": timestamp}
@@ -534,11 +865,8 @@ class VersionManager:
                 if "build:" in current_version:
                     current_clean = current_version.split("build:")[0].strip()
 
-                latest_clean = latest_version
-                if latest_clean.startswith("v"):
-                    latest_clean = latest_clean[1:]
-
-                if current_clean == latest_clean:
+                # Formatting-only differences (v1.2 vs 1.2.0) aren't updates.
+                if same_version(current_clean, latest_version):
                     status = "Up to Date"
                 else:
                     status = "Update Available"
@@ -548,11 +876,18 @@ class VersionManager:
             status = "Current Version"
 
         if status == "Up to Date" and library_current_version and library_latest_version:
-            if library_current_version != library_latest_version:
+            if not same_version(library_current_version, library_latest_version):
                 status = "Update Available"
 
         updates["Status"] = status
-        self.update_row_data(idx, updates)
+        # Written by check_single_application, in one commit with the log row.
+        log.update(
+            updates=updates,
+            upgradable_packages=upgradable_packages,
+            outcome="ok" if current_version and latest_version else "no_current" if not current_version else "no_latest",
+            current_version=current_version,
+            latest_version=latest_version,
+        )
 
         current_display = current_version if current_version else "N/A"
         latest_display = latest_version if latest_version else "N/A"
@@ -575,70 +910,221 @@ class VersionManager:
 
         return f"{app_name} ({instance})" if not current_version else None
 
-    def check_all_applications(self, max_workers: int = 8, verbose: bool = False):
+    def _log_check(self, idx: int, run_id: int, started_at: datetime, log: dict) -> None:
+        checker = self._checker_for(self.get_row_data(idx))
+        self.conn.execute(
+            "INSERT INTO checks (run_id, application_id, started_at, transport, outcome, "
+            "current_ms, latest_ms, write_ms, current_version, latest_version) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (
+                run_id,
+                self.records[idx].id,
+                started_at.strftime("%Y-%m-%d %H:%M:%S"),
+                checker.transport if checker is not None else None,
+                log["outcome"],
+                log.get("current_ms"),
+                log.get("latest_ms"),
+                log.get("write_ms"),
+                log.get("current_version"),
+                log.get("latest_version"),
+            ),
+        )
+
+    def prune_check_log(self) -> None:
+        """Fold checks rows older than CHECK_LOG_RETENTION_DAYS into daily
+        check_rollups, and drop rollups older than CHECK_ROLLUP_RETENTION_DAYS."""
+        with self.transaction():
+            self.conn.execute(
+                "INSERT INTO check_rollups (application_id, day, checks, failures, total_ms, max_ms) "
+                "SELECT application_id, substr(started_at, 1, 10), COUNT(*), SUM(outcome != 'ok'), "
+                f"SUM({_CHECK_MS_SQL}), MAX({_CHECK_MS_SQL}) "
+                "FROM checks WHERE started_at < datetime('now', 'localtime', ?) GROUP BY 1, 2 "
+                "ON CONFLICT (application_id, day) DO UPDATE SET checks = checks + excluded.checks, "
+                "failures = failures + excluded.failures, total_ms = total_ms + excluded.total_ms, "
+                "max_ms = MAX(max_ms, excluded.max_ms)",
+                (f"-{config.CHECK_LOG_RETENTION_DAYS} days",),
+            )
+            self.conn.execute(
+                "DELETE FROM checks WHERE started_at < datetime('now', 'localtime', ?)",
+                (f"-{config.CHECK_LOG_RETENTION_DAYS} days",),
+            )
+            self.conn.execute(
+                "DELETE FROM check_rollups WHERE day < date('now', 'localtime', ?)",
+                (f"-{config.CHECK_ROLLUP_RETENTION_DAYS} days",),
+            )
+
+    def get_check_stats(self, days: int = 7) -> list[dict]:
+        """Per-application check timings over the last `days` days, slowest
+        average first: checks, failures, avg_ms, max_ms, and the average of
+        each phase (current probe, latest lookup, DB write)."""
+        rows = self._reader().execute(
+            "SELECT a.name, a.instance, c.transport, COUNT(*) AS checks, "
+            "SUM(c.outcome != 'ok') AS failures, "
+            f"CAST(AVG({_CHECK_MS_SQL}) AS INTEGER) AS avg_ms, MAX({_CHECK_MS_SQL}) AS max_ms, "
+            "CAST(AVG(c.current_ms) AS INTEGER) AS current_ms, CAST(AVG(c.latest_ms) AS INTEGER) AS latest_ms, "
+            "CAST(AVG(c.write_ms) AS INTEGER) AS write_ms "
+            "FROM checks c JOIN applications a ON a.id = c.application_id "
+            "WHERE c.started_at >= datetime('now', 'localtime', ?) "
+            "GROUP BY c.application_id ORDER BY avg_ms DESC",
+            (f"-{days} days",),
+        ).fetchall()
+        return [dict(row) for row in rows]
+
+    def _is_ssh_apt(self, idx: int) -> bool:
+        record = self.records[idx]
+        return record.check_current == "ssh" and record.check_latest == "ssh_apt"
+
+    def plan_check_all(self, max_workers: int = 8, apt_prefetch: bool = False, skip_fresh: bool = False) -> dict:
+        """The execution plan check_all_applications would follow (see src/planner.py)."""
+        rows = [(idx, self.get_row_data(idx)) for idx in self.index.enabled()]
+        deferred = [idx for idx, _ in rows if self._is_ssh_apt(idx)] if apt_prefetch else []
+        return build_plan(
+            rows, self._checker_for, self._latest_cost, max_workers, skip_fresh=skip_fresh, deferred=deferred
+        )
+
+    def show_plan(self, max_workers: int = 8, apt_prefetch: bool = False, skip_fresh: bool = False):
+        plan = self.plan_check_all(max_workers, apt_prefetch=apt_prefetch, skip_fresh=skip_fresh)
+
+        print(f"\nCheck-all plan ({max_workers} workers):")
+        print("=" * 78)
+        for batch in plan["batches"]:
+            key = f" [{batch['key']}]" if batch["key"] else ""
+            print(f"  batch  {batch['transport']:<8} {len(batch['indices'])} rows{key:<36} {batch['cost']:>6.1f}s")
+        for n, entry in enumerate(plan["rows"], 1):
+            label = f"{entry['name']} ({entry['instance']})"
+            resource = entry["resource"][1] if entry["resource"] else ""
+            limit = f"≤{entry['limit']}" if entry["limit"] else ""
+            flag = "batched" if entry["batched"] else ""
+            print(
+                f"  {n:>4}.  {entry['transport']:<8} {label:<30} {str(resource)[:24]:<24} {limit:<3} "
+                f"{entry['cost'] + entry['latest_cost']:>5.1f}s {flag}"
+            )
+        if plan["skipped"]:
+            print(f"\nSkipping {len(plan['skipped'])} fresh applications:")
+            for entry in plan["skipped"]:
+                print(f"  {entry['name']} ({entry['instance']})")
+        print("=" * 78)
+        print(
+            f"Estimated wall time: {plan['estimated_seconds']:.1f}s "
+            f"(sequential: {plan['sequential_seconds']:.1f}s)"
+        )
+
+    def check_all_applications(
+        self, max_workers: int = 8, verbose: bool = False, apt_prefetch: bool = False, mdns: bool | None = None,
+        skip_fresh: bool = False,
+    ):
         """Check versions for all enabled applications concurrently.
 
         Each app's output (including any nested prints from checker modules,
         e.g. zigbee2mqtt's MQTT wait) is buffered per-thread and flushed as a
         single atomic write, so concurrent checks can't interleave mid-line.
+
+        Rows run in the planner's order (plan_check_all): checkers with a
+        batch method (ESPHome devices, kubectl apps per context, zigbee2mqtt
+        per broker) have it run once per group of rows before those rows are
+        checked, the slowest unbatched checks start first, and no more checks
+        than the planner allows talk to one host/context/broker at once.
+        With `skip_fresh`, rows checked within their checker's ttl are skipped.
+
+        With `apt_prefetch`, `apt-get update` is started on every ssh_apt host
+        up front (all in parallel, outside the worker pool) and those rows are
+        queued last, so by the time a worker reaches one its refresh has had
+        the whole run to finish.
+
+        With `mdns` (default: config.ESPHOME_MDNS), ESPHome versions are taken
+        from mDNS advertisements where available. A listener that is already
+        running (the TUI keeps one) is reused; otherwise one is started for
+        this run only.
         """
         print("Starting version check for all applications...")
         print("=" * 50)
 
-        # The GitHub/Docker Hub lookups are lru_cached to dedupe multi-instance
-        # apps within one run; clear them here so the cache scopes to the run,
-        # not the process — otherwise a long-lived TUI session keeps serving
-        # the latest-version results from its first check-all forever.
-        get_github_latest_version.cache_clear()
-        get_github_latest_tag.cache_clear()
-        dockerhub_clear_cache()
-
-        enabled_indices = []
-        skipped = 0
-        for idx, note in enumerate(self.notes):
-            if note["frontmatter"].get("enabled", True) is True:
-                enabled_indices.append(idx)
-            else:
-                skipped += 1
+        # The GitHub/Docker Hub lookups and the UniFi/Proxmox/HA snapshots are
+        # cached to dedupe multi-instance apps within one run; clear them here
+        # so the cache scopes to the run, not the process.
+        call_if_imported(RUN_CACHE_RESETS)
+        call_if_imported(CURRENT_CACHE_RESETS)
 
-        total_apps = len(enabled_indices)
+        skipped = len(self.index.disabled())
         if skipped > 0:
             print(f"Skipping {skipped} disabled applications")
-        print(f"Checking {total_apps} enabled applications ({max_workers} workers)...")
+
+        # Each group's batch is queued ahead of every row and the batched rows
+        # go to the back of the queue, so workers pick them up once the batch
+        # has had the rest of the run to complete rather than idling on it.
+        plan = self.plan_check_all(max_workers, apt_prefetch=apt_prefetch, skip_fresh=skip_fresh)
+        if plan["skipped"]:
+            print(f"Skipping {len(plan['skipped'])} applications checked within their freshness window")
+        ordered = plan["rows"]
+        total_apps = len(ordered)
+
+        use_mdns = config.ESPHOME_MDNS if mdns is None else mdns
+        has_esphome = any(batch["batch"] is _esphome_batch for batch in plan["batches"])
+        own_listener = False
+        if has_esphome and use_mdns:
+            from src.checkers.esphome_mdns import get_mdns_listener, start_mdns_listener
+            own_listener = get_mdns_listener() is None
+            if own_listener:
+                start_mdns_listener()
+        if apt_prefetch:
+            from src.checkers.linux_kernel import start_apt_refreshes
+            start_apt_refreshes([
+                self.records[entry["idx"]].instance
+                for entry in ordered if self._is_ssh_apt(entry["idx"])
+            ])
+        limits = {
+            entry["resource"]: threading.BoundedSemaphore(entry["limit"])
+            for entry in ordered if entry["resource"] is not None
+        }
+        row_limits = {entry["idx"]: limits.get(entry["resource"]) for entry in ordered}
+        print(
+            f"Checking {total_apps} enabled applications ({max_workers} workers, "
+            f"estimated {plan['estimated_seconds']:.0f}s)..."
+        )
         print()
 
         unavailable = []
         completed = 0
+        run_id = new_run_id()
 
-        _thread_local = threading.local()
         _real_stdout = sys.stdout
+        buffered = _ThreadBufferedStdout(_real_stdout)
         _write_lock = threading.Lock()
 
-        class _ThreadBufferedStdout:
-            def write(self, text):
-                buf = getattr(_thread_local, "buffer", None)
-                if buf is not None:
-                    buf.write(text)
-                else:
-                    _real_stdout.write(text)
+        row_batches = {}
 
-            def flush(self):
-                _real_stdout.flush()
+        def _run_batch(batch, rows):
+            # Batches don't print; anything stray is dropped rather than
+            # interleaved with the rows' output.
+            buffered.start()
+            try:
+                batch(rows)
+            except Exception:
+                pass  # the group's rows fall back to fetching for themselves
+            finally:
+                buffered.take()
 
         def _run_one(idx):
-            _thread_local.buffer = io.StringIO()
+            batch_future = row_batches.get(idx)
+            if batch_future is not None:
+                batch_future.result()
+            limit = row_limits.get(idx) or contextlib.nullcontext()
+            buffered.start()
             try:
-                label = self.check_single_application(idx, verbose=verbose)
-                return idx, _thread_local.buffer.getvalue(), label, None
+                with limit:
+                    label = self.check_single_application(idx, verbose=verbose, run_id=run_id)
+                return idx, buffered.take(), label, None
             except Exception as e:
-                return idx, _thread_local.buffer.getvalue(), None, e
-            finally:
-                _thread_local.buffer = None
+                return idx, buffered.take(), None, e
 
-        sys.stdout = _ThreadBufferedStdout()
+        sys.stdout = buffered
         try:
             with ThreadPoolExecutor(max_workers=max_workers) as executor:
-                futures = [executor.submit(_run_one, idx) for idx in enabled_indices]
+                for batch in plan["batches"]:
+                    idxs = batch["indices"]
+                    batch_future = executor.submit(_run_batch, batch["batch"], [self.get_row_data(idx) for idx in idxs])
+                    row_batches.update(dict.fromkeys(idxs, batch_future))
+                futures = [executor.submit(_run_one, entry["idx"]) for entry in ordered]
                 for future in as_completed(futures):
                     idx, output, label, error = future.result()
                     completed += 1
@@ -667,7 +1153,12 @@ class VersionManager:
                         unavailable.append(label)
         finally:
             sys.stdout = _real_stdout
+            call_if_imported(RUN_CLEANUPS)
+            if own_listener:
+                from src.checkers.esphome_mdns import stop_mdns_listener
+                stop_mdns_listener()
 
+        self.prune_check_log()
         print("=" * 50)
         print(f"Version check completed! Checked {total_apps} applications.")
 
@@ -676,24 +1167,55 @@ class VersionManager:
             for label in unavailable:
                 print(f"  {label}")
 
+    def count_applications(self) -> int:
+        """Rows in the database, counted without loading them (the read-only
+        commands construct VersionManager with load=False)."""
+        total, enabled = self._reader().execute(
+            "SELECT COUNT(*), COALESCE(SUM(enabled = 1), 0) FROM applications"
+        ).fetchone()
+        print(f"Found {total} applications in database ({enabled} enabled)")
+        return total
+
+    def _listing_widths(self, where: str) -> tuple[int, dict]:
+        """(row count, column widths) of the listing rows matching `where`,
+        aggregated in SQL so the rows themselves can be streamed."""
+        count, name, instance, current, latest = self._reader().execute(
+            "SELECT COUNT(*), MAX(LENGTH(name)), MAX(LENGTH(instance)), "
+            f"MAX({_formatted_length_sql('current_version', 'current_library_version')}), "
+            f"MAX({_formatted_length_sql('latest_version', 'latest_library_version')}) "
+            f"FROM applications WHERE {where}"
+        ).fetchone()
+        return count, {
+            "name": max(len("Name"), name or 0),
+            "instance": max(len("Instance"), instance or 0),
+            "current": max(len("Current"), current or 0),
+            "latest": max(len("Latest"), latest or 0),
+            "status": 3,
+        }
+
+    def _listing_rows(self, where: str, order: str = "name, instance"):
+        return self._reader().execute(
+            "SELECT name, instance, current_version, current_library_version, latest_version, "
+            f"latest_library_version, status, {_LAG_LABEL_SQL} AS behind "
+            f"FROM applications WHERE {where} ORDER BY {order}"
+        )
+
     def show_summary(self):
         print("\nVersion Summary (Enabled Applications):")
         print("=" * 40)
 
-        status_counts = {}
-        total_apps = 0
-        disabled_apps = 0
-
-        for note in self.notes:
-            fm = note["frontmatter"]
-            if fm.get("enabled", True) is not True:
-                disabled_apps += 1
-                continue
-            status = fm.get("status") or "Unknown"
-            status_counts[status] = status_counts.get(status, 0) + 1
-            total_apps += 1
+        # Statuses in order of their first application, as listed by --list.
+        status_counts = self._reader().execute(
+            "SELECT COALESCE(NULLIF(status, ''), 'Unknown'), COUNT(*) FROM ("
+            "  SELECT status, ROW_NUMBER() OVER (ORDER BY name, instance) AS pos"
+            "  FROM applications WHERE enabled = 1"
+            ") GROUP BY 1 ORDER BY MIN(pos)"
+        ).fetchall()
+        total_apps, disabled_apps = self._reader().execute(
+            "SELECT COALESCE(SUM(enabled = 1), 0), COALESCE(SUM(enabled != 1), 0) FROM applications"
+        ).fetchone()
 
-        for status, count in status_counts.items():
+        for status, count in status_counts:
             icon = self.STATUS_ICONS.get(status, "")
             print(f"{icon} {status}: {count}")
 
@@ -702,48 +1224,17 @@ class VersionManager:
             print(f"Disabled Applications: {disabled_apps}")
 
         print(f"\n⚠️  Applications needing updates:")
-        for note in self.notes:
-            fm = note["frontmatter"]
-            if fm.get("enabled", True) is not True:
-                continue
-            if fm.get("status") != "Update Available":
-                continue
-            name = fm.get("name", "")
-            instance = fm.get("instance", "")
-            current = format_version(fm.get("current_version"), fm.get("current_library_version"))
-            latest = format_version(fm.get("latest_version"), fm.get("latest_library_version"))
+        for row in self._listing_rows(_UPDATES_WHERE):
+            name = row["name"]
+            instance = row["instance"]
+            current = format_version(row["current_version"], row["current_library_version"])
+            latest = format_version(row["latest_version"], row["latest_library_version"])
             app_display = f"{name}-{instance}" if instance != "prod" else name
             print(f"  {app_display}: {current} -> {latest}")
 
     def show_applications(self):
-        all_data = []
-        max_widths = {
-            "index": 4,
-            "name": len("Name"),
-            "instance": len("Instance"),
-            "current": len("Current"),
-            "latest": len("Latest"),
-            "status": 3,
-        }
-
-        for note in self.notes:
-            fm = note["frontmatter"]
-            if fm.get("enabled", True) is not True:
-                continue
-
-            name = str(fm.get("name", ""))
-            instance = str(fm.get("instance", ""))
-            current = format_version(fm.get("current_version"), fm.get("current_library_version"), empty="")
-            latest = format_version(fm.get("latest_version"), fm.get("latest_library_version"), empty="")
-            status = str(fm.get("status", "") or "")
-
-            max_widths["name"] = max(max_widths["name"], len(name))
-            max_widths["instance"] = max(max_widths["instance"], len(instance))
-            max_widths["current"] = max(max_widths["current"], len(current))
-            max_widths["latest"] = max(max_widths["latest"], len(latest))
-
-            all_data.append({"name": name, "instance": instance, "current": current, "latest": latest, "status": status})
-
+        count, max_widths = self._listing_widths(_ENABLED_WHERE)
+        max_widths = {"index": 4, **max_widths}
         total_width = sum(max_widths.values()) + len(max_widths) * 2
 
         print("\nApplications:")
@@ -753,62 +1244,90 @@ class VersionManager:
         )
         print("-" * total_width)
 
-        for index, data in enumerate(all_data):
-            status_icon = self.STATUS_ICONS.get(data["status"], "") if data["status"] else ""
+        for index, row in enumerate(self._listing_rows(_ENABLED_WHERE)):
+            current = format_version(row["current_version"], row["current_library_version"], empty="")
+            latest = format_version(row["latest_version"], row["latest_library_version"], empty="")
+            status_icon = self.STATUS_ICONS.get(row["status"], "") if row["status"] else ""
             print(
-                f"{index:<{max_widths['index']}} {data['name']:<{max_widths['name']}} {data['instance']:<{max_widths['instance']}} {data['current']:<{max_widths['current']}} {data['latest']:<{max_widths['latest']}} {status_icon:<{max_widths['status']}}"
+                f"{index:<{max_widths['index']}} {row['name']:<{max_widths['name']}} {row['instance']:<{max_widths['instance']}} {current:<{max_widths['current']}} {latest:<{max_widths['latest']}} {status_icon:<{max_widths['status']}}"
             )
 
-        print(f"\nTotal: {len(all_data)} applications")
+        print(f"\nTotal: {count} applications")
 
     def show_updates(self):
-        updates = []
-        max_widths = {
-            "name": len("Name"),
-            "instance": len("Instance"),
-            "current": len("Current"),
-            "latest": len("Latest"),
-            "status": 3,
-        }
-
-        for note in self.notes:
-            fm = note["frontmatter"]
-            if fm.get("enabled", True) is not True:
-                continue
-            if fm.get("status") != "Update Available":
-                continue
-
-            name = str(fm.get("name", ""))
-            instance = str(fm.get("instance", ""))
-            current = format_version(fm.get("current_version"), fm.get("current_library_version"), empty="")
-            latest = format_version(fm.get("latest_version"), fm.get("latest_library_version"), empty="")
+        count, max_widths = self._listing_widths(_UPDATES_WHERE)
+        total_width = sum(max_widths.values()) + len(max_widths) * 2
 
-            max_widths["name"] = max(max_widths["name"], len(name))
-            max_widths["instance"] = max(max_widths["instance"], len(instance))
-            max_widths["current"] = max(max_widths["current"], len(current))
-            max_widths["latest"] = max(max_widths["latest"], len(latest))
+        print("\nApplications Needing Updates:")
+        print("=" * total_width)
+        print(
+            f"{'Name':<{max_widths['name']}} {'Instance':<{max_widths['instance']}} {'Current':<{max_widths['current']}} {'Latest':<{max_widths['latest']}} {'':<{max_widths['status']}}"
+        )
+        print("-" * total_width)
 
-            updates.append({"name": name, "instance": instance, "current": current, "latest": latest, "status": "Update Available"})
+        status_icon = self.STATUS_ICONS["Update Available"]
+        for row in self._listing_rows(_UPDATES_WHERE):
+            current = format_version(row["current_version"], row["current_library_version"], empty="")
+            latest = format_version(row["latest_version"], row["latest_library_version"], empty="")
+            print(
+                f"{row['name']:<{max_widths['name']}} {row['instance']:<{max_widths['instance']}} {current:<{max_widths['current']}} {latest:<{max_widths['latest']}} {status_icon:<{max_widths['status']}}"
+            )
 
+        print(f"\nTotal: {count} applications")
+
+    def show_behind(self, level: str = "patch"):
+        """List enabled applications at least one `level` release behind
+        their latest version, most behind first."""
+        where = f"{_ENABLED_WHERE} AND {_BEHIND_WHERE[level]}"
+        count, max_widths = self._listing_widths(where)
+        behind_width = self._reader().execute(
+            f"SELECT MAX(LENGTH({_LAG_LABEL_SQL})) FROM applications WHERE {where}"
+        ).fetchone()[0]
+        max_widths = {**max_widths, "status": max(len("Behind"), behind_width or 0)}
         total_width = sum(max_widths.values()) + len(max_widths) * 2
 
-        print("\nApplications Needing Updates:")
+        print(f"\nApplications Behind Latest ({level} or more):")
         print("=" * total_width)
         print(
-            f"{'Name':<{max_widths['name']}} {'Instance':<{max_widths['instance']}} {'Current':<{max_widths['current']}} {'Latest':<{max_widths['latest']}} {'':<{max_widths['status']}}"
+            f"{'Name':<{max_widths['name']}} {'Instance':<{max_widths['instance']}} {'Current':<{max_widths['current']}} {'Latest':<{max_widths['latest']}} {'Behind':<{max_widths['status']}}"
         )
         print("-" * total_width)
 
-        for data in updates:
-            status_icon = self.STATUS_ICONS.get(data["status"], "")
+        for row in self._listing_rows(where, order=f"{_LAG_ORDER}, name, instance"):
+            current = format_version(row["current_version"], row["current_library_version"], empty="")
+            latest = format_version(row["latest_version"], row["latest_library_version"], empty="")
             print(
-                f"{data['name']:<{max_widths['name']}} {data['instance']:<{max_widths['instance']}} {data['current']:<{max_widths['current']}} {data['latest']:<{max_widths['latest']}} {status_icon:<{max_widths['status']}}"
+                f"{row['name']:<{max_widths['name']}} {row['instance']:<{max_widths['instance']}} {current:<{max_widths['current']}} {latest:<{max_widths['latest']}} {row['behind']:<{max_widths['status']}}"
             )
 
-        print(f"\nTotal: {len(updates)} applications")
+        print(f"\nTotal: {count} applications")
 
-    def show_history(self, name: str = "", instance: str = "", limit: int | None = 40):
-        history = self.get_transaction_history(limit=limit, name=name, instance=instance)
+    def get_lag_order(self) -> list[int]:
+        """Application ids by stored lag, most behind first; rows whose
+        versions couldn't be compared are left out."""
+        return [
+            row[0] for row in self._reader().execute(
+                f"SELECT application_id FROM app_state WHERE lag_major IS NOT NULL ORDER BY {_LAG_ORDER}"
+            )
+        ]
+
+    def show_history(self, name: str = "", instance: str = "", limit: int | None = 40, before: int | None = None):
+        """Print one page of history: the newest `limit` transactions, or
+        those older than transaction id `before` (all of them if no limit)."""
+        cursor = None
+        if before is not None:
+            cursor = self.history_cursor(before)
+            if cursor is None:
+                print(f"No transaction with id {before}")
+                return
+        if limit:
+            history, next_cursor = self.get_transaction_page(limit, cursor, name=name, instance=instance)
+        else:
+            conditions, params = self._history_filters(name, instance)
+            if cursor is not None:
+                conditions.append("(timestamp, id) < (?, ?)")
+                params.extend(cursor)
+            history, next_cursor = self._history_query(conditions, params, None), None
 
         max_widths = {
             "timestamp": len("Timestamp"),
@@ -854,6 +1373,32 @@ class VersionManager:
 
         cap_note = f" (capped at {limit})" if limit else ""
         print(f"\nShowing {len(rows)} transaction(s){cap_note}")
+        if next_cursor is not None:
+            print(f"Older transactions: rerun with --before {next_cursor[1]}")
+
+    def show_check_stats(self, days: int = 7):
+        stats = self.get_check_stats(days)
+        if not stats:
+            print(f"\nNo checks logged in the last {days} day(s)")
+            return
+
+        print(f"\nCheck Timings (last {days} day(s), slowest first):")
+        header = (
+            f"{'Name':<24} {'Instance':<16} {'Transport':<9} {'Checks':>6} {'Fail':>4} "
+            f"{'Avg ms':>7} {'Max ms':>7} {'Current':>7} {'Latest':>7} {'Write':>5}"
+        )
+        print("=" * len(header))
+        print(header)
+        print("-" * len(header))
+        for row in stats:
+            print(
+                f"{row['name'][:24]:<24} {row['instance'][:16]:<16} {row['transport'] or '-':<9} "
+                f"{row['checks']:>6} {row['failures']:>4} {row['avg_ms']:>7} {row['max_ms']:>7} "
+                f"{row['current_ms'] if row['current_ms'] is not None else '-':>7} "
+                f"{row['latest_ms'] if row['latest_ms'] is not None else '-':>7} "
+                f"{row['write_ms'] if row['write_ms'] is not None else '-':>5}"
+            )
+        print(f"\nTotal: {len(stats)} applications")
 
     def upgrade_application(self, app_name: str, dry_run: bool = False, instance: str = "", force: bool = False):
         matching = self.find_application_rows_by_name(app_name, instance=instance)
@@ -865,19 +1410,29 @@ class VersionManager:
         self.upgrade_rows(matching, dry_run=dry_run, force=force)
 
     def _record_upgrade(self, idx: int, upgrade_method: str, dry_run: bool, detail: str = "") -> None:
-        if dry_run:
+        self._record_upgrades([(idx, upgrade_method, detail)], dry_run)
+
+    def _record_upgrades(self, upgrades: list[tuple[int, str, str]], dry_run: bool) -> None:
+        """Stamp Last_Upgraded and log a transaction for each (idx, upgrade_method,
+        detail), all in one commit."""
+        if dry_run or not upgrades:
             return
-        app_data = self.get_row_data(idx)
-        self.update_row_data(idx, {"Last_Upgraded": datetime.now().strftime("%Y-%m-%d %H:%M:%S")})
-        self.log_transaction(
-            idx,
-            upgrade_method,
-            app_data.get("Current_Version", "") or "",
-            app_data.get("Latest_Version", "") or "",
-            detail=detail,
-        )
+        now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        with self.transaction():
+            self.bulk_update([(idx, {"Last_Upgraded": now}) for idx, _, _ in upgrades])
+            for idx, upgrade_method, detail in upgrades:
+                record = self.records[idx]
+                self.log_transaction(
+                    idx,
+                    upgrade_method,
+                    record.current_version or "",
+                    record.latest_version or "",
+                    detail=detail,
+                )
 
-    def upgrade_rows(self, indices: list[int], dry_run: bool = False, force: bool = False):
+    def upgrade_rows(
+        self, indices: list[int], dry_run: bool = False, force: bool = False, max_workers: int | None = None
+    ):
         """Upgrade a set of rows as one run.
 
         Run-scoped state lives here so cross-instance dedup works no matter how
@@ -885,256 +1440,338 @@ class VersionManager:
         shared workflow fires once *after* every instance's values update has
         been pushed, and an ansible-esphome app whose every enabled instance is
         in the run gets a single base-pattern AWX job instead of one per device.
+
+        The run is a dependency graph (see src/upgrade_graph.py) whose nodes
+        are a row, the vault instances together, or a whole-app ESPHome job.
+        Independent nodes run concurrently, up to `max_workers` (default
+        config.UPGRADE_WORKERS) at once, so a run waits on its longest chain
+        of AWX jobs rather than their sum. An app's custom-resource rows
+        (ansible-cr) wait for its other rows (e.g. the operator) to upgrade;
+        within a node manifests are committed and pushed before they're
+        applied, one node at a time in the k3s-config checkout. Each node's
+        output is printed in one piece when it finishes.
         """
-        launched = 0
-        manifests_updated = 0
-        skipped = 0
-        # Vault instances (server + vault-k8s injector) share one Helm release
-        # and values file — collect them and fire the workflow once at the end,
-        # after all their values updates have been committed.
-        vault_pending: list[int] = []
-        esphome_fired: set[str] = set()
+        from src.checkers.linux_kernel import is_kernel_only_update
+        from src.checkers.upgrade import CR_UPGRADE_METHODS, HELM_UPGRADE_METHODS, MANIFEST_UPGRADE_METHODS
+
+        max_workers = max_workers or config.UPGRADE_WORKERS
+        totals = _upgrade_tally()
+        git_lock = threading.Lock()
+        # Node key -> (work, rows it covers).
+        work = {}
+        vault_rows: list[int] = []
+        esphome_groups: dict[str, list[int]] = {}
+        selected = set(indices)
 
         for idx in indices:
-            app_data = self.get_row_data(idx)
-            app_name = app_data.get("Name", "")
-            instance = app_data.get("Instance", "prod")
-            version_pin = app_data.get("Version_Pin", "") or ""
-            upgrade_method = app_data.get("Upgrade", "") or ""
-            status = app_data.get("Status", "") or ""
-            label = f"{app_name} ({instance})"
-
-            if self.notes[idx]["frontmatter"].get("enabled", True) is not True:
+            record = self.records[idx]
+            label = f"{record.name} ({record.instance})"
+            upgrade_method = record.upgrade or ""
+
+            if record.enabled is not True:
                 print(f"  Skipping {label}: disabled")
-                skipped += 1
+                totals["skipped"] += 1
                 continue
 
-            if not force and status == "Up to Date":
+            if not force and record.status == "Up to Date":
                 print(f"  Skipping {label}: already up to date")
-                skipped += 1
+                totals["skipped"] += 1
                 continue
 
-            if upgrade_method == "ansible-apt":
-                category = app_data.get("Category", "") or ""
-                latest = app_data.get("Latest_Version", "") or ""
-                if not force and category == "Kubernetes" and is_kernel_only_update(latest):
-                    print(f"  Skipping {label}: only a kernel update pending (k3s servers reboot for kernels via separate orchestration)")
-                    skipped += 1
-                    continue
-                print(f"  Upgrading {label} via AWX (method: {upgrade_method})...")
-                if trigger_awx_apt_upgrade(instance, instance, dry_run=dry_run):
-                    launched += 1
-                    self._record_upgrade(idx, "ansible-apt", dry_run)
-                else:
-                    skipped += 1
-                continue
-
-            if upgrade_method == "ansible-llm":
-                print(f"  Upgrading {label} via AWX (method: {upgrade_method})...")
-                if trigger_awx_llm_upgrade(app_name, instance, dry_run=dry_run):
-                    launched += 1
-                    self._record_upgrade(idx, "ansible-llm", dry_run)
-                else:
-                    skipped += 1
+            if (
+                upgrade_method == "ansible-apt" and not force and record.category == "Kubernetes"
+                and is_kernel_only_update(record.latest_version or "")
+            ):
+                print(f"  Skipping {label}: only a kernel update pending (k3s servers reboot for kernels via separate orchestration)")
+                totals["skipped"] += 1
                 continue
 
-            if upgrade_method == "ansible-esphome":
-                if app_name in esphome_fired:
-                    print(f"  Skipping {label}: ESPHome AWX job already launched for all instances")
-                    self._record_upgrade(idx, "ansible-esphome", dry_run, detail="covered by shared ESPHome AWX job")
-                    skipped += 1
-                    continue
-                esphome_target_map = {"konnected": "garage-door-opener", "esp-heat-control": "heat-control"}
-                base_target = esphome_target_map.get(app_name, app_name)
-                covers_all = set(self.find_application_rows_by_name(app_name)) <= set(indices)
-                if covers_all:
-                    esphome_target = base_target
-                    print(f"  Upgrading all {app_name} devices via AWX (method: {upgrade_method})...")
-                else:
-                    esphome_target = f"{base_target}-{instance}"
-                    print(f"  Upgrading {label} via AWX (method: {upgrade_method})...")
-                if trigger_awx_esphome_upgrade(esphome_target, instance, dry_run=dry_run):
-                    launched += 1
-                    self._record_upgrade(idx, "ansible-esphome", dry_run)
-                    if covers_all:
-                        esphome_fired.add(app_name)
-                else:
-                    skipped += 1
-                continue
+            if upgrade_method == "ansible-esphome" and selected.issuperset(self.find_application_rows_by_name(record.name)):
+                esphome_groups.setdefault(record.name, []).append(idx)
+            elif (
+                record.name == "vault" and record.version_pin == "pinned"
+                and upgrade_method in MANIFEST_UPGRADE_METHODS | HELM_UPGRADE_METHODS
+            ):
+                # Vault instances (server + vault-k8s injector) share one Helm
+                # release and values file: one node pushes every instance's
+                # values, then fires the workflow once.
+                vault_rows.append(idx)
+            else:
+                work[idx] = (partial(self._upgrade_row, idx, dry_run, force, git_lock), [idx])
 
-            if upgrade_method == "ansible-calico":
-                latest_version = app_data.get("Latest_Version", "") or ""
-                if not latest_version:
-                    print(f"  Skipping {label}: no latest version known")
-                    skipped += 1
-                    continue
-                target_version = latest_version if latest_version.startswith("v") else f"v{latest_version}"
-                print(f"  Upgrading {label} via AWX (method: {upgrade_method})...")
-                if trigger_awx_calico_upgrade(target_version, instance, dry_run=dry_run):
-                    launched += 1
-                    self._record_upgrade(idx, "ansible-calico", dry_run)
-                else:
-                    skipped += 1
-                continue
+        for app_name, idxs in esphome_groups.items():
+            work[("esphome", app_name)] = (partial(self._upgrade_esphome_app, app_name, idxs, dry_run), idxs)
+        if vault_rows:
+            work["vault"] = (partial(self._upgrade_vault, vault_rows, dry_run, force, git_lock), vault_rows)
 
-            if upgrade_method == "ansible-uos":
-                print(f"  Upgrading {label} via AWX (method: {upgrade_method})...")
-                if trigger_awx_uos_upgrade(instance, dry_run=dry_run):
-                    launched += 1
-                    self._record_upgrade(idx, "ansible-uos", dry_run)
-                else:
-                    skipped += 1
-                continue
+        # Custom resources (e.g. CNPG clusters) go after the rest of their
+        # app's rows in this run, so the operator that reconciles them is
+        # upgraded first.
+        real_stdout = sys.stdout
+        buffered = _ThreadBufferedStdout(real_stdout)
 
-            if version_pin == "latest":
-                if upgrade_method not in AWX_UPGRADE_METHODS:
-                    print(f"  Skipping {label}: upgrade method '{upgrade_method}' is not supported")
-                    skipped += 1
-                    continue
-                print(f"  Upgrading {label} via AWX (method: {upgrade_method})...")
-                if trigger_awx_upgrade(f"{app_name}-{instance}", instance, dry_run=dry_run):
-                    launched += 1
-                    self._record_upgrade(idx, upgrade_method, dry_run)
-                else:
-                    skipped += 1
-                continue
+        def run_node(run, rows):
+            buffered.start()
+            try:
+                tally = run()
+            except Exception as e:
+                print(f"  Upgrade failed: {e}")
+                tally = _upgrade_tally(skipped=rows)
+            return tally, buffered.take()
+
+        nodes = {}
+        for key, (run, idxs) in work.items():
+            after = []
+            record = self.records[idxs[0]]
+            if (record.upgrade or "") in CR_UPGRADE_METHODS:
+                after = [
+                    other for other, (_, other_idxs) in work.items()
+                    if other != key and any(
+                        self.records[i].name == record.name
+                        and (self.records[i].upgrade or "") not in CR_UPGRADE_METHODS
+                        for i in other_idxs
+                    )
+                ]
+            nodes[key] = {"run": partial(run_node, run, len(idxs)), "after": after}
+
+        if nodes:
+            print(f"  Running {len(nodes)} upgrade(s), up to {max_workers} at a time...")
+
+        def on_done(key, result):
+            tally, output = result
+            real_stdout.write(output)
+            for name, count in tally.items():
+                totals[name] += count
+
+        def on_skip(key, prerequisite):
+            idxs, prerequisite_idxs = work[key][1], work[prerequisite][1]
+            names = ", ".join(f"{self.records[i].name} ({self.records[i].instance})" for i in prerequisite_idxs)
+            for idx in idxs:
+                record = self.records[idx]
+                real_stdout.write(f"  Skipping {record.name} ({record.instance}): waiting on {names}, which didn't upgrade\n")
+            totals["skipped"] += len(idxs)
+
+        sys.stdout = buffered
+        try:
+            run_graph(nodes, max_workers, succeeded=lambda result: result[0]["launched"] > 0, on_done=on_done, on_skip=on_skip)
+        finally:
+            sys.stdout = real_stdout
 
-            if version_pin == "pinned":
-                if upgrade_method not in AWX_UPGRADE_METHODS and upgrade_method not in CR_UPGRADE_METHODS:
-                    print(f"  Skipping {label}: upgrade method '{upgrade_method}' is not supported")
-                    skipped += 1
-                    continue
-
-                if upgrade_method in CR_UPGRADE_METHODS:
-                    context = app_data.get("Context", "") or ""
-                    namespace = app_data.get("Namespace", "") or ""
-                    manifest_rel = f"{app_name}/manifests/{app_name}-{instance}.yaml"
-                    extra_manifests = app_data.get("Extra_Manifests") or []
-
-                    if not force:
-                        current_version = app_data.get("Current_Version", "") or ""
-                        latest_version = app_data.get("Latest_Version", "") or ""
-                        print(f"  Updating manifest for {label}...")
-                        manifest_ok = update_manifest_version(
-                            manifest_rel, current_version, latest_version, dry_run=dry_run
-                        )
-                        if not manifest_ok:
-                            skipped += 1
-                            continue
-
-                        for extra_rel in extra_manifests:
-                            print(f"  Updating extra manifest {extra_rel}...")
-                            update_manifest_version(extra_rel, current_version, latest_version, dry_run=dry_run)
-
-                        print(f"  Committing and pushing manifests for {label}...")
-                        push_ok = git_commit_push_manifest(
-                            manifest_rel, app_name, latest_version, dry_run=dry_run,
-                            extra_rel_paths=extra_manifests,
-                        )
-                        if not push_ok:
-                            skipped += 1
-                            continue
-
-                        manifests_updated += 1
-                    else:
-                        print(f"  Skipping manifest update for {label} (--force)")
-
-                    print(f"  Applying manifest for {label}...")
-                    if kubectl_apply_manifest(manifest_rel, context, namespace, instance, dry_run=dry_run):
-                        launched += 1
-                        self._record_upgrade(idx, upgrade_method, dry_run)
-                    else:
-                        skipped += 1
-                    continue
-
-                if upgrade_method in MANIFEST_UPGRADE_METHODS and not force:
-                    current_version = app_data.get("Current_Version", "") or ""
-                    latest_version = app_data.get("Latest_Version", "") or ""
-                    manifest_rel = f"{app_name}/manifests/{app_name}-{instance}.yaml"
+        print()
+        if dry_run:
+            print(f"[DRY RUN] Would have updated {totals['manifests_updated']} manifest(s), triggered {totals['launched']} upgrade(s), skipped {totals['skipped']}")
+        else:
+            print(f"Updated {totals['manifests_updated']} manifest(s), triggered {totals['launched']} upgrade(s), skipped {totals['skipped']}")
+
+    def _upgrade_row(self, idx: int, dry_run: bool, force: bool, git_lock) -> dict:
+        """Upgrade one row (a node of upgrade_rows' graph); returns its tally."""
+        from src.checkers.upgrade import (
+            trigger_awx_upgrade, trigger_awx_apt_upgrade, trigger_awx_llm_upgrade, trigger_awx_esphome_upgrade,
+            trigger_awx_calico_upgrade, trigger_awx_uos_upgrade, git_commit_push_manifest, kubectl_apply_manifest,
+            update_manifest_version, AWX_UPGRADE_METHODS, CR_UPGRADE_METHODS,
+        )
 
+        tally = _upgrade_tally()
+        record = self.records[idx]
+        app_name = record.name
+        instance = record.instance
+        version_pin = record.version_pin or ""
+        upgrade_method = record.upgrade or ""
+        label = f"{app_name} ({instance})"
+
+        def launched(ok, method=upgrade_method):
+            if ok:
+                tally["launched"] += 1
+                self._record_upgrade(idx, method, dry_run)
+            else:
+                tally["skipped"] += 1
+            return tally
+
+        if upgrade_method == "ansible-apt":
+            print(f"  Upgrading {label} via AWX (method: {upgrade_method})...")
+            return launched(trigger_awx_apt_upgrade(instance, instance, dry_run=dry_run))
+
+        if upgrade_method == "ansible-llm":
+            print(f"  Upgrading {label} via AWX (method: {upgrade_method})...")
+            return launched(trigger_awx_llm_upgrade(app_name, instance, dry_run=dry_run))
+
+        if upgrade_method == "ansible-esphome":
+            # Only some of the app's devices are in the run (see _upgrade_esphome_app).
+            esphome_target = f"{_ESPHOME_TARGETS.get(app_name, app_name)}-{instance}"
+            print(f"  Upgrading {label} via AWX (method: {upgrade_method})...")
+            return launched(trigger_awx_esphome_upgrade(esphome_target, instance, dry_run=dry_run))
+
+        if upgrade_method == "ansible-calico":
+            latest_version = record.latest_version or ""
+            if not latest_version:
+                print(f"  Skipping {label}: no latest version known")
+                tally["skipped"] += 1
+                return tally
+            target_version = latest_version if latest_version.startswith("v") else f"v{latest_version}"
+            print(f"  Upgrading {label} via AWX (method: {upgrade_method})...")
+            return launched(trigger_awx_calico_upgrade(target_version, instance, dry_run=dry_run))
+
+        if upgrade_method == "ansible-uos":
+            print(f"  Upgrading {label} via AWX (method: {upgrade_method})...")
+            return launched(trigger_awx_uos_upgrade(instance, dry_run=dry_run))
+
+        if version_pin == "latest":
+            if upgrade_method not in AWX_UPGRADE_METHODS:
+                print(f"  Skipping {label}: upgrade method '{upgrade_method}' is not supported")
+                tally["skipped"] += 1
+                return tally
+            print(f"  Upgrading {label} via AWX (method: {upgrade_method})...")
+            return launched(trigger_awx_upgrade(f"{app_name}-{instance}", instance, dry_run=dry_run))
+
+        if version_pin != "pinned":
+            print(f"  Skipping {label}: version_pin '{version_pin}' not handled by --upgrade")
+            tally["skipped"] += 1
+            return tally
+
+        if upgrade_method not in AWX_UPGRADE_METHODS and upgrade_method not in CR_UPGRADE_METHODS:
+            print(f"  Skipping {label}: upgrade method '{upgrade_method}' is not supported")
+            tally["skipped"] += 1
+            return tally
+
+        if upgrade_method in CR_UPGRADE_METHODS:
+            manifest_rel = f"{app_name}/manifests/{app_name}-{instance}.yaml"
+            extra_manifests = record.extra_manifests or []
+
+            if not force:
+                current_version = record.current_version or ""
+                latest_version = record.latest_version or ""
+                with git_lock:
                     print(f"  Updating manifest for {label}...")
-                    manifest_ok = update_manifest_version(
-                        manifest_rel, current_version, latest_version, dry_run=dry_run
-                    )
-                    if not manifest_ok:
-                        skipped += 1
-                        continue
+                    if not update_manifest_version(manifest_rel, current_version, latest_version, dry_run=dry_run):
+                        tally["skipped"] += 1
+                        return tally
+
+                    for extra_rel in extra_manifests:
+                        print(f"  Updating extra manifest {extra_rel}...")
+                        update_manifest_version(extra_rel, current_version, latest_version, dry_run=dry_run)
+
+                    print(f"  Committing and pushing manifests for {label}...")
+                    if not git_commit_push_manifest(
+                        manifest_rel, app_name, latest_version, dry_run=dry_run, extra_rel_paths=extra_manifests,
+                    ):
+                        tally["skipped"] += 1
+                        return tally
+
+                tally["manifests_updated"] += 1
+            else:
+                print(f"  Skipping manifest update for {label} (--force)")
 
-                    print(f"  Committing and pushing manifest for {label}...")
-                    push_ok = git_commit_push_manifest(
-                        manifest_rel, app_name, latest_version, dry_run=dry_run
-                    )
-                    if not push_ok:
-                        skipped += 1
-                        continue
-
-                    manifests_updated += 1
-                elif upgrade_method in MANIFEST_UPGRADE_METHODS and force:
-                    print(f"  Skipping manifest update for {label} (--force)")
-
-                elif upgrade_method in HELM_UPGRADE_METHODS and not force:
-                    current_version = app_data.get("Current_Version", "") or ""
-                    latest_version = app_data.get("Latest_Version", "") or ""
-                    helm_values_file = app_data.get("Helm_Values_File", "") or ""
-
-                    if not helm_values_file:
-                        print(f"  Skipping {label}: helm_values_file not set in note")
-                        skipped += 1
-                        continue
-
-                    print(f"  Updating helm values for {label}...")
-                    values_ok = update_helm_values_version(
-                        helm_values_file, current_version, latest_version, dry_run=dry_run
-                    )
-                    if not values_ok:
-                        skipped += 1
-                        continue
+            print(f"  Applying manifest for {label}...")
+            return launched(kubectl_apply_manifest(
+                manifest_rel, record.context or "", record.namespace or "", instance, dry_run=dry_run
+            ))
 
-                    print(f"  Committing and pushing helm values for {label}...")
-                    push_ok = git_commit_push_manifest(
-                        helm_values_file, app_name, latest_version, dry_run=dry_run
-                    )
-                    if not push_ok:
-                        skipped += 1
-                        continue
-
-                    manifests_updated += 1
-                elif upgrade_method in HELM_UPGRADE_METHODS and force:
-                    print(f"  Skipping helm values update for {label} (--force)")
-
-                if upgrade_method in AWX_UPGRADE_METHODS:
-                    if app_name == "vault":
-                        print(f"  Deferring shared AWX vault upgrade workflow for {label}...")
-                        vault_pending.append(idx)
-                        continue
-                    print(f"  Triggering AWX upgrade for {label} (method: {upgrade_method})...")
-                    if trigger_awx_upgrade(f"{app_name}-{instance}", instance, dry_run=dry_run):
-                        launched += 1
-                        self._record_upgrade(idx, upgrade_method, dry_run)
-                    else:
-                        skipped += 1
-                continue
+        if not self._push_pinned_version(idx, dry_run, force, git_lock, tally):
+            return tally
 
-            print(f"  Skipping {label}: version_pin '{version_pin}' not handled by --upgrade")
-            skipped += 1
-
-        if vault_pending:
-            first_instance = self.get_row_data(vault_pending[0]).get("Instance", "prod")
-            print(f"  Triggering AWX vault upgrade workflow (covers {len(vault_pending)} instance(s))...")
-            if trigger_vault_upgrade_workflow(first_instance, dry_run=dry_run):
-                launched += 1
-                for i, pidx in enumerate(vault_pending):
-                    detail = "" if i == 0 else "covered by shared vault upgrade workflow"
-                    self._record_upgrade(pidx, "ansible-helm", dry_run, detail=detail)
-            else:
-                skipped += len(vault_pending)
+        print(f"  Triggering AWX upgrade for {label} (method: {upgrade_method})...")
+        return launched(trigger_awx_upgrade(f"{app_name}-{instance}", instance, dry_run=dry_run))
 
-        print()
-        if dry_run:
-            print(f"[DRY RUN] Would have updated {manifests_updated} manifest(s), triggered {launched} upgrade(s), skipped {skipped}")
-        else:
-            print(f"Updated {manifests_updated} manifest(s), triggered {launched} upgrade(s), skipped {skipped}")
+    def _push_pinned_version(self, idx: int, dry_run: bool, force: bool, git_lock, tally: dict) -> bool:
+        """Bump a pinned row's manifest or Helm values file to its latest
+        version and push it (unless forcing). False if the row is skipped."""
+        from src.checkers.upgrade import (
+            git_commit_push_manifest, update_helm_values_version, update_manifest_version,
+            HELM_UPGRADE_METHODS, MANIFEST_UPGRADE_METHODS,
+        )
 
+        record = self.records[idx]
+        app_name = record.name
+        instance = record.instance
+        upgrade_method = record.upgrade or ""
+        label = f"{app_name} ({instance})"
+        current_version = record.current_version or ""
+        latest_version = record.latest_version or ""
+
+        if upgrade_method in MANIFEST_UPGRADE_METHODS:
+            if force:
+                print(f"  Skipping manifest update for {label} (--force)")
+                return True
+            path, kind = f"{app_name}/manifests/{app_name}-{instance}.yaml", "manifest"
+            update = update_manifest_version
+        elif upgrade_method in HELM_UPGRADE_METHODS:
+            if force:
+                print(f"  Skipping helm values update for {label} (--force)")
+                return True
+            path, kind = record.helm_values_file or "", "helm values"
+            update = update_helm_values_version
+            if not path:
+                print(f"  Skipping {label}: helm_values_file not set in note")
+                tally["skipped"] += 1
+                return False
+        else:
+            return True
+
+        with git_lock:
+            print(f"  Updating {kind} for {label}...")
+            if not update(path, current_version, latest_version, dry_run=dry_run):
+                tally["skipped"] += 1
+                return False
+
+            print(f"  Committing and pushing {kind} for {label}...")
+            if not git_commit_push_manifest(path, app_name, latest_version, dry_run=dry_run):
+                tally["skipped"] += 1
+                return False
+
+        tally["manifests_updated"] += 1
+        return True
+
+    def _upgrade_vault(self, idxs: list[int], dry_run: bool, force: bool, git_lock) -> dict:
+        """Push every vault instance's values, then fire the shared AWX vault
+        workflow once for the instances that made it."""
+        from src.checkers.upgrade import trigger_vault_upgrade_workflow
+
+        tally = _upgrade_tally()
+        pending = []
+        for idx in idxs:
+            record = self.records[idx]
+            if self._push_pinned_version(idx, dry_run, force, git_lock, tally):
+                print(f"  Deferring shared AWX vault upgrade workflow for {record.name} ({record.instance})...")
+                pending.append(idx)
+        if not pending:
+            return tally
+
+        first_instance = self.records[pending[0]].instance
+        print(f"  Triggering AWX vault upgrade workflow (covers {len(pending)} instance(s))...")
+        if trigger_vault_upgrade_workflow(first_instance, dry_run=dry_run):
+            tally["launched"] += 1
+            self._record_upgrades(
+                [
+                    (idx, "ansible-helm", "" if i == 0 else "covered by shared vault upgrade workflow")
+                    for i, idx in enumerate(pending)
+                ],
+                dry_run,
+            )
+        else:
+            tally["skipped"] += len(pending)
+        return tally
+
+    def _upgrade_esphome_app(self, app_name: str, idxs: list[int], dry_run: bool) -> dict:
+        """One base-pattern AWX job for an ESPHome app whose every enabled
+        device is in the run, recorded against each of them."""
+        from src.checkers.upgrade import trigger_awx_esphome_upgrade
+
+        tally = _upgrade_tally()
+        instance = self.records[idxs[0]].instance
+        print(f"  Upgrading all {app_name} devices via AWX (method: ansible-esphome)...")
+        if not trigger_awx_esphome_upgrade(_ESPHOME_TARGETS.get(app_name, app_name), instance, dry_run=dry_run):
+            tally["skipped"] += len(idxs)
+            return tally
+        tally["launched"] += 1
+        for idx in idxs[1:]:
+            record = self.records[idx]
+            print(f"  Skipping {record.name} ({record.instance}): ESPHome AWX job already launched for all instances")
+        tally["skipped"] += len(idxs) - 1
+        self._record_upgrades(
+            [(idx, "ansible-esphome", "" if i == 0 else "covered by shared ESPHome AWX job") for i, idx in enumerate(idxs)],
+            dry_run,
+        )
+        return tally
 
 if __name__ == "__main__":
     print("Use check_versions.py to interact with the version checker.")